@@ -0,0 +1,367 @@
+"""Exportación columnar de las evaluaciones para la analítica de la clase.
+
+Un hilo en segundo plano (o `python analitica.py exportar`) copia las
+evaluaciones nuevas de SQLite a archivos Parquet comprimidos, particionados
+por día:
+
+    analitica/dia=2026-10-12/parte-000000001234.parquet
+
+(las de fecha ilegible van a dia=desconocido, fuera de las consultas por día).
+
+Cada exportación lee solo las filas con id mayor que el último exportado
+(guardado en analitica/_estado.json), con una conexión de solo lectura, y
+las particiones de días ya cerrados se compactan en un único archivo. Las
+consultas de la clase (distribución de scores, transiciones de nivel,
+tendencia de complejidad) se responden desde esos archivos con pyarrow y
+NumPy, sin tocar la base de datos que usa el tráfico en vivo.
+
+pyarrow es opcional: sin él no se exporta nada y la analítica no está
+disponible. Se importa la primera vez que se usa, no al arrancar.
+
+Uso:
+    python analitica.py exportar [--db estudiantes.db] [--directorio analitica] [--intervalo 0]
+    python analitica.py consultar [--desde 2026-09-01] [--granularidad semana]
+"""
+import argparse
+import fcntl
+import glob
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Any, Dict, Optional
+
+from ejercicios import NIVELES
+
+DIRECTORIO_POR_DEFECTO = 'analitica'
+
+# Filas leídas de SQLite por archivo escrito
+LOTE = 50000
+
+# Límites de los intervalos del histograma de scores (0-9, 10-19, ..., 90-100)
+ANCHO_INTERVALO_SCORE = 10
+
+# Partición de las evaluaciones cuya fecha SQLite no reconoce: se exportan (y cuentan)
+# igual, pero las consultas por día no las incluyen
+DIA_DESCONOCIDO = 'desconocido'
+
+ARCHIVO_ESTADO = '_estado.json'
+ARCHIVO_BLOQUEO = '.bloqueo'
+
+_modulos = None
+
+
+def _cargar_modulos():
+    """(pyarrow, pyarrow.dataset, pyarrow.parquet, numpy), importados una vez; None sin pyarrow"""
+    global _modulos
+    if _modulos is None:
+        try:
+            import numpy as np
+            import pyarrow as pa
+            import pyarrow.dataset as ds
+            import pyarrow.parquet as pq
+            _modulos = (pa, ds, pq, np)
+        except ImportError:
+            _modulos = False
+    return _modulos or None
+
+
+def pyarrow_disponible() -> bool:
+    return _cargar_modulos() is not None
+
+
+class AnaliticaNoDisponible(Exception):
+    """pyarrow no está instalado"""
+
+
+class ExportadorAnalitica:
+    """Evaluaciones en Parquet particionado por día, y consultas agregadas sobre ellas"""
+
+    def __init__(self, db_path: str = './estudiantes.db', directorio: str = DIRECTORIO_POR_DEFECTO,
+                 intervalo: float = 300):
+        self.db_path = db_path
+        self.directorio = directorio
+        self.intervalo = intervalo
+        self._pid = None
+
+    def _modulos(self):
+        modulos = _cargar_modulos()
+        if modulos is None:
+            raise AnaliticaNoDisponible('La analítica requiere pyarrow (pip install pyarrow)')
+        return modulos
+
+    # --- Exportación ---
+
+    def leer_estado(self) -> Dict[str, Any]:
+        try:
+            with open(os.path.join(self.directorio, ARCHIVO_ESTADO), encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            return {'ultimo_id': 0, 'exportado': None}
+
+    def _guardar_estado(self, estado: Dict[str, Any]):
+        ruta = os.path.join(self.directorio, ARCHIVO_ESTADO)
+        temporal = f'{ruta}.{os.getpid()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(estado, archivo)
+        os.replace(temporal, ruta)
+
+    def _escribir(self, tabla, ruta: str):
+        """Escribe el Parquet de forma atómica (los archivos con '.' inicial no se leen)"""
+        pa, ds, pq, np = self._modulos()
+        directorio, nombre = os.path.split(ruta)
+        os.makedirs(directorio, exist_ok=True)
+        temporal = os.path.join(directorio, f'.{nombre}.{os.getpid()}.tmp')
+        pq.write_table(tabla, temporal, compression='zstd')
+        os.replace(temporal, ruta)
+
+    def _leer_lote(self, desde_id: int):
+        """Evaluaciones con id > desde_id como columnas, con una conexión de solo lectura"""
+        conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+        try:
+            return conn.execute('''
+                SELECT id, estudiante_id, COALESCE(nivel_detectado, 'principiante'), COALESCE(score, 0),
+                       COALESCE(complejidad, 0), COALESCE(funciones, 0), COALESCE(clases, 0),
+                       strftime('%Y-%m-%d %H:%M:%f', fecha), date(fecha)
+                FROM evaluaciones
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+            ''', (desde_id, LOTE)).fetchall()
+        finally:
+            conn.close()
+
+    def exportar(self) -> Dict[str, int]:
+        """Exporta las evaluaciones nuevas; retorna las filas y archivos escritos"""
+        pa, ds, pq, np = self._modulos()
+        conteo = {'filas': 0, 'sin_fecha': 0, 'archivos': 0, 'compactados': 0}
+        if not os.path.exists(self.db_path):
+            return conteo
+        os.makedirs(self.directorio, exist_ok=True)
+
+        # Un solo exportador a la vez entre workers y procesos
+        with open(os.path.join(self.directorio, ARCHIVO_BLOQUEO), 'w') as bloqueo:
+            try:
+                fcntl.flock(bloqueo, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return conteo
+
+            estado = self.leer_estado()
+            while True:
+                filas = self._leer_lote(estado['ultimo_id'])
+                if not filas:
+                    break
+                columnas = list(zip(*filas))
+                # SQLite ya normalizó la fecha (las que tienen zona, 'Z' o '+hh:mm', a UTC) a
+                # un formato que arrow convierte; sin día reconocible queda nula
+                dias = [dia or DIA_DESCONOCIDO for dia in columnas[8]]
+                fechas = columnas[7]
+                tabla = pa.table({
+                    'id': pa.array(columnas[0], pa.int64()),
+                    'estudiante_id': pa.array(columnas[1], pa.int64()),
+                    'nivel': pa.array(columnas[2], pa.string()).dictionary_encode(),
+                    'score': pa.array(columnas[3], pa.int32()),
+                    'complejidad': pa.array(columnas[4], pa.int32()),
+                    'funciones': pa.array(columnas[5], pa.int32()),
+                    'clases': pa.array(columnas[6], pa.int32()),
+                    'fecha': pa.array(fechas, pa.string()).cast(pa.timestamp('us'), safe=False),
+                })
+
+                # Un archivo por día del lote, con el nombre de su primer id: si se repite
+                # una exportación interrumpida se sobreescribe el mismo archivo
+                dias = np.array(dias, dtype=object)
+                for dia in sorted(set(dias)):
+                    indices = np.flatnonzero(dias == dia)
+                    parte = tabla.take(pa.array(indices))
+                    ruta = os.path.join(self.directorio, f'dia={dia}', f'parte-{parte["id"][0].as_py():012d}.parquet')
+                    self._escribir(parte, ruta)
+                    conteo['archivos'] += 1
+
+                conteo['filas'] += len(filas)
+                conteo['sin_fecha'] += int((dias == DIA_DESCONOCIDO).sum())
+                estado = {'ultimo_id': columnas[0][-1], 'exportado': time.time()}
+                self._guardar_estado(estado)
+
+            conteo['compactados'] = self.compactar()
+        return conteo
+
+    def compactar(self) -> int:
+        """Une en un archivo los de cada partición de días anteriores a hoy"""
+        pa, ds, pq, np = self._modulos()
+        hoy = date.today().isoformat()
+        compactadas = 0
+        for particion in sorted(glob.glob(os.path.join(self.directorio, 'dia=*'))):
+            dia = os.path.basename(particion)[len('dia='):]
+            if dia != DIA_DESCONOCIDO and dia >= hoy:
+                continue
+            partes = sorted(glob.glob(os.path.join(particion, 'parte-*.parquet')))
+            if len(partes) < 2:
+                continue
+            tabla = pa.concat_tables([pq.read_table(parte) for parte in partes]).sort_by('id')
+            tabla = tabla.take(pa.array(np.unique(tabla['id'].to_numpy(), return_index=True)[1]))
+            # La primera parte se reemplaza por la unión y luego se borran las demás; si se
+            # interrumpe entre ambos pasos solo quedan filas repetidas, que la lectura descarta
+            self._escribir(tabla, partes[0])
+            for parte in partes[1:]:
+                os.remove(parte)
+            compactadas += 1
+        return compactadas
+
+    def iniciar(self):
+        """Exporta cada `intervalo` segundos en un hilo del proceso actual (0: nunca)"""
+        if not self.intervalo or self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+
+        def exportar_periodicamente():
+            while self._pid == os.getpid():
+                # Primero espera: no compite con el arranque del worker
+                time.sleep(self.intervalo)
+                if not pyarrow_disponible():
+                    return
+                try:
+                    self.exportar()
+                except Exception as e:
+                    print(f"Error exportando la analítica: {e}")
+
+        threading.Thread(target=exportar_periodicamente, name='analitica', daemon=True).start()
+
+    # --- Consultas ---
+
+    def _leer(self, desde: Optional[str], hasta: Optional[str]):
+        """Columnas de las evaluaciones exportadas entre dos días (incluidos), sin repetidos ni las sin fecha"""
+        pa, ds, pq, np = self._modulos()
+        particionado = ds.partitioning(pa.schema([('dia', pa.string())]), flavor='hive')
+        filtro = ds.field('dia') != DIA_DESCONOCIDO
+        if desde:
+            filtro = filtro & (ds.field('dia') >= desde)
+        if hasta:
+            filtro = filtro & (ds.field('dia') <= hasta)
+
+        for intento in range(2):
+            try:
+                dataset = ds.dataset(self.directorio, format='parquet', partitioning=particionado)
+                tabla = dataset.to_table(
+                    columns=['id', 'estudiante_id', 'nivel', 'score', 'complejidad', 'dia'], filter=filtro)
+                break
+            except FileNotFoundError:
+                if intento:  # una compactación borró un archivo entre listar y leer
+                    raise
+        id_evaluacion = tabla['id'].to_numpy()
+        _, primeros = np.unique(id_evaluacion, return_index=True)  # ordenado por id
+        tabla = tabla.take(pa.array(primeros))
+        # Cada archivo trae su propio diccionario de niveles: se unifican en uno
+        nivel = tabla['nivel'].cast(pa.string()).combine_chunks().dictionary_encode()
+        return {
+            'estudiante_id': tabla['estudiante_id'].to_numpy(),
+            'score': tabla['score'].to_numpy(),
+            'complejidad': tabla['complejidad'].to_numpy(),
+            'dia': np.array(tabla['dia'].to_numpy(zero_copy_only=False), dtype='datetime64[D]'),
+            'nivel_codigo': nivel.indices.to_numpy(zero_copy_only=False),
+            'niveles': nivel.dictionary.to_pylist(),
+        }
+
+    def consultar_clase(self, desde: str = None, hasta: str = None, granularidad: str = 'dia') -> Dict[str, Any]:
+        """Distribución de scores, transiciones de nivel y tendencia por día o semana"""
+        pa, ds, pq, np = self._modulos()
+        estado = self.leer_estado()
+        resultado = {
+            'desde': desde, 'hasta': hasta, 'granularidad': granularidad,
+            'exportado_hasta_id': estado['ultimo_id'], 'exportado': estado['exportado'],
+            'evaluaciones': 0, 'estudiantes': 0, 'scores': None, 'transiciones_nivel': [], 'tendencia': []
+        }
+        if not os.path.isdir(self.directorio) or not glob.glob(os.path.join(self.directorio, 'dia=*')):
+            return resultado
+        datos = self._leer(desde, hasta)
+        score = datos['score']
+        if not len(score):
+            return resultado
+
+        resultado['evaluaciones'] = int(len(score))
+        resultado['estudiantes'] = int(len(np.unique(datos['estudiante_id'])))
+
+        # Distribución de scores
+        intervalos = np.minimum(np.clip(score, 0, 100) // ANCHO_INTERVALO_SCORE, 100 // ANCHO_INTERVALO_SCORE - 1)
+        percentiles = np.percentile(score, [10, 25, 50, 75, 90])
+        resultado['scores'] = {
+            'promedio': round(float(score.mean()), 2),
+            'desviacion': round(float(score.std()), 2),
+            'percentiles': dict(zip(('p10', 'p25', 'p50', 'p75', 'p90'), (round(float(p), 2) for p in percentiles))),
+            'histograma': [
+                {'desde': i * ANCHO_INTERVALO_SCORE, 'cantidad': int(c)}
+                for i, c in enumerate(np.bincount(intervalos, minlength=100 // ANCHO_INTERVALO_SCORE))
+            ]
+        }
+
+        # Transiciones de nivel: pares (anterior, nuevo) consecutivos del mismo estudiante
+        # (las filas ya vienen ordenadas por id, es decir, por fecha de evaluación)
+        orden = np.argsort(datos['estudiante_id'], kind='stable')
+        estudiante = datos['estudiante_id'][orden]
+        codigo = datos['nivel_codigo'][orden].astype(np.int64)
+        cambio = (estudiante[1:] == estudiante[:-1]) & (codigo[1:] != codigo[:-1])
+        niveles = datos['niveles']
+        pares = np.bincount(codigo[:-1][cambio] * len(niveles) + codigo[1:][cambio],
+                            minlength=len(niveles) ** 2)
+        posicion = {nivel: NIVELES.index(nivel) if nivel in NIVELES else len(NIVELES) for nivel in niveles}
+        resultado['transiciones_nivel'] = sorted(
+            (
+                {'desde': niveles[i // len(niveles)], 'hacia': niveles[i % len(niveles)], 'cantidad': int(c),
+                 'sube': posicion[niveles[i % len(niveles)]] > posicion[niveles[i // len(niveles)]]}
+                for i, c in enumerate(pares) if c
+            ),
+            key=lambda t: -t['cantidad']
+        )
+
+        # Tendencia: promedios por periodo (la semana se identifica por su lunes)
+        periodo = datos['dia']
+        if granularidad == 'semana':
+            periodo = periodo - (periodo.astype(np.int64) + 3) % 7  # 1970-01-01 fue jueves
+        periodos, inverso = np.unique(periodo, return_inverse=True)
+        cantidad = np.bincount(inverso)
+        suma_score = np.bincount(inverso, weights=score)
+        suma_complejidad = np.bincount(inverso, weights=datos['complejidad'])
+        resultado['tendencia'] = [
+            {'periodo': str(p), 'evaluaciones': int(n), 'score_promedio': round(float(s / n), 2),
+             'complejidad_promedio': round(float(c / n), 2)}
+            for p, n, s, c in zip(periodos, cantidad, suma_score, suma_complejidad)
+        ]
+        return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--db', default='./estudiantes.db', help='Ruta de la base de datos')
+    parser.add_argument('--directorio', default=os.environ.get('WEBIA_ANALITICA_DIR', DIRECTORIO_POR_DEFECTO))
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    exportar = subcomandos.add_parser('exportar', help='Exporta las evaluaciones nuevas')
+    exportar.add_argument('--intervalo', type=float, default=0,
+                          help='Repetir cada tantos segundos (0: una sola vez)')
+    consultar = subcomandos.add_parser('consultar', help='Analítica de la clase en JSON')
+    consultar.add_argument('--desde')
+    consultar.add_argument('--hasta')
+    consultar.add_argument('--granularidad', choices=('dia', 'semana'), default='dia')
+    args = parser.parse_args()
+
+    exportador = ExportadorAnalitica(args.db, args.directorio)
+    if not pyarrow_disponible():
+        parser.error('pyarrow no está instalado (pip install pyarrow)')
+
+    if args.comando == 'consultar':
+        print(json.dumps(exportador.consultar_clase(args.desde, args.hasta, args.granularidad),
+                         ensure_ascii=False, indent=2))
+        return
+
+    while True:
+        inicio = time.perf_counter()
+        conteo = exportador.exportar()
+        print(f"{conteo['filas']} evaluaciones ({conteo['sin_fecha']} sin fecha) en {conteo['archivos']} archivos, "
+              f"{conteo['compactados']} particiones compactadas ({time.perf_counter() - inicio:.2f} s)")
+        if not args.intervalo:
+            break
+        time.sleep(args.intervalo)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,30 +1,214 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Blueprint, Response, current_app, g, render_template, request, jsonify, url_for, send_from_directory, abort
+import hmac
 import os
-from database import DatabaseManager
+import time
+from datetime import date
+from database import DatabaseManager, RESUMENES
 from evaluador import EvaluadorCodigo
-from ejercicios import BibliotecaEjercicios
-
-app = Flask(__name__)
-#CORS(app)  # Permitir CORS para desarrollo
-
-# Configuración
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = 'uploads'
+from ejercicios import BibliotecaEjercicios, catalogo
+from limitador import ControlAdmision, LimiteExcedido
+from respuestas import RespuestaInmutable
+from ejemplos import EJEMPLOS
+from badges import sistema_badges
+from werkzeug.security import safe_join
+from assets import ManifiestoAssets, DIRECTORIO_DIST
+import sandbox
+from sandbox import cache_ejecuciones
+from metricas import registro
+from trazas import iniciar_traza, terminar_traza, SumideroJSONL
+
+# Configuración por defecto; create_app(config) la sobreescribe
+CONFIGURACION_POR_DEFECTO = {
+    'MAX_CONTENT_LENGTH': 16 * 1024 * 1024,  # 16MB max file size
+    'UPLOAD_FOLDER': 'uploads',
+    
+    # Control de admisión para /api/ejecutar
+    'EJECUCION_MAX_CONCURRENTES': os.cpu_count() or 2,
+    'EJECUCION_MAX_COLA': 64,
+    # Un cubo por estudiante (dirección + estudiante_id del cuerpo) y otro, más grande, por
+    # dirección. El estudiante_id lo elige el cliente: quien invente ids no pasa del límite de
+    # su dirección, y un aula detrás de un NAT comparte solo ese límite, no el de un estudiante
+    'EJECUCION_RAFAGA_ESTUDIANTE': float(os.environ.get('WEBIA_EJECUCION_RAFAGA', 5)),  # ejecuciones seguidas
+    'EJECUCION_TASA_ESTUDIANTE': float(os.environ.get('WEBIA_EJECUCION_TASA', 1.0)),  # ejecuciones por segundo sostenidas
+    'EJECUCION_RAFAGA_DIRECCION': float(os.environ.get('WEBIA_EJECUCION_RAFAGA_DIRECCION', 50)),
+    'EJECUCION_TASA_DIRECCION': float(os.environ.get('WEBIA_EJECUCION_TASA_DIRECCION', 10.0)),
+    'EJECUCION_ESPERA_MAXIMA': 15,  # segundos máximos en cola
+    
+    # Directorio donde cada worker vuelca sus métricas para /metrics (None: solo este proceso)
+    'METRICAS_DIRECTORIO': os.environ.get('WEBIA_METRICAS_DIR'),
+    
+    # Fracción de solicitudes trazadas (0: ninguna) y archivo JSONL donde se escriben
+    'TRAZAS_MUESTREO': float(os.environ.get('WEBIA_TRAZAS_MUESTREO', 0)),
+    'TRAZAS_ARCHIVO': os.environ.get('WEBIA_TRAZAS_ARCHIVO', 'trazas.jsonl'),
+    
+    # Análisis más lentos que esto (segundos, 0: nunca) se guardan para `corpus_lento.py repetir`.
+    # Desactivado por defecto: guarda en disco el código de los estudiantes
+    'CORPUS_LENTO_UMBRAL': float(os.environ.get('WEBIA_CORPUS_LENTO_UMBRAL', 0)),
+    'CORPUS_LENTO_DIRECTORIO': os.environ.get('WEBIA_CORPUS_LENTO', 'corpus_lento'),
+    
+    # Exportación Parquet para /api/analitica/clase (requiere pyarrow); cada cuántos segundos (0: nunca)
+    'ANALITICA_DIRECTORIO': os.environ.get('WEBIA_ANALITICA_DIR', 'analitica'),
+    'ANALITICA_INTERVALO': float(os.environ.get('WEBIA_ANALITICA_INTERVALO', 300)),
+    
+    # Token de las rutas /api/admin/* (sin token esas rutas no existen)
+    'ADMIN_TOKEN': os.environ.get('WEBIA_ADMIN_TOKEN')
+}
 
-# Crear carpeta de uploads si no existe
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+rutas = Blueprint('webia', __name__)
 
-@app.route('/')
+def create_app(config=None):
+    """Crea la aplicación con la configuración por defecto más `config`"""
+    app = Flask(__name__)
+    #CORS(app)  # Permitir CORS para desarrollo
+    
+    app.config.update(CONFIGURACION_POR_DEFECTO)
+    app.config.update(config or {})
+    
+    app.extensions['control_admision'] = ControlAdmision(
+        max_concurrentes=app.config['EJECUCION_MAX_CONCURRENTES'],
+        max_cola=app.config['EJECUCION_MAX_COLA'],
+        capacidad_cubo=app.config['EJECUCION_RAFAGA_ESTUDIANTE'],
+        tasa_cubo=app.config['EJECUCION_TASA_ESTUDIANTE'],
+        capacidad_direccion=app.config['EJECUCION_RAFAGA_DIRECCION'],
+        tasa_direccion=app.config['EJECUCION_TASA_DIRECCION'],
+        espera_maxima=app.config['EJECUCION_ESPERA_MAXIMA']
+    )
+    
+    if app.config['METRICAS_DIRECTORIO']:
+        registro.configurar_directorio(app.config['METRICAS_DIRECTORIO'])
+    
+    app.extensions['sumidero_trazas'] = (
+        SumideroJSONL(app.config['TRAZAS_ARCHIVO']) if app.config['TRAZAS_MUESTREO'] > 0 else None
+    )
+    app.extensions['corpus_lento'] = None
+    if app.config['CORPUS_LENTO_UMBRAL'] > 0:
+        from corpus_lento import CorpusLento
+        app.extensions['corpus_lento'] = CorpusLento(app.config['CORPUS_LENTO_DIRECTORIO'])
+    
+    app.register_blueprint(rutas)
+    return app
+
+def exportador_analitica(aplicacion):
+    """Exportador Parquet de la aplicación, creado en su primer uso (ruta o hilo del worker)"""
+    exportador = aplicacion.extensions.get('analitica')
+    if exportador is None:
+        from analitica import ExportadorAnalitica
+        exportador = aplicacion.extensions['analitica'] = ExportadorAnalitica(
+            directorio=aplicacion.config['ANALITICA_DIRECTORIO'], intervalo=aplicacion.config['ANALITICA_INTERVALO'])
+    return exportador
+
+def __getattr__(nombre):
+    # `app` se crea al primer acceso (python app.py, flask --app app, benchmarks),
+    # así servidor.py puede crear la suya con otra configuración sin construir dos
+    if nombre == 'app':
+        global app
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+# Respuestas que no cambian entre despliegues: serializadas y comprimidas una vez
+respuesta_ejemplos = RespuestaInmutable(EJEMPLOS)
+respuesta_badges = RespuestaInmutable({'badges': sistema_badges.obtener_todos_badges()})
+
+# Assets construidos con `python assets.py` (con huella en el nombre)
+manifiesto_assets = ManifiestoAssets()
+
+LATENCIA_RUTAS = registro.histograma('webia_http_solicitud_segundos', 'Duración de las solicitudes por ruta',
+                                     ('ruta', 'metodo', 'estado'))
+
+def _ruta_actual():
+    # La regla (/api/estudiante/<int:estudiante_id>/...) y no la URL, para acotar las series
+    return request.url_rule.rule if request.url_rule else 'sin_ruta'
+
+def _rutas_corpus():
+    # Solo se llama con el corpus activo, que ya importó corpus_lento
+    from corpus_lento import ANALISIS
+    return ANALISIS
+
+@rutas.before_app_request
+def iniciar_medicion():
+    g.inicio_solicitud = time.perf_counter()
+    ruta = _ruta_actual()
+    # Los análisis registran spans siempre que haya corpus, por si resultan lentos
+    capturable = current_app.extensions['corpus_lento'] is not None and ruta in _rutas_corpus()
+    g.traza = iniciar_traza(f'{request.method} {ruta}', request.headers.get('X-Request-ID'),
+                            current_app.config['TRAZAS_MUESTREO'], registrar=capturable)
+
+@rutas.after_app_request
+def registrar_latencia(respuesta):
+    inicio = g.pop('inicio_solicitud', None)
+    if inicio is not None:
+        LATENCIA_RUTAS.etiquetas(_ruta_actual(), request.method, respuesta.status_code).observar(
+            time.perf_counter() - inicio)
+    traza = g.get('traza')
+    if traza is not None:
+        respuesta.headers['X-Request-ID'] = traza.id_solicitud
+        traza.atributos['estado'] = respuesta.status_code
+    return respuesta
+
+@rutas.teardown_app_request
+def terminar_solicitud(error):
+    traza = g.pop('traza', None)
+    if traza is None:
+        return
+    terminar_traza(traza)
+    sumidero = current_app.extensions.get('sumidero_trazas')
+    if traza.muestreada and sumidero is not None:
+        try:
+            sumidero.escribir(traza)
+        except OSError as e:
+            print(f"No se pudo escribir la traza {traza.id_solicitud}: {e}")
+    # Se compara solo la duración del análisis, no la de toda la solicitud, y se guarda
+    # el código tal como se analizó (sin los espacios de los extremos), no el del cuerpo
+    corpus = current_app.extensions['corpus_lento']
+    duracion = g.pop('duracion_analisis', None)
+    codigo = g.pop('codigo_analizado', None)
+    if (corpus is not None and duracion is not None and _ruta_actual() in _rutas_corpus()
+            and duracion > current_app.config['CORPUS_LENTO_UMBRAL']):
+        corpus.capturar(_ruta_actual(), codigo, duracion, traza)
+
+@rutas.app_context_processor
+def utilidades_plantillas():
+    def asset_url(ruta):
+        """URL con huella del asset, o la de /static si no está construido"""
+        construido = manifiesto_assets.ruta(ruta)
+        if construido:
+            return url_for('webia.servir_asset', ruta=construido)
+        return url_for('static', filename=ruta)
+    return {'asset_url': asset_url}
+
+@rutas.route('/assets/<path:ruta>')
+def servir_asset(ruta):
+    """Assets con huella: inmutables, con la variante precomprimida que acepte el cliente"""
+    if not ruta.endswith(('.js', '.css')):
+        abort(404)
+    
+    codificacion, sufijo = None, ''
+    for candidata, extension in (('br', '.br'), ('gzip', '.gz')):
+        comprimido = safe_join(DIRECTORIO_DIST, ruta + extension)
+        if request.accept_encodings.quality(candidata) > 0 and comprimido and os.path.isfile(comprimido):
+            codificacion, sufijo = candidata, extension
+            break
+    
+    respuesta = send_from_directory(DIRECTORIO_DIST, ruta + sufijo, max_age=31536000)
+    respuesta.mimetype = 'text/css' if ruta.endswith('.css') else 'text/javascript'
+    if codificacion:
+        respuesta.headers['Content-Encoding'] = codificacion
+    respuesta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    respuesta.headers['Vary'] = 'Accept-Encoding'
+    return respuesta
+
+@rutas.route('/')
 def index():
     """Página principal"""
     return render_template('index.html')
 
-@app.route('/evaluador')
+@rutas.route('/evaluador')
 def evaluador():
     """Página del evaluador de código"""
     return render_template('evaluador.html')
 
-@app.route('/api/evaluar', methods=['POST'])
+@rutas.route('/api/evaluar', methods=['POST'])
 def evaluar_codigo():
     """Endpoint para evaluar código Python"""
     try:
@@ -50,7 +234,10 @@ def evaluar_codigo():
         
         # Crear evaluador y analizar código
         evaluador = EvaluadorCodigo()
+        inicio = time.perf_counter()
         resultado = evaluador.evaluar_codigo_completo(codigo)
+        g.duracion_analisis = time.perf_counter() - inicio
+        g.codigo_analizado = codigo
         
         return jsonify(resultado)
     
@@ -62,7 +249,7 @@ def evaluar_codigo():
             'score': 0
         }), 500
 
-@app.route('/api/ejecutar', methods=['POST'])
+@rutas.route('/api/ejecutar', methods=['POST'])
 def ejecutar_codigo():
     """Endpoint para ejecutar código Python de forma segura"""
     try:
@@ -76,12 +263,33 @@ def ejecutar_codigo():
                 'success': False
             })
         
+        # Reparto justo de la cola por estudiante dentro de cada dirección (ver EJECUCION_*_DIRECCION)
+        estudiante_id = data.get('estudiante_id')
+        if not isinstance(estudiante_id, (int, str)):
+            estudiante_id = None
+        estudiante = (request.remote_addr, estudiante_id)
+        
+        # Los programas deterministas ya ejecutados no ocupan un lugar en la cola
+        resultado = cache_ejecuciones.obtener(codigo)
+        if resultado is not None:
+            return jsonify(resultado)
+        
         # Crear evaluador y ejecutar código
-        evaluador = EvaluadorCodigo()
-        resultado = evaluador.ejecutar_codigo_seguro(codigo)
+        with current_app.extensions['control_admision'].ejecucion(estudiante, request.remote_addr):
+            evaluador = EvaluadorCodigo()
+            resultado = evaluador.ejecutar_codigo_seguro(codigo, consultar_cache=False)
         
         return jsonify(resultado)
     
+    except LimiteExcedido as e:
+        respuesta = jsonify({
+            'error': str(e),
+            'output': '',
+            'success': False
+        })
+        respuesta.headers['Retry-After'] = str(e.retry_after_segundos)
+        return respuesta, 429
+    
     except Exception as e:
         return jsonify({
             'error': f'Error al ejecutar código: {str(e)}',
@@ -89,69 +297,66 @@ def ejecutar_codigo():
             'success': False
         })
 
-@app.route('/api/ejemplos')
+@rutas.route('/api/ejecucion/estadisticas', methods=['GET'])
+def estadisticas_ejecucion():
+    """Estado de la cola de ejecución, histograma de espera y cache"""
+    estadisticas = current_app.extensions['control_admision'].estadisticas()
+    estadisticas['cache'] = cache_ejecuciones.estadisticas()
+    if sandbox.MODO_EJECUCION == 'fork':
+        from servidor_fork import cliente_fork
+        estadisticas['sandbox'] = cliente_fork.estadisticas()
+    return jsonify(estadisticas)
+
+@rutas.route('/metrics')
+def metricas():
+    """Métricas de todos los workers en formato de texto de Prometheus"""
+    return Response(registro.exportar(), mimetype='text/plain; version=0.0.4')
+
+def _es_admin():
+    """Valida el token de administración (Authorization: Bearer <token>)"""
+    esperado = current_app.config['ADMIN_TOKEN']
+    if not esperado:
+        abort(404)
+    cabecera = request.headers.get('Authorization', '')
+    recibido = cabecera[len('Bearer '):] if cabecera.startswith('Bearer ') else ''
+    return hmac.compare_digest(recibido.encode('utf-8'), esperado.encode('utf-8'))
+
+@rutas.route('/api/admin/perfilar', methods=['POST'])
+def perfilar_worker():
+    """Perfil estadístico de pilas de este worker durante `segundos` (pilas colapsadas)"""
+    if not _es_admin():
+        return jsonify({'error': 'No autorizado'}), 401
+    
+    # Solo administración lo usa: no se carga al arrancar cada worker
+    from perfilador import perfilador, colapsado, PerfilEnCurso, SEGUNDOS_MAXIMOS
+    
+    try:
+        segundos = float(request.args.get('segundos', 10))
+        intervalo = float(request.args.get('intervalo_ms', 5)) / 1000
+    except ValueError:
+        return jsonify({'error': 'segundos e intervalo_ms deben ser números'}), 400
+    if not 0 < segundos <= SEGUNDOS_MAXIMOS or not 0.001 <= intervalo <= 0.1:
+        return jsonify({'error': f'segundos debe estar entre 0 y {SEGUNDOS_MAXIMOS}, '
+                                 'intervalo_ms entre 1 y 100'}), 400
+    
+    try:
+        perfil = perfilador.perfilar(segundos, intervalo, solo_app=request.args.get('todos') != '1')
+    except PerfilEnCurso as e:
+        return jsonify({'error': str(e)}), 409
+    
+    if request.args.get('formato') == 'json':
+        return jsonify(perfil)
+    respuesta = Response(colapsado(perfil), mimetype='text/plain')
+    respuesta.headers['X-Perfil-Pid'] = str(perfil['pid'])
+    respuesta.headers['X-Perfil-Muestras'] = str(perfil['muestras'])
+    return respuesta
+
+@rutas.route('/api/ejemplos')
 def obtener_ejemplos():
     """Endpoint para obtener ejemplos de código"""
-    ejemplos = {
-        'basic': '''def calcular_factorial(n):
-    """
-    Calcula el factorial de un número entero positivo
-    """
-    if n < 0:
-        raise ValueError("El número debe ser positivo")
-    elif n <= 1:
-        return 1
-    else:
-        return n * calcular_factorial(n - 1)
-
-# Ejemplo de uso
-try:
-    numero = 5
-    resultado = calcular_factorial(numero)
-    print(f"El factorial de {numero} es {resultado}")
-except ValueError as e:
-    print(f"Error: {e}")''',
-
-        'loop': '''# Análisis de datos con bucles y condicionales
-import random
-
-def analizar_ventas():
-    meses = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio"]
-    ventas = [random.randint(1000, 5000) for _ in range(len(meses))]
-    total_ventas = sum(ventas)
-    promedio = total_ventas / len(meses)
-    print("📊 REPORTE DE VENTAS")
-    for mes, venta in zip(meses, ventas):
-        print(f"{mes}: ${venta:,}")
-    print(f"Promedio mensual: ${promedio:,.2f}")
-
-resultado = analizar_ventas()
-print(f"✅ Análisis completado: {resultado}")''',
-
-        'class': '''class GestorInventario:
-    """Sistema de gestión de inventario para una tienda"""
-
-    def __init__(self):
-        self.productos = {}
-
-    def agregar_producto(self, nombre, precio, stock=0):
-        self.productos[nombre] = {"precio": precio, "stock": stock}
-        print(f"Producto {nombre} agregado.")
-
-    def mostrar_productos(self):
-        for nombre, datos in self.productos.items():
-            print(f"{nombre}: {datos['stock']} unidades a ${datos['precio']}")
-
-# Demo
-inventario = GestorInventario()
-inventario.agregar_producto("Laptop", 800, 10)
-inventario.agregar_producto("Mouse", 25, 50)
-inventario.mostrar_productos()'''
-    }
-
-    return jsonify(ejemplos)
-
-@app.route('/api/evaluar-ia', methods=['POST'])
+    return respuesta_ejemplos.responder(request)
+
+@rutas.route('/api/evaluar-ia', methods=['POST'])
 def evaluar_con_inteligencia_artificial():
     """Endpoint que usa IA real para evaluación adaptativa"""
     try:
@@ -162,14 +367,17 @@ def evaluar_con_inteligencia_artificial():
             return jsonify({'error': 'Código vacío'}), 400
         
         evaluador = EvaluadorCodigo()
+        inicio = time.perf_counter()
         resultado_ia = evaluador.evaluar_con_ia(codigo)
+        g.duracion_analisis = time.perf_counter() - inicio
+        g.codigo_analizado = codigo
         
         return jsonify(resultado_ia)
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/estudiante/registrar', methods=['POST'])
+@rutas.route('/api/estudiante/registrar', methods=['POST'])
 def registrar_estudiante():
     """Registrar nuevo estudiante"""
     data = request.get_json()
@@ -183,7 +391,7 @@ def registrar_estudiante():
     
     return jsonify(resultado)
 
-@app.route('/api/estudiante/<int:estudiante_id>/progreso', methods=['GET'])
+@rutas.route('/api/estudiante/<int:estudiante_id>/progreso', methods=['GET'])
 def obtener_progreso_estudiante(estudiante_id):
     """Obtener progreso de un estudiante"""
     try:
@@ -198,38 +406,109 @@ def obtener_progreso_estudiante(estudiante_id):
         print(f"Error en progreso: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/estudiantes', methods=['GET'])
+@rutas.route('/api/estudiante/<int:estudiante_id>/historial', methods=['GET'])
+def obtener_historial_estudiante(estudiante_id):
+    """Evaluaciones del estudiante resumidas por día o semana, para gráficos de largo plazo"""
+    granularidad = request.args.get('granularidad', 'dia')
+    if granularidad not in RESUMENES:
+        return jsonify({'error': f"granularidad debe ser {' o '.join(RESUMENES)}"}), 400
+    
+    desde = request.args.get('desde')
+    if desde:
+        try:
+            desde = date.fromisoformat(desde).isoformat()
+        except ValueError:
+            return jsonify({'error': 'desde debe ser una fecha AAAA-MM-DD'}), 400
+    
+    db = DatabaseManager()
+    historial = db.obtener_historial(estudiante_id, granularidad, desde)
+    if historial is None:
+        return jsonify({'error': 'Estudiante no encontrado'}), 404
+    
+    return jsonify({
+        'estudiante_id': estudiante_id,
+        'granularidad': granularidad,
+        'desde': desde,
+        'historial': historial
+    })
+
+@rutas.route('/api/estudiantes', methods=['GET'])
 def listar_todos_estudiantes():
     """Listar todos los estudiantes"""
     db = DatabaseManager()
     estudiantes = db.listar_estudiantes()
     return jsonify(estudiantes)
 
-@app.route('/api/estadisticas', methods=['GET'])
+@rutas.route('/api/estadisticas', methods=['GET'])
 def estadisticas_generales():
     """Estadísticas del sistema"""
     db = DatabaseManager()
     stats = db.obtener_estadisticas_generales()
     return jsonify(stats)
 
-@app.route('/api/ejercicios/<nivel>', methods=['GET'])
+@rutas.route('/api/estadisticas/cohorte', methods=['GET'])
+def estadisticas_cohorte():
+    """Percentiles, histogramas, dispersión por nivel y estudiantes en descenso"""
+    try:
+        from cohorte import estadisticas_cohorte
+    except ImportError:
+        return jsonify({'error': 'Módulo de estadísticas no disponible'}), 503
+    
+    return jsonify(estadisticas_cohorte.obtener())
+
+@rutas.route('/api/analitica/clase', methods=['GET'])
+def analitica_clase():
+    """Distribución de scores, transiciones de nivel y tendencia de la clase, desde la exportación Parquet"""
+    granularidad = request.args.get('granularidad', 'dia')
+    if granularidad not in RESUMENES:
+        return jsonify({'error': f"granularidad debe ser {' o '.join(RESUMENES)}"}), 400
+    
+    limites = {}
+    for clave in ('desde', 'hasta'):
+        valor = request.args.get(clave)
+        try:
+            limites[clave] = date.fromisoformat(valor).isoformat() if valor else None
+        except ValueError:
+            return jsonify({'error': f'{clave} debe ser una fecha AAAA-MM-DD'}), 400
+    
+    from analitica import AnaliticaNoDisponible
+    try:
+        return jsonify(exportador_analitica(current_app).consultar_clase(granularidad=granularidad, **limites))
+    except AnaliticaNoDisponible as e:
+        return jsonify({'error': str(e)}), 503
+
+@rutas.route('/api/ejercicios/buscar', methods=['GET'])
+def buscar_ejercicios():
+    """Búsqueda de ejercicios por texto con filtros de nivel, dificultad y puntos"""
+    try:
+        filtros = {
+            'nivel': {v for v in request.args.get('nivel', '').split(',') if v},
+            'dificultad': {int(v) for v in request.args.get('dificultad', '').split(',') if v},
+            'puntos': {int(v) for v in request.args.get('puntos', '').split(',') if v}
+        }
+        pagina = max(request.args.get('pagina', 1, type=int), 1)
+        por_pagina = min(max(request.args.get('por_pagina', 10, type=int), 1), 100)
+    except ValueError:
+        return jsonify({'error': 'Filtros inválidos: dificultad y puntos deben ser números'}), 400
+    
+    resultado = catalogo.buscar(request.args.get('q', ''), filtros, pagina, por_pagina)
+    return jsonify(resultado)
+
+@rutas.route('/api/ejercicios/<nivel>', methods=['GET'])
 def obtener_ejercicios(nivel):
     """Obtener ejercicios por nivel"""
-    biblioteca = BibliotecaEjercicios()
-    ejercicios = biblioteca.obtener_ejercicios_por_nivel(nivel)
-    return jsonify(ejercicios)
+    return current_app.response_class(catalogo.json_nivel(nivel), mimetype='application/json')
 
-@app.route('/api/ejercicio/<ejercicio_id>', methods=['GET'])
+@rutas.route('/api/ejercicio/<ejercicio_id>', methods=['GET'])
 def obtener_ejercicio_especifico(ejercicio_id):
     """Obtener un ejercicio específico"""
-    biblioteca = BibliotecaEjercicios()
-    ejercicio = biblioteca.obtener_ejercicio(ejercicio_id)
+    ejercicio = catalogo.json_ejercicio(ejercicio_id)
     
     if ejercicio:
-        return jsonify(ejercicio)
+        return current_app.response_class(ejercicio, mimetype='application/json')
     return jsonify({'error': 'Ejercicio no encontrado'}), 404
 
-@app.route('/api/ejercicio/aleatorio/<nivel>', methods=['GET'])
+@rutas.route('/api/ejercicio/aleatorio/<nivel>', methods=['GET'])
 def ejercicio_aleatorio(nivel):
     """Obtener ejercicio aleatorio de un nivel"""
     biblioteca = BibliotecaEjercicios()
@@ -239,32 +518,86 @@ def ejercicio_aleatorio(nivel):
         return jsonify(ejercicio)
     return jsonify({'error': 'No hay ejercicios para ese nivel'}), 404
 
-@app.route('/api/estudiante/<int:estudiante_id>/badges', methods=['GET'])
+@rutas.route('/api/estudiante/<int:estudiante_id>/recomendaciones', methods=['GET'])
+def recomendar_ejercicios_estudiante(estudiante_id):
+    """Ejercicios recomendados según el historial del estudiante"""
+    try:
+        from recomendador import recomendador
+    except ImportError:
+        return jsonify({'error': 'Módulo de recomendaciones no disponible'}), 503
+    
+    k = min(max(request.args.get('k', 5, type=int), 1), 50)
+    db = DatabaseManager()
+    historiales = db.obtener_historial_lote([estudiante_id])
+    
+    if estudiante_id not in historiales:
+        return jsonify({'error': 'Estudiante no encontrado'}), 404
+    
+    recomendaciones = recomendador.recomendar(historiales[estudiante_id], k)
+    return jsonify({'estudiante_id': estudiante_id, 'recomendaciones': recomendaciones})
+
+# Ids por solicitud de /api/recomendaciones (cada uno es un parámetro de la consulta SQL)
+MAX_ESTUDIANTES_LOTE = 900
+
+@rutas.route('/api/recomendaciones', methods=['POST'])
+def recomendar_ejercicios_clase():
+    """Recomendaciones para varios estudiantes (o todos) en un solo lote"""
+    try:
+        from recomendador import recomendador
+    except ImportError:
+        return jsonify({'error': 'Módulo de recomendaciones no disponible'}), 503
+    
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify({'error': 'El cuerpo debe ser un objeto JSON'}), 400
+    
+    k = data.get('k', 5)
+    if not isinstance(k, int) or isinstance(k, bool):
+        return jsonify({'error': 'k debe ser un número entero'}), 400
+    k = min(max(k, 1), 50)
+    
+    # Sin 'estudiantes' se recomienda para todos
+    estudiantes = data.get('estudiantes')
+    if estudiantes is not None and (
+            not isinstance(estudiantes, list) or len(estudiantes) > MAX_ESTUDIANTES_LOTE
+            or not all(isinstance(e, int) and not isinstance(e, bool) for e in estudiantes)):
+        return jsonify({'error': f'estudiantes debe ser una lista de hasta {MAX_ESTUDIANTES_LOTE} ids enteros'}), 400
+    
+    db = DatabaseManager()
+    historiales = db.obtener_historial_lote(estudiantes)
+    recomendaciones = recomendador.recomendar_lote(historiales, k)
+    
+    return jsonify({'recomendaciones': {str(e): r for e, r in recomendaciones.items()}})
+
+@rutas.route('/api/estudiante/<int:estudiante_id>/badges', methods=['GET'])
 def obtener_badges_estudiante(estudiante_id):
     """Obtener badges del estudiante"""
     db = DatabaseManager()
-    badges = db.actualizar_badges(estudiante_id)
+    badges = db.obtener_badges(estudiante_id)
     return jsonify({'badges': badges})
 
-@app.route('/api/badges/todos', methods=['GET'])
+@rutas.route('/api/badges/estadisticas', methods=['GET'])
+def estadisticas_badges():
+    """Cantidad de estudiantes que obtuvo cada badge"""
+    db = DatabaseManager()
+    return jsonify(db.obtener_estadisticas_badges())
+
+@rutas.route('/api/badges/todos', methods=['GET'])
 def listar_todos_badges():
     """Listar todos los badges disponibles"""
-    from badges import SistemaBadges
-    sistema = SistemaBadges()
-    todos = sistema.obtener_todos_badges()
-    return jsonify({'badges': todos})
+    return respuesta_badges.responder(request)
 
-@app.route('/dashboard')
+@rutas.route('/dashboard')
 def dashboard():
     """Dashboard del estudiante"""
     return render_template('dashboard.html')
 
-@app.route('/ejercicios')
+@rutas.route('/ejercicios')
 def ejercicios():
     """Página de ejercicios"""
     return render_template('ejercicios.html')
 
-@app.route('/profesor')
+@rutas.route('/profesor')
 def profesor():
     """Panel del profesor"""
     return render_template('profesor.html')
@@ -272,6 +605,9 @@ def profesor():
 # Ejecutar aplicación
 if __name__ == '__main__':
     print("🌐 Iniciando servidor web...")
+    app = create_app()
+    if app.config['ANALITICA_INTERVALO'] > 0:
+        exportador_analitica(app).iniciar()
     app.run(debug=True, host='0.0.0.0', port=5000)
     
 
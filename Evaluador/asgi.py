@@ -0,0 +1,249 @@
+"""Aplicación ASGI: rutas de lectura asíncronas y el resto delegado a Flask.
+
+Las rutas de lectura del panel (progreso de un estudiante, lista de
+estudiantes y estadísticas generales) solo esperan a SQLite, así que se
+atienden como corrutinas sobre DatabaseAsync: un proceso mantiene miles de
+conexiones abiertas sin un hilo por conexión. El resto de rutas se delega a
+la aplicación Flask con asgiref (opcional) y siguen siendo síncronas.
+
+Uso:
+    uvicorn asgi:app
+    python asgi.py [--host 0.0.0.0] [--puerto 5000]
+
+Sin uvicorn, `python asgi.py` usa un servidor HTTP/1.1 mínimo incluido aquí,
+suficiente para desarrollo y para benchmarks/bench_async.py.
+"""
+import argparse
+import asyncio
+import json
+import re
+from typing import Any, List, Tuple
+
+from database_async import DatabaseAsync
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # asgiref es opcional: sin él solo se sirven las rutas asíncronas
+    WsgiToAsgi = None
+
+RUTA_PROGRESO = re.compile(r'^/api/estudiante/(\d+)/progreso$')
+
+ESTADOS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+           500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+# Cuerpo máximo que acepta el servidor integrado (el mismo MAX_CONTENT_LENGTH de la app Flask)
+MAX_CUERPO = 16 * 1024 * 1024
+
+
+async def responder_json(send, datos: Any, estado: int = 200):
+    """Envía `datos` como JSON, con el mismo formato que jsonify de Flask"""
+    cuerpo = (json.dumps(datos, sort_keys=True, separators=(',', ':')) + '\n').encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': estado,
+        'headers': [(b'content-type', b'application/json'),
+                    (b'content-length', str(len(cuerpo)).encode())]
+    })
+    await send({'type': 'http.response.body', 'body': cuerpo})
+
+
+class AplicacionAsgi:
+    """Enruta las lecturas a corrutinas y el resto a la aplicación WSGI"""
+
+    def __init__(self, db: DatabaseAsync = None, aplicacion_wsgi=None):
+        self._db = db
+        self._wsgi = aplicacion_wsgi
+        self._delegada = None
+
+    @property
+    def db(self) -> DatabaseAsync:
+        if self._db is None:
+            self._db = DatabaseAsync()
+        return self._db
+
+    def _aplicacion_delegada(self):
+        if self._delegada is None and WsgiToAsgi is not None:
+            if self._wsgi is None:
+                from app import create_app
+                self._wsgi = create_app()
+            self._delegada = WsgiToAsgi(self._wsgi)
+        return self._delegada
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._ciclo_de_vida(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if scope['method'] in ('GET', 'HEAD'):
+            ruta = scope['path']
+            coincidencia = RUTA_PROGRESO.match(ruta)
+            if coincidencia:
+                await self.progreso(send, int(coincidencia.group(1)))
+                return
+            if ruta == '/api/estudiantes':
+                await responder_json(send, await self.db.listar_estudiantes())
+                return
+            if ruta == '/api/estadisticas':
+                await responder_json(send, await self.db.obtener_estadisticas_generales())
+                return
+
+        delegada = self._aplicacion_delegada()
+        if delegada is None:
+            await responder_json(send, {'error': 'Ruta síncrona no disponible: instale asgiref'}, 503)
+            return
+        await delegada(scope, receive, send)
+
+    async def progreso(self, send, estudiante_id: int):
+        """Obtener progreso de un estudiante"""
+        try:
+            progreso = await self.db.obtener_progreso(estudiante_id)
+        except Exception as e:
+            print(f"Error en progreso: {e}")
+            await responder_json(send, {'error': str(e)}, 500)
+            return
+        if progreso:
+            await responder_json(send, progreso)
+        else:
+            await responder_json(send, {'error': 'Estudiante no encontrado'}, 404)
+
+    async def _ciclo_de_vida(self, receive, send):
+        while True:
+            mensaje = await receive()
+            if mensaje['type'] == 'lifespan.startup':
+                self.db  # el hilo de la base de datos se crea en el proceso que sirve
+                await send({'type': 'lifespan.startup.complete'})
+            elif mensaje['type'] == 'lifespan.shutdown':
+                if self._db is not None:
+                    self._db.cerrar()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = AplicacionAsgi()
+
+
+async def _rechazar(escritor: asyncio.StreamWriter, estado: int):
+    """Responde un error sin leer el cuerpo; la conexión se cierra a continuación"""
+    escritor.write(f'HTTP/1.1 {estado} {ESTADOS[estado]}\r\ncontent-length: 0\r\n'
+                   'connection: close\r\n\r\n'.encode('latin-1'))
+    await escritor.drain()
+
+
+async def _atender_conexion(aplicacion, lector: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+    """Una conexión HTTP/1.1 con keep-alive; sin cuerpos chunked ni pipelining"""
+    cliente = escritor.get_extra_info('peername')
+    servidor = escritor.get_extra_info('sockname')
+    try:
+        while True:
+            try:
+                cabecera = await lector.readuntil(b'\r\n\r\n')
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                return
+            lineas = cabecera.decode('latin-1').split('\r\n')
+            try:
+                metodo, objetivo, version = lineas[0].split(' ', 2)
+            except ValueError:
+                return
+            cabeceras: List[Tuple[bytes, bytes]] = []
+            for linea in lineas[1:]:
+                if ':' in linea:
+                    nombre, valor = linea.split(':', 1)
+                    cabeceras.append((nombre.strip().lower().encode('latin-1'), valor.strip().encode('latin-1')))
+            indice = dict(cabeceras)
+            largo = indice.get(b'content-length', b'0')
+            if not largo.isdigit():
+                await _rechazar(escritor, 400)
+                return
+            if int(largo) > MAX_CUERPO:
+                await _rechazar(escritor, 413)
+                return
+            try:
+                cuerpo = await lector.readexactly(int(largo))
+            except asyncio.IncompleteReadError:
+                return
+            ruta, _, consulta = objetivo.partition('?')
+
+            scope = {
+                'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': version[5:],
+                'method': metodo, 'scheme': 'http', 'path': ruta, 'raw_path': ruta.encode('latin-1'),
+                'query_string': consulta.encode('latin-1'), 'root_path': '', 'headers': cabeceras,
+                'client': cliente[:2] if cliente else None, 'server': servidor[:2] if servidor else None
+            }
+            pendiente = [{'type': 'http.request', 'body': cuerpo, 'more_body': False}]
+
+            async def receive():
+                if pendiente:
+                    return pendiente.pop()
+                await asyncio.Event().wait()  # no hay desconexión que notificar
+
+            inicio, partes = {}, []
+
+            async def send(mensaje):
+                if mensaje['type'] == 'http.response.start':
+                    inicio.update(mensaje)
+                elif mensaje['type'] == 'http.response.body':
+                    partes.append(mensaje.get('body', b''))
+
+            await aplicacion(scope, receive, send)
+
+            cuerpo_respuesta = b'' if metodo == 'HEAD' else b''.join(partes)
+            estado = inicio.get('status', 500)
+            mantener = indice.get(b'connection', b'').lower() != b'close' and version == 'HTTP/1.1'
+            salida = [f'HTTP/1.1 {estado} {ESTADOS.get(estado, "")}'.encode('latin-1')]
+            salida += [n + b': ' + v for n, v in inicio.get('headers', []) if n.lower() != b'content-length']
+            salida.append(b'content-length: ' + str(len(b''.join(partes))).encode())
+            salida.append(b'connection: ' + (b'keep-alive' if mantener else b'close'))
+            escritor.write(b'\r\n'.join(salida) + b'\r\n\r\n' + cuerpo_respuesta)
+            await escritor.drain()
+            if not mantener:
+                return
+    except ConnectionError:
+        pass
+    finally:
+        escritor.close()
+
+
+async def servir(aplicacion, host: str, puerto: int, backlog: int = 4096):
+    """Servidor HTTP/1.1 mínimo para la aplicación ASGI"""
+    mensajes = asyncio.Queue()
+    await mensajes.put({'type': 'lifespan.startup'})
+    enviados = asyncio.Queue()
+    ciclo = asyncio.create_task(aplicacion({'type': 'lifespan'}, mensajes.get, enviados.put))
+    await enviados.get()
+
+    servidor = await asyncio.start_server(lambda l, e: _atender_conexion(aplicacion, l, e),
+                                          host, puerto, backlog=backlog)
+    print(f"Servidor ASGI en http://{host}:{puerto}")
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await mensajes.put({'type': 'lifespan.shutdown'})
+        await ciclo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--puerto', type=int, default=5000)
+    parser.add_argument('--integrado', action='store_true', help='Usar el servidor mínimo aunque haya uvicorn')
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+
+    if uvicorn is not None and not args.integrado:
+        uvicorn.run(app, host=args.host, port=args.puerto, log_level='warning')
+    else:
+        try:
+            asyncio.run(servir(app, args.host, args.puerto))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
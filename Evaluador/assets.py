@@ -0,0 +1,258 @@
+"""Assets estáticos minificados, con huella de contenido y precomprimidos.
+
+`python assets.py` minifica static/js/*.js y static/css/*.css, los escribe en
+static/dist con el hash del contenido en el nombre (junto a sus variantes .gz
+y, si brotli está instalado, .br) y genera static/dist/manifest.json con la
+correspondencia ruta original -> ruta con huella.
+
+En tiempo de ejecución `asset_url('js/evaluador.js')` usa el manifiesto para
+emitir la URL con huella, que se sirve con caché de un año; sin manifiesto
+(p. ej. en desarrollo sin construir) cae en la ruta normal de /static.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+DIRECTORIO_STATIC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIRECTORIO_DIST = os.path.join(DIRECTORIO_STATIC, 'dist')
+ARCHIVO_MANIFIESTO = 'manifest.json'
+
+# Subdirectorio de static -> extensión de los assets a construir
+ASSETS = {'js': '.js', 'css': '.css'}
+
+# Tras estos caracteres una '/' empieza una expresión regular, no una división
+_ANTES_DE_REGEX = set('(,=:[!&|?{};+-*%<>~^')
+_PALABRAS_ANTES_DE_REGEX = re.compile(r'(?:^|[^\w$])(?:return|typeof|case|do|else|in|of|void|delete|throw)$')
+
+
+def minificar_js(codigo: str) -> str:
+    """Quita comentarios, indentación, espacios finales y líneas vacías.
+
+    Mantiene los saltos de línea (la inserción automática de ';' depende de
+    ellos) y no toca el contenido de strings, template literals ni regex.
+    """
+    salida = []
+    i, n = 0, len(codigo)
+    # Pila de contextos: '`' dentro de un template literal, o un entero con la
+    # profundidad de llaves dentro de un ${...}
+    pila = []
+    inicio_linea = True
+
+    def previo_es_operador():
+        previo = ''.join(salida[-24:]).rstrip()
+        return not previo or previo[-1] in _ANTES_DE_REGEX or _PALABRAS_ANTES_DE_REGEX.search(previo)
+
+    while i < n:
+        c = codigo[i]
+
+        if pila and pila[-1] == '`':
+            # Dentro de un template literal: copiar tal cual hasta ` o ${
+            if c == '\\':
+                salida.append(codigo[i:i + 2])
+                i += 2
+            elif c == '`':
+                pila.pop()
+                salida.append(c)
+                i += 1
+            elif codigo.startswith('${', i):
+                pila.append(0)
+                salida.append('${')
+                i += 2
+            else:
+                salida.append(c)
+                i += 1
+            continue
+
+        if c == '\n':
+            while salida and salida[-1] in (' ', '\t'):
+                salida.pop()
+            if salida and salida[-1] != '\n':
+                salida.append('\n')
+            inicio_linea = True
+            i += 1
+            continue
+
+        if c in ' \t\r':
+            if not inicio_linea:
+                salida.append(c)
+            i += 1
+            continue
+
+        inicio_linea = False
+
+        if codigo.startswith('//', i):
+            fin = codigo.find('\n', i)
+            i = n if fin == -1 else fin
+            continue
+
+        if codigo.startswith('/*', i):
+            fin = codigo.find('*/', i + 2)
+            i = n if fin == -1 else fin + 2
+            continue
+
+        if c in '"\'':
+            j = i + 1
+            while j < n and codigo[j] != c and codigo[j] != '\n':
+                j += 2 if codigo[j] == '\\' else 1
+            salida.append(codigo[i:j + 1])
+            i = j + 1
+            continue
+
+        if c == '`':
+            pila.append('`')
+            salida.append(c)
+            i += 1
+            continue
+
+        if c == '/':
+            if previo_es_operador():
+                j, en_clase = i + 1, False
+                while j < n and codigo[j] != '\n':
+                    if codigo[j] == '\\':
+                        j += 2
+                        continue
+                    if codigo[j] == '[':
+                        en_clase = True
+                    elif codigo[j] == ']':
+                        en_clase = False
+                    elif codigo[j] == '/' and not en_clase:
+                        break
+                    j += 1
+                salida.append(codigo[i:j + 1])
+                i = j + 1
+                continue
+
+        if pila and c == '{':
+            pila[-1] += 1
+        elif pila and c == '}':
+            if pila[-1] == 0:
+                pila.pop()  # fin de ${...}, se vuelve al template literal
+            else:
+                pila[-1] -= 1
+
+        salida.append(c)
+        i += 1
+
+    return ''.join(salida).strip() + '\n'
+
+
+def minificar_css(codigo: str) -> str:
+    """Quita comentarios y espacios innecesarios"""
+    codigo = re.sub(r'/\*.*?\*/', '', codigo, flags=re.S)
+    codigo = re.sub(r'\s+', ' ', codigo)
+    codigo = re.sub(r'\s*([{};,>])\s*', r'\1', codigo)
+    codigo = re.sub(r':\s+', ':', codigo)
+    return codigo.replace(';}', '}').strip() + '\n'
+
+
+MINIFICADORES = {'.js': minificar_js, '.css': minificar_css}
+
+
+def _escribir(ruta: str, datos: bytes):
+    with open(ruta, 'wb') as archivo:
+        archivo.write(datos)
+
+
+def construir(directorio_static: str = DIRECTORIO_STATIC, directorio_dist: str = DIRECTORIO_DIST) -> Dict[str, str]:
+    """Minifica, pone huella y precomprime los assets; retorna el manifiesto"""
+    if os.path.isdir(directorio_dist):
+        shutil.rmtree(directorio_dist)
+
+    manifiesto = {}
+    for subdirectorio, extension in ASSETS.items():
+        origen = os.path.join(directorio_static, subdirectorio)
+        if not os.path.isdir(origen):
+            continue
+        os.makedirs(os.path.join(directorio_dist, subdirectorio), exist_ok=True)
+
+        for nombre in sorted(os.listdir(origen)):
+            if not nombre.endswith(extension):
+                continue
+            with open(os.path.join(origen, nombre), encoding='utf-8') as archivo:
+                contenido = MINIFICADORES[extension](archivo.read()).encode('utf-8')
+
+            huella = hashlib.sha256(contenido).hexdigest()[:12]
+            destino = f"{subdirectorio}/{nombre[:-len(extension)]}.{huella}{extension}"
+            ruta = os.path.join(directorio_dist, destino)
+
+            _escribir(ruta, contenido)
+            _escribir(ruta + '.gz', gzip.compress(contenido, compresslevel=9, mtime=0))
+            if brotli is not None:
+                _escribir(ruta + '.br', brotli.compress(contenido, quality=11))
+            manifiesto[f"{subdirectorio}/{nombre}"] = destino
+
+    with open(os.path.join(directorio_dist, ARCHIVO_MANIFIESTO), 'w', encoding='utf-8') as archivo:
+        json.dump(manifiesto, archivo, indent=2, sort_keys=True)
+    return manifiesto
+
+
+class ManifiestoAssets:
+    """Manifiesto de assets construidos, recargado si cambia en disco"""
+
+    def __init__(self, directorio_dist: str = DIRECTORIO_DIST, intervalo_revision: float = 2.0):
+        self.directorio = directorio_dist
+        self.intervalo_revision = intervalo_revision
+        self._rutas = {}
+        self._firma = None
+        self._ultima_revision = 0.0
+        self._lock = threading.Lock()
+        self.revisar_cambios(forzar=True)
+
+    def revisar_cambios(self, forzar: bool = False):
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultima_revision < self.intervalo_revision:
+            return
+        with self._lock:
+            self._ultima_revision = ahora
+            ruta = os.path.join(self.directorio, ARCHIVO_MANIFIESTO)
+            try:
+                estado = os.stat(ruta)
+            except FileNotFoundError:
+                self._rutas, self._firma = {}, None
+                return
+            firma = (estado.st_mtime_ns, estado.st_size)
+            if firma != self._firma:
+                try:
+                    with open(ruta, encoding='utf-8') as archivo:
+                        self._rutas = json.load(archivo)
+                except (OSError, ValueError) as e:
+                    print(f"Manifiesto de assets inválido: {e}")
+                    self._rutas = {}
+                self._firma = firma
+
+    def ruta(self, asset: str) -> Optional[str]:
+        """Ruta con huella dentro de dist, o None si el asset no está construido"""
+        self.revisar_cambios()
+        return self._rutas.get(asset)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args()
+
+    manifiesto = construir()
+    total = 0
+    for original, destino in sorted(manifiesto.items()):
+        ruta = os.path.join(DIRECTORIO_DIST, destino)
+        tamano_original = os.path.getsize(os.path.join(DIRECTORIO_STATIC, original))
+        tamano = os.path.getsize(ruta)
+        tamano_gz = os.path.getsize(ruta + '.gz')
+        total += tamano_gz
+        print(f"{original:22} -> {destino:34} {tamano_original:7} -> {tamano:7} B (gzip {tamano_gz} B)")
+    print(f"{len(manifiesto)} assets, {total} B comprimidos en total")
+
+
+if __name__ == '__main__':
+    main()
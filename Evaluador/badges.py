@@ -1,91 +1,158 @@
+import argparse
+import operator
+
+# Operadores permitidos en las reglas: función en Python y operador SQL
+OPERADORES = {
+    '>=': (operator.ge, '>='),
+    '>': (operator.gt, '>'),
+    '<=': (operator.le, '<='),
+    '<': (operator.lt, '<'),
+    '==': (operator.eq, '='),
+    '!=': (operator.ne, '!=')
+}
+
+# Campos de la tabla progreso sobre los que se pueden escribir reglas
+CAMPOS_REGLAS = ('evaluaciones_totales', 'funciones_creadas', 'clases_creadas',
+                 'score_maximo', 'score_promedio', 'nivel_actual')
+
+# Campos que nunca bajan: si un badge basado solo en ellos deja de cumplirse es porque
+# cambió su regla. Los demás (promedio, nivel) varían con el progreso normal del
+# estudiante, y sus badges se conservan aunque ya no se cumplan (pasar a avanzado no
+# quita el de intermedio)
+CAMPOS_CRECIENTES = ('evaluaciones_totales', 'funciones_creadas', 'clases_creadas', 'score_maximo')
+
+
 class SistemaBadges:
+    """Badges definidos por reglas declarativas (campo, operador, umbral).
+
+    Un badge se obtiene si se cumplen todas sus reglas. Las mismas reglas se
+    evalúan en Python para un estudiante y se compilan a SQL para recalcular
+    los badges de todos los estudiantes de una vez.
+    """
+    
     def __init__(self):
         self.badges = {
             'primer_codigo': {
                 'nombre': 'Primer Código',
                 'descripcion': 'Evaluaste tu primer código',
                 'icono': '🎯',
-                'criterio': lambda datos: datos['evaluaciones_totales'] >= 1
+                'reglas': [('evaluaciones_totales', '>=', 1)]
             },
             'perfeccionista': {
                 'nombre': 'Perfeccionista',
                 'descripcion': 'Obtuviste un score de 100%',
                 'icono': '⭐',
-                'criterio': lambda datos: datos['score_maximo'] == 100
+                'reglas': [('score_maximo', '==', 100)]
             },
             'persistente': {
                 'nombre': 'Persistente',
                 'descripcion': 'Completaste 10 evaluaciones',
                 'icono': '💪',
-                'criterio': lambda datos: datos['evaluaciones_totales'] >= 10
+                'reglas': [('evaluaciones_totales', '>=', 10)]
             },
             'maestro_funciones': {
                 'nombre': 'Maestro de Funciones',
                 'descripcion': 'Creaste 5 funciones correctamente',
                 'icono': '⚙️',
-                'criterio': lambda datos: datos['funciones_creadas'] >= 5
+                'reglas': [('funciones_creadas', '>=', 5)]
             },
             'oop_expert': {
                 'nombre': 'Experto en OOP',
                 'descripcion': 'Implementaste 3 clases diferentes',
                 'icono': '🏗️',
-                'criterio': lambda datos: datos['clases_creadas'] >= 3
+                'reglas': [('clases_creadas', '>=', 3)]
             },
             'nivel_intermedio': {
                 'nombre': 'Nivel Intermedio',
                 'descripcion': 'Alcanzaste nivel intermedio',
                 'icono': '📈',
-                'criterio': lambda datos: datos['nivel_actual'] == 'intermedio'
+                'reglas': [('nivel_actual', '==', 'intermedio')]
             },
             'nivel_avanzado': {
                 'nombre': 'Nivel Avanzado',
                 'descripcion': 'Alcanzaste nivel avanzado',
                 'icono': '🚀',
-                'criterio': lambda datos: datos['nivel_actual'] == 'avanzado'
+                'reglas': [('nivel_actual', '==', 'avanzado')]
             },
             'dedicado': {
                 'nombre': 'Dedicado',
                 'descripcion': 'Completaste 20 evaluaciones',
                 'icono': '🔥',
-                'criterio': lambda datos: datos['evaluaciones_totales'] >= 20
+                'reglas': [('evaluaciones_totales', '>=', 20)]
             },
             'aprobado': {
                 'nombre': 'Aprobado',
                 'descripcion': 'Obtuviste promedio mayor a 70',
                 'icono': '✅',
-                'criterio': lambda datos: datos.get('score_promedio', 0) >= 70
+                'reglas': [('score_promedio', '>=', 70)]
             }
         }
+        
+        # Campo de progreso -> badges cuyas reglas dependen de él
+        self.dependencias = {}
+        for badge_id, badge_info in self.badges.items():
+            for campo, operador, _ in badge_info['reglas']:
+                if campo not in CAMPOS_REGLAS or operador not in OPERADORES:
+                    raise ValueError(f"Regla inválida en el badge {badge_id}: {campo} {operador}")
+                if badge_id not in self.dependencias.setdefault(campo, []):
+                    self.dependencias[campo].append(badge_id)
+        
+        # Badges que `recalcular --revocar` puede quitar: los de reglas sobre campos crecientes
+        self.revocables = {
+            badge_id for badge_id, badge_info in self.badges.items()
+            if all(campo in CAMPOS_CRECIENTES for campo, _, _ in badge_info['reglas'])
+        }
+    
+    def cumple(self, badge_id, datos_estudiante):
+        """True si los datos del estudiante cumplen todas las reglas del badge"""
+        return all(
+            OPERADORES[operador][0](datos_estudiante[campo], umbral)
+            for campo, operador, umbral in self.badges[badge_id]['reglas']
+        )
+    
+    def condicion_sql(self, badge_id, tabla='progreso'):
+        """Reglas del badge como condición SQL parametrizada: (sql, parámetros)"""
+        condiciones, parametros = [], []
+        for campo, operador, umbral in self.badges[badge_id]['reglas']:
+            condiciones.append(f"{tabla}.{campo} {OPERADORES[operador][1]} ?")
+            parametros.append(umbral)
+        return ' AND '.join(condiciones), parametros
+    
+    def badges_afectados(self, campos_cambiados):
+        """Badges que hay que volver a verificar cuando cambian estos campos"""
+        afectados = []
+        for campo in campos_cambiados:
+            for badge_id in self.dependencias.get(campo, []):
+                if badge_id not in afectados:
+                    afectados.append(badge_id)
+        return afectados
+    
+    def info_badge(self, badge_id):
+        """Datos públicos de un badge"""
+        info = self.badges[badge_id]
+        return {
+            'id': badge_id,
+            'nombre': info['nombre'],
+            'descripcion': info['descripcion'],
+            'icono': info['icono']
+        }
     
-    def verificar_badges(self, datos_estudiante):
-        """Verifica qué badges ha obtenido el estudiante"""
+    def verificar_badges(self, datos_estudiante, candidatos=None):
+        """Verifica qué badges ha obtenido el estudiante (solo los candidatos, si se indican)"""
         badges_obtenidos = []
         
-        for badge_id, badge_info in self.badges.items():
+        for badge_id in (self.badges if candidatos is None else candidatos):
             try:
-                if badge_info['criterio'](datos_estudiante):
-                    badges_obtenidos.append({
-                        'id': badge_id,
-                        'nombre': badge_info['nombre'],
-                        'descripcion': badge_info['descripcion'],
-                        'icono': badge_info['icono']
-                    })
-            except KeyError:
+                if self.cumple(badge_id, datos_estudiante):
+                    badges_obtenidos.append(self.info_badge(badge_id))
+            except (KeyError, TypeError):
                 continue
         
         return badges_obtenidos
     
     def obtener_todos_badges(self):
         """Retorna todos los badges disponibles"""
-        return [
-            {
-                'id': badge_id,
-                'nombre': info['nombre'],
-                'descripcion': info['descripcion'],
-                'icono': info['icono']
-            }
-            for badge_id, info in self.badges.items()
-        ]
+        return [self.info_badge(badge_id) for badge_id in self.badges]
     
     def verificar_nuevo_badge(self, badges_anteriores, badges_actuales):
         """Compara badges y retorna los nuevos obtenidos"""
@@ -95,3 +162,34 @@ class SistemaBadges:
         nuevos_ids = ids_actuales - ids_anteriores
         
         return [b for b in badges_actuales if b['id'] in nuevos_ids]
+
+
+sistema_badges = SistemaBadges()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Administración de badges')
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    
+    recalcular = subcomandos.add_parser('recalcular', help='Recalcula los badges de todos los estudiantes')
+    recalcular.add_argument('badges', nargs='*', help='Badges a recalcular (todos si se omite)')
+    recalcular.add_argument('--revocar', action='store_true',
+                            help='Quita los badges que ya no cumplen su regla (salvo los de nivel y promedio)')
+    recalcular.add_argument('--db', default='./estudiantes.db', help='Ruta de la base de datos')
+    args = parser.parse_args()
+    
+    from database import DatabaseManager
+    
+    if args.comando == 'recalcular':
+        desconocidos = [b for b in args.badges if b not in sistema_badges.badges]
+        if desconocidos:
+            parser.error(f"Badges desconocidos: {', '.join(desconocidos)}")
+        
+        db = DatabaseManager(args.db)
+        resultado = db.recalcular_badges(args.badges or None, revocar=args.revocar)
+        for badge_id, cambios in resultado.items():
+            print(f"{badge_id:20} +{cambios['otorgados']:<8} -{cambios['revocados']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""Presupuesto de arranque en frío de la aplicación WSGI.
+
+Cada medición es un intérprete nuevo que importa app, llama a create_app()
+y atiende una primera solicitud (GET /api/ejemplos), como un worker recién
+creado por el autoescalado. Además comprueba que los subsistemas de uso
+poco frecuente (evaluador IA, recomendador/NumPy, analítica/pyarrow,
+corpus lento, perfilador, servidor de fork) no se carguen al arrancar y,
+con --importtime, muestra los módulos que más tardan en importarse según
+`python -X importtime`.
+
+Sale con código 1 si la mediana supera el presupuesto o si se cargó algún
+módulo perezoso, así puede usarse como prueba en CI.
+
+Uso:
+    python benchmarks/arranque.py [--arranques 10] [--presupuesto-ms 600] [--importtime] [--json salida.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PRESUPUESTO_MS = 600
+
+# Módulos que solo deben cargarse cuando una solicitud (o un worker, en el caso del
+# hilo de analítica) los necesita
+MODULOS_PEREZOSOS = ('numpy', 'pyarrow', 'ia_evaluador', 'recomendador', 'cohorte', 'perfilador',
+                     'servidor_fork', 'corpus_lento', 'analitica')
+
+HIJO = r'''
+import json, sys, time
+inicio = time.perf_counter()
+sys.path.insert(0, {directorio!r})
+import app as modulo
+importado = time.perf_counter()
+aplicacion = modulo.create_app()
+creada = time.perf_counter()
+respuesta = aplicacion.test_client().get('/api/ejemplos')
+atendida = time.perf_counter()
+print(json.dumps({{
+    'importar_ms': (importado - inicio) * 1000,
+    'create_app_ms': (creada - importado) * 1000,
+    'primera_solicitud_ms': (atendida - creada) * 1000,
+    'estado': respuesta.status_code,
+    'perezosos_cargados': [m for m in {perezosos!r} if m in sys.modules],
+}}))
+'''
+
+
+def entorno_hijo():
+    entorno = dict(os.environ)
+    # Como en producción: los .pyc se escriben en el primer arranque y se reutilizan
+    entorno.pop('PYTHONDONTWRITEBYTECODE', None)
+    return entorno
+
+
+def arrancar(directorio_trabajo, argumentos=()):
+    codigo = HIJO.format(directorio=DIRECTORIO_APP, perezosos=MODULOS_PEREZOSOS)
+    inicio = time.perf_counter()
+    proceso = subprocess.run([sys.executable, *argumentos, '-c', codigo], cwd=directorio_trabajo,
+                             env=entorno_hijo(), capture_output=True, text=True, check=True)
+    total_ms = (time.perf_counter() - inicio) * 1000
+    # La aplicación imprime avisos al arrancar; el resultado es la última línea
+    resultado = json.loads(proceso.stdout.strip().splitlines()[-1])
+    resultado['total_ms'] = total_ms
+    return resultado, proceso.stderr
+
+
+def modulos_mas_lentos(stderr, cuantos):
+    """Módulos de primer nivel (importados por app o por el intérprete) por tiempo acumulado"""
+    modulos = []
+    for linea in stderr.splitlines():
+        if not linea.startswith('import time:') or 'cumulative' in linea:
+            continue
+        propio, acumulado, nombre = linea.split(':', 1)[1].split('|')
+        sangria = len(nombre) - len(nombre.lstrip())
+        if sangria <= 3:  # ' app' y sus importaciones directas ('   flask')
+            modulos.append((nombre.strip(), int(propio) / 1000, int(acumulado) / 1000))
+    return sorted(modulos, key=lambda m: -m[2])[:cuantos]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--arranques', type=int, default=10)
+    parser.add_argument('--presupuesto-ms', type=float, default=PRESUPUESTO_MS,
+                        help='Máximo para la mediana desde el intérprete hasta la primera respuesta')
+    parser.add_argument('--importtime', action='store_true', help='Mostrar los módulos más lentos de importar')
+    parser.add_argument('--json', help='Archivo donde guardar los resultados')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        arrancar(directorio)  # escribe los .pyc que falten
+        mediciones = [arrancar(directorio)[0] for _ in range(args.arranques)]
+        importaciones = arrancar(directorio, ('-X', 'importtime'))[1] if args.importtime else None
+
+    resultados = {
+        clave: round(statistics.median(m[clave] for m in mediciones), 1)
+        for clave in ('total_ms', 'importar_ms', 'create_app_ms', 'primera_solicitud_ms')
+    }
+    resultados['presupuesto_ms'] = args.presupuesto_ms
+    resultados['perezosos_cargados'] = sorted({m for medicion in mediciones for m in medicion['perezosos_cargados']})
+    errores = [m['estado'] for m in mediciones if m['estado'] != 200]
+
+    print(f"Arranque en frío, mediana de {args.arranques}:")
+    print(f"  total (intérprete + primera respuesta) {resultados['total_ms']:8.1f} ms"
+          f"   presupuesto {args.presupuesto_ms:.0f} ms")
+    for clave in ('importar_ms', 'create_app_ms', 'primera_solicitud_ms'):
+        print(f"  {clave[:-3]:38} {resultados[clave]:8.1f} ms")
+
+    if importaciones:
+        resultados['importaciones'] = modulos_mas_lentos(importaciones, 15)
+        print("Importaciones más lentas (acumulado / propio):")
+        for nombre, propio, acumulado in resultados['importaciones']:
+            print(f"  {nombre:30} {acumulado:8.1f} ms {propio:8.1f} ms")
+
+    fallos = []
+    if resultados['total_ms'] > args.presupuesto_ms:
+        fallos.append(f"la mediana ({resultados['total_ms']} ms) supera el presupuesto ({args.presupuesto_ms:.0f} ms)")
+    if resultados['perezosos_cargados']:
+        fallos.append(f"se cargaron al arrancar: {', '.join(resultados['perezosos_cargados'])}")
+    if errores:
+        fallos.append(f"la primera solicitud respondió {errores[0]}")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+    for fallo in fallos:
+        print(f"FALLO: {fallo}")
+    if fallos:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+"""Benchmark de las rutas de lectura: Flask con hilos vs. ASGI con corrutinas.
+
+Crea una base de datos temporal con N estudiantes, arranca servidor.py (un
+worker, un hilo por conexión) y asgi.py (un proceso, un hilo de base de
+datos) sobre ella y abre muchas conexiones keep-alive concurrentes que piden
+/api/estudiante/<id>/progreso, /api/estadisticas y /api/estudiantes.
+Reporta throughput, latencias, errores, hilos y memoria máximos del servidor.
+
+Uso:
+    python benchmarks/bench_async.py [--conexiones 100,1000] [--duracion 10] [--json salida.json]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+DIRECTORIO_BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+DIRECTORIO_APP = os.path.dirname(DIRECTORIO_BENCHMARKS)
+sys.path.insert(0, DIRECTORIO_BENCHMARKS)
+sys.path.insert(0, DIRECTORIO_APP)
+
+from bench_badges import poblar
+from carga import percentiles, leer_rss
+from database import DatabaseManager
+
+SERVIDORES = {
+    'sync': lambda puerto: [sys.executable, os.path.join(DIRECTORIO_APP, 'servidor.py'),
+                            '--host', '127.0.0.1', '--puerto', str(puerto), '--workers', '1'],
+    'async': lambda puerto: [sys.executable, os.path.join(DIRECTORIO_APP, 'asgi.py'),
+                             '--host', '127.0.0.1', '--puerto', str(puerto)]
+}
+
+
+def iniciar(comando, puerto, directorio):
+    """Arranca un servidor con la base de datos de `directorio` y espera a que responda"""
+    proceso = subprocess.Popen(comando, cwd=directorio, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{puerto}/api/estadisticas', timeout=1).read()
+            return proceso
+        except Exception:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError('El servidor no respondió a tiempo')
+
+
+def hilos_de(pid):
+    """Hilos de un proceso y de sus hijos directos (los workers)"""
+    def hilos(p):
+        try:
+            with open(f'/proc/{p}/status') as archivo:
+                for linea in archivo:
+                    if linea.startswith('Threads:'):
+                        return int(linea.split()[1])
+        except OSError:
+            return 0
+        return 0
+
+    total = hilos(pid)
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as archivo:
+            total += sum(hilos(int(hijo)) for hijo in archivo.read().split())
+    except OSError:
+        pass
+    return total
+
+
+async def conexion(puerto, rutas, limite, resultados):
+    """Una conexión keep-alive que repite peticiones hasta `limite`"""
+    azar = random.Random()
+    lector = escritor = None
+    while time.monotonic() < limite:
+        ruta = azar.choice(rutas)
+        inicio = time.monotonic()
+        try:
+            if escritor is None:
+                lector, escritor = await asyncio.open_connection('127.0.0.1', puerto)
+            escritor.write(f'GET {ruta} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n'.encode())
+            cabecera = await lector.readuntil(b'\r\n\r\n')
+            estado = int(cabecera.split(b' ', 2)[1])
+            longitud = 0
+            for linea in cabecera.lower().split(b'\r\n'):
+                if linea.startswith(b'content-length:'):
+                    longitud = int(linea.split(b':')[1])
+            await lector.readexactly(longitud)
+            if b'connection: close' in cabecera.lower():
+                escritor.close()
+                lector = escritor = None
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            estado = 'conexion'
+            if escritor is not None:
+                escritor.close()
+            lector = escritor = None
+            await asyncio.sleep(0.05)
+        resultados.append((ruta.split('/')[2] if ruta.count('/') > 2 else ruta, estado, time.monotonic() - inicio))
+    if escritor is not None:
+        escritor.close()
+
+
+async def generar_carga(puerto, rutas, conexiones, duracion, pid):
+    resultados, maximos = [], {'hilos': 0, 'rss_kib': 0}
+    limite = time.monotonic() + duracion
+
+    async def muestrear():
+        while time.monotonic() < limite:
+            maximos['hilos'] = max(maximos['hilos'], hilos_de(pid))
+            maximos['rss_kib'] = max(maximos['rss_kib'], leer_rss(pid))
+            await asyncio.sleep(0.5)
+
+    inicio = time.monotonic()
+    await asyncio.gather(muestrear(), *(conexion(puerto, rutas, limite, resultados) for _ in range(conexiones)))
+    return resultados, time.monotonic() - inicio, maximos
+
+
+def medir(servidor, conexiones, args, directorio, rutas):
+    proceso = iniciar(SERVIDORES[servidor](args.puerto), args.puerto, directorio)
+    try:
+        resultados, duracion, maximos = asyncio.run(
+            generar_carga(args.puerto, rutas, conexiones, args.duracion, proceso.pid))
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+    exitos = [r[2] for r in resultados if r[1] == 200]
+    return {
+        'solicitudes': len(resultados),
+        'throughput_rps': round(len(resultados) / duracion, 2),
+        'tasa_error': round(1 - len(exitos) / len(resultados), 4) if resultados else 0,
+        'latencia': percentiles(exitos),
+        'hilos_max': maximos['hilos'],
+        'rss_max_kib': maximos['rss_kib']
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--conexiones', default='100,1000', help='Conexiones concurrentes a comparar')
+    parser.add_argument('--duracion', type=float, default=10, help='Segundos de carga por configuración')
+    parser.add_argument('--estudiantes', type=int, default=200)
+    parser.add_argument('--sin-lista', action='store_true', help='No pedir /api/estudiantes')
+    parser.add_argument('--puerto', type=int, default=5057)
+    parser.add_argument('--json', help='Archivo donde guardar los resultados')
+    args = parser.parse_args()
+
+    rutas = [f'/api/estudiante/{i}/progreso' for i in range(1, args.estudiantes + 1, max(1, args.estudiantes // 50))]
+    rutas += ['/api/estadisticas'] * 5
+    if not args.sin_lista:
+        rutas += ['/api/estudiantes'] * 5
+
+    resultados = {}
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_db = os.path.join(directorio, 'estudiantes.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            DatabaseManager(ruta_db)
+        poblar(ruta_db, args.estudiantes)
+
+        print(f"{'servidor':>8} {'conex.':>6} {'rps':>9} {'p50 ms':>8} {'p99 ms':>9} {'error':>6} "
+              f"{'hilos':>6} {'RSS MiB':>8}")
+        for conexiones in (int(n) for n in args.conexiones.split(',')):
+            for servidor in SERVIDORES:
+                resumen = medir(servidor, conexiones, args, directorio, rutas)
+                resultados[f'{servidor}-{conexiones}'] = resumen
+                latencia = resumen['latencia']
+                print(f"{servidor:>8} {conexiones:>6} {resumen['throughput_rps']:>9} "
+                      f"{latencia['p50_ms'] or '-':>8} {latencia['p99_ms'] or '-':>9} "
+                      f"{resumen['tasa_error']:>6} {resumen['hilos_max']:>6} "
+                      f"{resumen['rss_max_kib'] / 1024:>8.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Benchmark del recálculo de badges: reglas compiladas a SQL vs. un estudiante a la vez.
+
+Crea una base de datos temporal con N estudiantes y progreso aleatorio,
+recalcula todos los badges con DatabaseManager.recalcular_badges y lo
+compara con llamar a actualizar_badges para cada estudiante (medido sobre
+una muestra y extrapolado).
+
+Uso:
+    python benchmarks/bench_badges.py [--estudiantes 100000] [--muestra 2000] [--json salida.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+
+
+def poblar(ruta, estudiantes, semilla=0):
+    """Inserta estudiantes con progreso aleatorio y sin badges"""
+    azar = random.Random(semilla)
+    niveles = ('principiante', 'intermedio', 'avanzado')
+    ahora = '2025-01-01T00:00:00'
+
+    conn = sqlite3.connect(ruta)
+    conn.executemany(
+        'INSERT INTO estudiantes (id, nombre, fecha_registro) VALUES (?, ?, ?)',
+        ((i, f'estudiante_{i}', ahora) for i in range(1, estudiantes + 1))
+    )
+    conn.executemany(
+        '''INSERT INTO progreso (estudiante_id, evaluaciones_totales, funciones_creadas, clases_creadas,
+                                 score_maximo, score_promedio, nivel_actual, ultima_actividad)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+        (
+            (i, azar.randint(0, 40), azar.randint(0, 12), azar.randint(0, 6),
+             azar.choice((60, 80, 95, 100)), round(azar.uniform(30, 100), 2),
+             azar.choice(niveles), ahora)
+            for i in range(1, estudiantes + 1)
+        )
+    )
+    conn.commit()
+    conn.close()
+
+
+def vaciar_badges(ruta):
+    conn = sqlite3.connect(ruta)
+    conn.execute('DELETE FROM estudiante_badges')
+    conn.commit()
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--estudiantes', type=int, default=100000)
+    parser.add_argument('--muestra', type=int, default=2000,
+                        help='Estudiantes recalculados uno a uno (el resto se extrapola)')
+    parser.add_argument('--json', help='Archivo donde guardar los resultados')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'badges.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = DatabaseManager(ruta)
+
+        inicio = time.perf_counter()
+        poblar(ruta, args.estudiantes)
+        tiempo_poblar = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        cambios = db.recalcular_badges()
+        tiempo_sql = time.perf_counter() - inicio
+        otorgados = sum(c['otorgados'] for c in cambios.values())
+
+        # Segunda pasada: nada nuevo que otorgar
+        inicio = time.perf_counter()
+        db.recalcular_badges(revocar=True)
+        tiempo_sql_repetido = time.perf_counter() - inicio
+
+        vaciar_badges(ruta)
+        muestra = min(args.muestra, args.estudiantes)
+        inicio = time.perf_counter()
+        for estudiante_id in range(1, muestra + 1):
+            db.actualizar_badges(estudiante_id)
+        tiempo_muestra = time.perf_counter() - inicio
+        tiempo_por_estudiante = tiempo_muestra / muestra
+
+    resultados = {
+        'estudiantes': args.estudiantes,
+        'badges_otorgados': otorgados,
+        'poblar_s': round(tiempo_poblar, 3),
+        'sql_s': round(tiempo_sql, 3),
+        'sql_repetido_s': round(tiempo_sql_repetido, 3),
+        'por_estudiante_ms': round(tiempo_por_estudiante * 1000, 4),
+        'por_estudiante_extrapolado_s': round(tiempo_por_estudiante * args.estudiantes, 3)
+    }
+
+    print(f"{args.estudiantes} estudiantes, {otorgados} badges otorgados")
+    print(f"  SQL (INSERT ... SELECT por badge)  {resultados['sql_s']:8.3f} s")
+    print(f"  SQL repetido con revocación        {resultados['sql_repetido_s']:8.3f} s")
+    print(f"  Uno a uno (extrapolado de {muestra})  {resultados['por_estudiante_extrapolado_s']:8.3f} s")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
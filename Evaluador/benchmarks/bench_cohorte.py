@@ -0,0 +1,120 @@
+"""Benchmark de las estadísticas de la cohorte (/api/estadisticas/cohorte).
+
+Crea una base de datos temporal con N estudiantes y M evaluaciones por
+estudiante y mide: la primera carga (todo a arreglos), una consulta con la
+versión ya calculada, la actualización tras unas pocas evaluaciones nuevas
+y, como referencia, obtener_estadisticas_generales.
+
+Uso:
+    python benchmarks/bench_cohorte.py [--estudiantes 50000] [--evaluaciones 20] [--nuevas 50] [--json salida.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from cohorte import EstadisticasCohorte
+from bench_badges import poblar
+
+
+def insertar_evaluaciones(ruta, estudiantes, por_estudiante, semilla=0, desde_dia=0):
+    """Evaluaciones con scores que suben, bajan o se mantienen según el estudiante"""
+    azar = random.Random(semilla)
+    niveles = ('principiante', 'intermedio', 'avanzado')
+    filas = []
+    for i in range(1, estudiantes + 1):
+        base, tendencia = azar.uniform(30, 90), azar.choice((-4, 0, 0, 3))
+        for k in range(por_estudiante):
+            score = max(0, min(100, round(base + tendencia * k + azar.gauss(0, 5))))
+            dia = desde_dia + k
+            filas.append((i, azar.choice(niveles), score, azar.randint(1, 12),
+                          f'2025-{1 + dia // 28:02d}-{1 + dia % 28:02d}T{azar.randint(8, 20):02d}:00:00'))
+    filas.sort(key=lambda f: f[4])
+    conn = sqlite3.connect(ruta)
+    conn.executemany('''INSERT INTO evaluaciones (estudiante_id, nivel_detectado, score, complejidad, fecha)
+                        VALUES (?, ?, ?, ?, ?)''', filas)
+    conn.commit()
+    conn.close()
+
+
+def medir(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return round(statistics.median(tiempos) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--estudiantes', type=int, default=50000)
+    parser.add_argument('--evaluaciones', type=int, default=20, help='Evaluaciones por estudiante')
+    parser.add_argument('--nuevas', type=int, default=50, help='Evaluaciones nuevas entre consultas')
+    parser.add_argument('--json', help='Archivo donde guardar los resultados')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'estudiantes.db')
+        with contextlib.redirect_stdout(io.StringIO()):
+            db = DatabaseManager(ruta)
+        poblar(ruta, args.estudiantes)
+        insertar_evaluaciones(ruta, args.estudiantes, args.evaluaciones)
+
+        cohorte = EstadisticasCohorte(ruta)
+        inicio = time.perf_counter()
+        estadisticas = cohorte.obtener()
+        carga_ms = round((time.perf_counter() - inicio) * 1000, 3)
+
+        cache_ms = medir(cohorte.obtener, 50)
+
+        azar = random.Random(1)
+        conn = sqlite3.connect(ruta)
+
+        def con_nuevas():
+            conn.executemany('INSERT INTO evaluaciones (estudiante_id, score, complejidad, fecha) VALUES (?, ?, ?, ?)',
+                             ((azar.randint(1, args.estudiantes), azar.randint(0, 100), 3, '2026-01-01T00:00:00')
+                              for _ in range(args.nuevas)))
+            conn.commit()
+            inicio = time.perf_counter()
+            cohorte.obtener()
+            return time.perf_counter() - inicio
+
+        incremental_ms = round(statistics.median(con_nuevas() for _ in range(20)) * 1000, 3)
+        conn.close()
+
+        generales_ms = medir(db.obtener_estadisticas_generales, 10)
+
+    resultados = {
+        'estudiantes': args.estudiantes,
+        'evaluaciones': args.estudiantes * args.evaluaciones,
+        'primera_carga_ms': carga_ms,
+        'version_calculada_ms': cache_ms,
+        f'tras_{args.nuevas}_nuevas_ms': incremental_ms,
+        'estadisticas_generales_ms': generales_ms,
+        'en_descenso': estadisticas['en_descenso']['total']
+    }
+    print(f"{args.estudiantes} estudiantes, {resultados['evaluaciones']} evaluaciones "
+          f"({resultados['en_descenso']} en descenso)")
+    print(f"  primera carga                      {carga_ms:9.1f} ms")
+    print(f"  misma versión                      {cache_ms:9.3f} ms")
+    print(f"  tras {args.nuevas} evaluaciones nuevas {incremental_ms:14.1f} ms")
+    print(f"  obtener_estadisticas_generales     {generales_ms:9.1f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
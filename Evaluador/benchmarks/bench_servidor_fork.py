@@ -0,0 +1,89 @@
+"""Benchmark de arranque del sandbox: servidor de fork vs. un intérprete nuevo por ejecución.
+
+Mide la latencia desde que se envía un trabajo hasta la primera instrucción
+del código del estudiante.
+
+Uso:
+    python benchmarks/bench_servidor_fork.py [--ejecuciones 200] [--json salida.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from servidor_fork import ClienteFork
+
+
+def percentiles(muestras):
+    """p50/p95/p99 en milisegundos"""
+    ordenadas = sorted(muestras)
+    def p(q):
+        return round(ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] * 1000, 3)
+    return {'p50_ms': p(0.50), 'p95_ms': p(0.95), 'p99_ms': p(0.99),
+            'media_ms': round(statistics.mean(ordenadas) * 1000, 3)}
+
+
+def medir_servidor_fork(ejecuciones):
+    """Arranque y ida y vuelta de cada trabajo en el zygoto"""
+    cliente = ClienteFork()
+    cliente.iniciar()
+    cliente.ejecutar_trabajo('pass')  # calentar
+
+    arranques, totales = [], []
+    try:
+        for _ in range(ejecuciones):
+            inicio = time.monotonic()
+            respuesta = cliente.ejecutar_trabajo('x = 1')
+            totales.append(time.monotonic() - inicio)
+            arranques.append(respuesta['arranque'])
+    finally:
+        cliente.detener()
+
+    return {'arranque': percentiles(arranques), 'total': percentiles(totales)}
+
+
+def medir_interprete_nuevo(ejecuciones):
+    """Arranque de un intérprete nuevo que importa los mismos módulos"""
+    programa = f"import {', '.join(ClienteFork().modulos)}, time as _t; print(_t.monotonic())"
+    arranques, totales = [], []
+
+    for _ in range(ejecuciones):
+        inicio = time.monotonic()
+        salida = subprocess.run([sys.executable, '-c', programa], capture_output=True, text=True)
+        totales.append(time.monotonic() - inicio)
+        arranques.append(float(salida.stdout) - inicio)
+
+    return {'arranque': percentiles(arranques), 'total': percentiles(totales)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ejecuciones', type=int, default=200)
+    parser.add_argument('--json', help='Archivo donde guardar los resultados')
+    args = parser.parse_args()
+
+    resultados = {
+        'python': sys.version.split()[0],
+        'ejecuciones': args.ejecuciones,
+        'servidor_fork': medir_servidor_fork(args.ejecuciones),
+        'interprete_nuevo': medir_interprete_nuevo(min(args.ejecuciones, 50))
+    }
+
+    for modo in ('servidor_fork', 'interprete_nuevo'):
+        arranque = resultados[modo]['arranque']
+        total = resultados[modo]['total']
+        print(f"{modo:18} arranque p50={arranque['p50_ms']:8.3f} ms  p99={arranque['p99_ms']:8.3f} ms"
+              f"  | total p50={total['p50_ms']:8.3f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
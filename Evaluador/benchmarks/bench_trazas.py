@@ -0,0 +1,126 @@
+"""Benchmark del costo de las trazas: por span y por solicitud a /api/evaluar-ia.
+
+Mide una función vacía sin trazar, con @trazado y con span(), tanto fuera
+de una traza muestreada como dentro, y luego la latencia de /api/evaluar-ia
+(cliente de pruebas de Flask) con muestreo 0 y 1.
+
+Uso:
+    python benchmarks/bench_trazas.py [--llamadas 200000] [--solicitudes 300] [--json salida.json]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_APP)
+
+import trazas
+from trazas import span, trazado, iniciar_traza, terminar_traza
+
+
+def vacia():
+    pass
+
+
+@trazado()
+def vacia_trazada():
+    pass
+
+
+def con_span():
+    with span('vacia'):
+        pass
+
+
+def ns_por_llamada(funcion, llamadas):
+    inicio = time.perf_counter_ns()
+    for _ in range(llamadas):
+        funcion()
+    return (time.perf_counter_ns() - inicio) / llamadas
+
+
+def medir_spans(llamadas):
+    resultados = {}
+    base = ns_por_llamada(vacia, llamadas)
+    for muestreada in (False, True):
+        sufijo = 'muestreada' if muestreada else 'sin_muestrear'
+        for nombre, funcion in (('decorador', vacia_trazada), ('span', con_span)):
+            # Trazas de a lo sumo MAX_SPANS llamadas, como en una solicitud real
+            lote = trazas.MAX_SPANS if muestreada else llamadas
+            total = 0.0
+            for _ in range(max(1, llamadas // lote)):
+                traza = iniciar_traza('bench', muestreo=1.0 if muestreada else 0.0)
+                total += ns_por_llamada(funcion, lote) * lote
+                terminar_traza(traza)
+            resultados[f'{nombre}_{sufijo}_ns'] = round(total / (max(1, llamadas // lote) * lote) - base, 1)
+    resultados['llamada_base_ns'] = round(base, 1)
+    return resultados
+
+
+def medir_solicitudes(solicitudes, codigo):
+    with tempfile.TemporaryDirectory() as directorio:
+        anterior = os.getcwd()
+        os.chdir(directorio)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                from app import create_app
+            resultados = {}
+            for muestreo in (0.0, 1.0):
+                aplicacion = create_app({'TRAZAS_MUESTREO': muestreo,
+                                         'TRAZAS_ARCHIVO': os.path.join(directorio, 'trazas.jsonl')})
+                cliente = aplicacion.test_client()
+                for _ in range(20):
+                    cliente.post('/api/evaluar-ia', json={'codigo': codigo})
+                latencias = []
+                for _ in range(solicitudes):
+                    inicio = time.perf_counter()
+                    cliente.post('/api/evaluar-ia', json={'codigo': codigo})
+                    latencias.append(time.perf_counter() - inicio)
+                latencias.sort()
+                resultados[f'muestreo_{muestreo:g}'] = {
+                    'p50_ms': round(latencias[len(latencias) // 2] * 1000, 3),
+                    'media_ms': round(sum(latencias) / len(latencias) * 1000, 3)
+                }
+            with open(os.path.join(directorio, 'trazas.jsonl'), encoding='utf-8') as archivo:
+                lineas = archivo.readlines()
+            resultados['spans_por_traza'] = len(json.loads(lineas[-1])['spans'])
+            resultados['bytes_por_traza'] = round(sum(map(len, lineas)) / len(lineas))
+        finally:
+            os.chdir(anterior)
+    return resultados
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--llamadas', type=int, default=200000)
+    parser.add_argument('--solicitudes', type=int, default=300)
+    parser.add_argument('--json', help='Archivo donde guardar los resultados')
+    args = parser.parse_args()
+
+    from ejemplos import EJEMPLOS
+    codigo = max(EJEMPLOS.values(), key=len)
+
+    resultados = {'spans': medir_spans(args.llamadas), 'solicitudes': medir_solicitudes(args.solicitudes, codigo)}
+
+    spans = resultados['spans']
+    print(f"Costo adicional por span (llamada base {spans['llamada_base_ns']} ns)")
+    for clave, valor in spans.items():
+        if clave != 'llamada_base_ns':
+            print(f"  {clave[:-3]:28} {valor:8.1f} ns")
+    solicitudes = resultados['solicitudes']
+    print(f"/api/evaluar-ia ({solicitudes['spans_por_traza']} spans, {solicitudes['bytes_por_traza']} B por traza)")
+    for clave in ('muestreo_0', 'muestreo_1'):
+        print(f"  {clave:12} p50 {solicitudes[clave]['p50_ms']:8.3f} ms   media {solicitudes[clave]['media_ms']:8.3f} ms")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
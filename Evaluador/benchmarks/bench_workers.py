@@ -0,0 +1,67 @@
+"""Benchmark del servidor de producción según el número de workers.
+
+Para cada número de workers arranca servidor.py, reproduce el corpus de
+carga.py durante un tiempo fijo y reporta throughput, latencias, tasa de
+error y la memoria (RSS) del maestro y sus workers.
+
+Uso:
+    python benchmarks/bench_workers.py [--workers 1,2,4] [--duracion 15] [--concurrencia 16] [--json salida.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import carga
+
+
+def medir(workers, args):
+    """Carga contra una instancia con `workers` workers; retorna su resumen"""
+    proceso, url = carga.iniciar_servidor(args.puerto, workers)
+    try:
+        corpus = carga.construir_corpus(url)
+        generador = carga.GeneradorCarga(url, corpus, args.endpoints.split(','), args.sin_cache)
+        duracion = generador.ejecutar(args.concurrencia, args.duracion, None, [proceso.pid])
+    finally:
+        # SIGTERM: el maestro drena los workers antes de salir
+        proceso.terminate()
+        proceso.wait()
+
+    resumen = carga.resumir(generador.resultados, duracion, generador.rss)
+    muestras = [m['rss_kib'][str(proceso.pid)] for m in generador.rss]
+    resumen['rss_max_kib'] = max(muestras) if muestras else None
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--workers', default='1,2,4', help='Números de workers a comparar')
+    parser.add_argument('--puerto', type=int, default=5056)
+    parser.add_argument('--endpoints', default='/api/ejecutar,/api/evaluar')
+    parser.add_argument('--concurrencia', type=int, default=16)
+    parser.add_argument('--duracion', type=float, default=15, help='Segundos de carga por configuración')
+    parser.add_argument('--sin-cache', action='store_true', help='Hacer único cada envío para evitar el cache')
+    parser.add_argument('--json', help='Archivo donde guardar los resultados')
+    args = parser.parse_args()
+
+    resultados = {}
+    print(f"{'workers':>7} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'error':>6} {'RSS MiB':>8}")
+    for workers in (int(n) for n in args.workers.split(',')):
+        resumen = medir(workers, args)
+        resultados[workers] = resumen
+        glob = resumen['global']
+        latencia = glob['latencia']
+        rss = resumen['rss_max_kib']
+        print(f"{workers:>7} {glob['throughput_rps']:>8} {latencia['p50_ms'] or '-':>8} "
+              f"{latencia['p95_ms'] or '-':>8} {latencia['p99_ms'] or '-':>8} "
+              f"{glob['tasa_error']:>6} {rss / 1024 if rss else 0:>8.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,322 @@
+"""Generador de carga y prueba de resistencia para /api/ejecutar y /api/evaluar.
+
+Reproduce un corpus formado por las plantillas de BibliotecaEjercicios, los
+ejemplos de /api/ejemplos y programas sintéticos grandes contra una instancia
+local de la aplicación. Reporta throughput, latencias p50/p95/p99, tasas de
+error y la memoria (RSS) de los procesos del servidor a lo largo del tiempo.
+
+Uso:
+    python benchmarks/carga.py --iniciar --duracion 30 --concurrencia 16 --json actual.json
+    python benchmarks/carga.py --url http://localhost:5000 --pid 1234 --comparar base.json
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+
+DIRECTORIO_APP = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DIRECTORIO_APP)
+
+from ejercicios import BibliotecaEjercicios
+
+
+def programa_sintetico(funciones: int, lineas_por_funcion: int) -> str:
+    """Programa grande y válido: muchas funciones con bucles y condicionales"""
+    partes = []
+    for i in range(funciones):
+        cuerpo = [f'def funcion_{i}(datos):', f'    """Función sintética {i}"""', '    total = 0']
+        for j in range(lineas_por_funcion):
+            cuerpo.append(f'    for valor in datos[:{j + 1}]:')
+            cuerpo.append(f'        if valor % {j + 2} == 0:')
+            cuerpo.append(f'            total += valor * {j}')
+        cuerpo.append('    return total')
+        partes.append('\n'.join(cuerpo))
+    partes.append('datos = list(range(50))')
+    partes.append(f'print(funcion_0(datos) + funcion_{funciones - 1}(datos))')
+    return '\n\n'.join(partes)
+
+
+def construir_corpus(url: str):
+    """Corpus de programas: plantillas, ejemplos de la API y sintéticos"""
+    corpus = []
+
+    biblioteca = BibliotecaEjercicios()
+    for nivel in ('principiante', 'intermedio', 'avanzado'):
+        for ejercicio in biblioteca.obtener_ejercicios_por_nivel(nivel):
+            corpus.append((f"plantilla:{ejercicio['id']}", ejercicio['codigo_plantilla']))
+
+    with urllib.request.urlopen(f'{url}/api/ejemplos', timeout=10) as respuesta:
+        for nombre, codigo in json.loads(respuesta.read()).items():
+            corpus.append((f'ejemplo:{nombre}', codigo))
+
+    for funciones, lineas in ((20, 5), (100, 10), (400, 10)):
+        corpus.append((f'sintetico:{funciones}x{lineas}', programa_sintetico(funciones, lineas)))
+
+    return corpus
+
+
+def percentiles(latencias):
+    """p50/p95/p99 y máximo en milisegundos"""
+    if not latencias:
+        return {'p50_ms': None, 'p95_ms': None, 'p99_ms': None, 'max_ms': None}
+    ordenadas = sorted(latencias)
+    def p(q):
+        return round(ordenadas[min(len(ordenadas) - 1, int(q * len(ordenadas)))] * 1000, 2)
+    return {'p50_ms': p(0.50), 'p95_ms': p(0.95), 'p99_ms': p(0.99),
+            'max_ms': round(ordenadas[-1] * 1000, 2)}
+
+
+def leer_rss(pid: int):
+    """RSS en KiB de un proceso y sus hijos directos (p. ej. el zygoto)"""
+    def rss(p):
+        try:
+            with open(f'/proc/{p}/status') as archivo:
+                for linea in archivo:
+                    if linea.startswith('VmRSS:'):
+                        return int(linea.split()[1])
+        except OSError:
+            return 0
+        return 0
+
+    total = rss(pid)
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as archivo:
+            for hijo in archivo.read().split():
+                total += rss(int(hijo))
+    except OSError:
+        pass
+    return total
+
+
+class GeneradorCarga:
+    """Lanza solicitudes concurrentes y acumula sus resultados"""
+
+    def __init__(self, url, corpus, endpoints, sin_cache):
+        self.url = url
+        self.corpus = corpus
+        self.endpoints = endpoints
+        self.sin_cache = sin_cache
+        self.resultados = []  # (endpoint, programa, estado, latencia)
+        self.rss = []
+        self._lock = threading.Lock()
+        self._contador = itertools.count()
+        self._detener = threading.Event()
+
+    def _solicitud(self, numero):
+        endpoint = self.endpoints[numero % len(self.endpoints)]
+        nombre, codigo = self.corpus[(numero // len(self.endpoints)) % len(self.corpus)]
+        if self.sin_cache:
+            codigo = f'{codigo}\n# carga {numero}'
+
+        cuerpo = json.dumps({'codigo': codigo})
+        solicitud = urllib.request.Request(
+            f'{self.url}{endpoint}', data=cuerpo.encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+
+        inicio = time.monotonic()
+        try:
+            with urllib.request.urlopen(solicitud, timeout=60) as respuesta:
+                respuesta.read()
+                estado = respuesta.status
+        except urllib.error.HTTPError as e:
+            estado = e.code
+        except Exception:
+            estado = 'conexion'
+        latencia = time.monotonic() - inicio
+
+        with self._lock:
+            self.resultados.append((endpoint, nombre, estado, latencia))
+
+    def _trabajador(self, limite):
+        while not self._detener.is_set():
+            numero = next(self._contador)
+            if limite is not None and numero >= limite:
+                return
+            self._solicitud(numero)
+
+    def _muestrear_rss(self, pids, inicio, intervalo):
+        while not self._detener.wait(intervalo):
+            self.rss.append({
+                't': round(time.monotonic() - inicio, 2),
+                'rss_kib': {str(pid): leer_rss(pid) for pid in pids}
+            })
+
+    def ejecutar(self, concurrencia, duracion, solicitudes, pids, intervalo_rss=1.0):
+        inicio = time.monotonic()
+        hilos = [threading.Thread(target=self._trabajador, args=(solicitudes,), daemon=True)
+                 for _ in range(concurrencia)]
+        muestreo = threading.Thread(target=self._muestrear_rss, args=(pids, inicio, intervalo_rss), daemon=True)
+
+        if pids:
+            muestreo.start()
+        for hilo in hilos:
+            hilo.start()
+
+        if solicitudes is None:
+            time.sleep(duracion)
+            self._detener.set()
+        for hilo in hilos:
+            hilo.join()
+        self._detener.set()
+
+        return time.monotonic() - inicio
+
+
+def resumir(resultados, duracion, rss):
+    """Resumen global y por endpoint"""
+    def bloque(filas):
+        estados = {}
+        for fila in filas:
+            estados[str(fila[2])] = estados.get(str(fila[2]), 0) + 1
+        exitos = [fila[3] for fila in filas if fila[2] == 200]
+        errores = len(filas) - estados.get('200', 0)
+        return {
+            'solicitudes': len(filas),
+            'throughput_rps': round(len(filas) / duracion, 2) if duracion else 0,
+            'tasa_error': round(errores / len(filas), 4) if filas else 0,
+            'estados': estados,
+            'latencia': percentiles(exitos)
+        }
+
+    endpoints = sorted({fila[0] for fila in resultados})
+    return {
+        'duracion_s': round(duracion, 2),
+        'global': bloque(resultados),
+        'por_endpoint': {e: bloque([f for f in resultados if f[0] == e]) for e in endpoints},
+        'por_programa': {
+            nombre: percentiles([f[3] for f in resultados if f[1] == nombre and f[2] == 200])
+            for nombre in sorted({f[1] for f in resultados})
+        },
+        'rss': rss
+    }
+
+
+def comparar(actual, base):
+    """Imprime la variación de las métricas principales respecto de una corrida base"""
+    print('\nComparación con la corrida base:')
+    secciones = [('global', actual['global'], base.get('global'))]
+    secciones += [(endpoint, datos, base.get('por_endpoint', {}).get(endpoint))
+                  for endpoint, datos in actual['por_endpoint'].items()]
+
+    for nombre_seccion, a, b in secciones:
+        if not b:
+            continue
+        print(f'  {nombre_seccion}')
+        filas = [('throughput_rps', a['throughput_rps'], b['throughput_rps']),
+                 ('tasa_error', a['tasa_error'], b['tasa_error'])]
+        filas += [(p, a['latencia'][p], b['latencia'][p]) for p in ('p50_ms', 'p95_ms', 'p99_ms')]
+        for nombre, valor, referencia in filas:
+            if valor is None or not referencia:
+                continue
+            cambio = (valor - referencia) / referencia * 100
+            print(f'    {nombre:15} {referencia:>10} -> {valor:>10}  ({cambio:+.1f}%)')
+
+
+def servir(puerto):
+    """Sirve la aplicación sin depurador ni recargador, para medirla"""
+    os.chdir(DIRECTORIO_APP)
+    from app import create_app
+    create_app().run(host='127.0.0.1', port=puerto, debug=False, threaded=True, use_reloader=False)
+
+
+def iniciar_servidor(puerto, workers=None):
+    """Arranca la aplicación en un subproceso y espera a que responda.
+
+    Con `workers` usa el servidor de producción (servidor.py) con ese número
+    de workers; si no, el servidor de desarrollo en un solo proceso.
+    """
+    if workers:
+        comando = [sys.executable, os.path.join(DIRECTORIO_APP, 'servidor.py'),
+                   '--host', '127.0.0.1', '--puerto', str(puerto), '--workers', str(workers)]
+    else:
+        comando = [sys.executable, os.path.abspath(__file__), '--servir', str(puerto)]
+    # Toda la carga sale de una sola dirección: el límite por cliente no debe frenarla
+    entorno = dict(os.environ, WEBIA_EJECUCION_RAFAGA='1000000', WEBIA_EJECUCION_TASA='1000000',
+                   WEBIA_EJECUCION_RAFAGA_DIRECCION='1000000', WEBIA_EJECUCION_TASA_DIRECCION='1000000')
+    proceso = subprocess.Popen(comando, cwd=DIRECTORIO_APP, env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{puerto}'
+    limite = time.monotonic() + 30
+    while time.monotonic() < limite:
+        try:
+            urllib.request.urlopen(f'{url}/api/ejemplos', timeout=1).read()
+            return proceso, url
+        except Exception:
+            time.sleep(0.2)
+    proceso.terminate()
+    raise RuntimeError('La aplicación no respondió a tiempo')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://127.0.0.1:5000')
+    parser.add_argument('--iniciar', action='store_true', help='Arrancar una instancia local de la app')
+    parser.add_argument('--puerto', type=int, default=5055, help='Puerto de la instancia de --iniciar')
+    parser.add_argument('--workers', type=int, help='Con --iniciar, usar servidor.py con N workers')
+    parser.add_argument('--servir', type=int, help=argparse.SUPPRESS)
+    parser.add_argument('--endpoints', default='/api/ejecutar,/api/evaluar')
+    parser.add_argument('--concurrencia', type=int, default=8)
+    parser.add_argument('--duracion', type=float, default=20, help='Segundos de carga')
+    parser.add_argument('--solicitudes', type=int, help='Número fijo de solicitudes (ignora --duracion)')
+    parser.add_argument('--sin-cache', action='store_true', help='Hacer único cada envío para evitar el cache')
+    parser.add_argument('--pid', type=int, action='append', default=[], help='PID del servidor a muestrear')
+    parser.add_argument('--json', help='Archivo donde guardar el resultado')
+    parser.add_argument('--comparar', help='Resultado JSON de una corrida base')
+    args = parser.parse_args()
+
+    if args.servir:
+        servir(args.servir)
+        return
+
+    proceso = None
+    url = args.url.rstrip('/')
+    if args.iniciar:
+        proceso, url = iniciar_servidor(args.puerto, args.workers)
+        args.pid.append(proceso.pid)
+
+    try:
+        corpus = construir_corpus(url)
+        generador = GeneradorCarga(url, corpus, args.endpoints.split(','), args.sin_cache)
+        duracion = generador.ejecutar(args.concurrencia, args.duracion, args.solicitudes, args.pid)
+    finally:
+        if proceso is not None:
+            proceso.terminate()
+            proceso.wait()
+
+    resumen = resumir(generador.resultados, duracion, generador.rss)
+    resumen['configuracion'] = {
+        'concurrencia': args.concurrencia,
+        'endpoints': args.endpoints.split(','),
+        'corpus': [nombre for nombre, _ in corpus],
+        'sin_cache': args.sin_cache
+    }
+
+    glob = resumen['global']
+    print(f"{glob['solicitudes']} solicitudes en {resumen['duracion_s']} s "
+          f"({glob['throughput_rps']} req/s), tasa de error {glob['tasa_error']:.2%}")
+    for endpoint, datos in resumen['por_endpoint'].items():
+        latencia = datos['latencia']
+        print(f"  {endpoint:15} {datos['throughput_rps']:8} req/s  p50={latencia['p50_ms']} ms  "
+              f"p95={latencia['p95_ms']} ms  p99={latencia['p99_ms']} ms  estados={datos['estados']}")
+    if resumen['rss']:
+        ultimo = resumen['rss'][-1]['rss_kib']
+        print(f"  RSS final (KiB): {ultimo}")
+
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resumen, archivo, indent=2)
+
+    if args.comparar:
+        with open(args.comparar) as archivo:
+            comparar(resumen, json.load(archivo))
+
+
+if __name__ == '__main__':
+    main()
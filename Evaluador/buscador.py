@@ -0,0 +1,189 @@
+import bisect
+import math
+import re
+import threading
+import unicodedata
+from typing import Dict, Any, List, Optional
+
+# Peso de cada campo de texto en el ranking
+CAMPOS_TEXTO = {'titulo': 3.0, 'descripcion': 1.5, 'pistas': 1.0}
+
+# Campos por los que se puede filtrar y contar (facetas)
+CAMPOS_FACETA = ('nivel', 'dificultad', 'puntos')
+
+PALABRAS_VACIAS = frozenset({
+    'a', 'al', 'con', 'de', 'del', 'dos', 'el', 'en', 'es', 'la', 'las', 'lo', 'los',
+    'para', 'por', 'que', 'se', 'si', 'su', 'un', 'una', 'y', 'o', 'tu', 'no', 'debe'
+})
+
+PATRON_PALABRA = re.compile(r'\w+')
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas y sin tildes"""
+    descompuesto = unicodedata.normalize('NFKD', texto.lower())
+    return ''.join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> List[str]:
+    """Divide un texto en términos normalizados, sin palabras vacías"""
+    return [t for t in PATRON_PALABRA.findall(normalizar(texto)) if t not in PALABRAS_VACIAS]
+
+
+def _orden_faceta(item):
+    """Orden de los valores de una faceta: primero None (documentos sin el campo), luego
+    números y luego textos, sin comparar tipos distintos entre sí"""
+    valor = item[0]
+    return (valor is not None, isinstance(valor, str), valor)
+
+
+class IndiceBusqueda:
+    """Índice invertido en memoria con ranking BM25 y facetas.
+
+    Los documentos se agregan y eliminan de a uno, así que el índice se
+    mantiene al día a medida que cambia el catálogo.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self._postings = {}    # término -> {id: frecuencia ponderada}
+        self._terminos = {}    # id -> {término: frecuencia ponderada}
+        self._longitudes = {}  # id -> longitud ponderada del documento
+        self._facetas = {}     # id -> {campo: valor}
+        self._orden = {}       # id -> clave de orden cuando no hay consulta
+        self._vocabulario = None
+        self._longitud_total = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._terminos)
+
+    def agregar(self, doc_id: str, documento: Dict[str, Any], orden=None):
+        """Indexa (o reindexa) un documento"""
+        frecuencias = {}
+        for campo, peso in CAMPOS_TEXTO.items():
+            valor = documento.get(campo) or ''
+            if isinstance(valor, (list, tuple)):
+                valor = ' '.join(valor)
+            for termino in tokenizar(valor):
+                frecuencias[termino] = frecuencias.get(termino, 0.0) + peso
+
+        with self._lock:
+            self.eliminar(doc_id)
+            for termino, frecuencia in frecuencias.items():
+                self._postings.setdefault(termino, {})[doc_id] = frecuencia
+            self._terminos[doc_id] = frecuencias
+            self._longitudes[doc_id] = sum(frecuencias.values())
+            self._longitud_total += self._longitudes[doc_id]
+            self._facetas[doc_id] = {campo: documento.get(campo) for campo in CAMPOS_FACETA}
+            self._orden[doc_id] = orden if orden is not None else doc_id
+            self._vocabulario = None
+
+    def eliminar(self, doc_id: str):
+        """Quita un documento del índice"""
+        with self._lock:
+            frecuencias = self._terminos.pop(doc_id, None)
+            if frecuencias is None:
+                return
+            for termino in frecuencias:
+                documentos = self._postings[termino]
+                documentos.pop(doc_id, None)
+                if not documentos:
+                    del self._postings[termino]
+            self._longitud_total -= self._longitudes.pop(doc_id)
+            self._facetas.pop(doc_id, None)
+            self._orden.pop(doc_id, None)
+            self._vocabulario = None
+
+    def _expandir(self, termino: str, prefijo: bool) -> List[str]:
+        """El término exacto o, si es prefijo, todos los que empiezan con él"""
+        if not prefijo or len(termino) < 3:
+            return [termino] if termino in self._postings else []
+        if self._vocabulario is None:
+            self._vocabulario = sorted(self._postings)
+        inicio = bisect.bisect_left(self._vocabulario, termino)
+        encontrados = []
+        for candidato in self._vocabulario[inicio:]:
+            if not candidato.startswith(termino):
+                break
+            encontrados.append(candidato)
+        return encontrados
+
+    def _puntuar(self, consulta: str) -> Optional[Dict[str, float]]:
+        """Puntuación BM25 por documento; None si la consulta está vacía"""
+        terminos = tokenizar(consulta)
+        if not terminos:
+            return None
+
+        total_docs = len(self._terminos)
+        longitud_media = self._longitud_total / total_docs if total_docs else 0
+        puntuaciones = {}
+
+        for posicion, termino in enumerate(terminos):
+            # El último término se trata como prefijo (búsqueda mientras se escribe)
+            coincidencias = {}
+            for variante in self._expandir(termino, prefijo=posicion == len(terminos) - 1):
+                for doc_id, frecuencia in self._postings[variante].items():
+                    coincidencias[doc_id] = max(coincidencias.get(doc_id, 0.0), frecuencia)
+
+            if not coincidencias:
+                return {}
+
+            idf = math.log(1 + (total_docs - len(coincidencias) + 0.5) / (len(coincidencias) + 0.5))
+            siguientes = {}
+            for doc_id, frecuencia in coincidencias.items():
+                if posicion and doc_id not in puntuaciones:
+                    continue  # todos los términos deben aparecer
+                normalizacion = self.K1 * (1 - self.B + self.B * self._longitudes[doc_id] / longitud_media)
+                siguientes[doc_id] = puntuaciones.get(doc_id, 0.0) + \
+                    idf * frecuencia * (self.K1 + 1) / (frecuencia + normalizacion)
+            puntuaciones = siguientes
+
+        return puntuaciones
+
+    def buscar(self, consulta: str = '', filtros: Dict[str, set] = None,
+               pagina: int = 1, por_pagina: int = 10) -> Dict[str, Any]:
+        """Resultados rankeados y paginados, con conteos por faceta"""
+        filtros = {campo: set(valores) for campo, valores in (filtros or {}).items() if valores}
+
+        with self._lock:
+            puntuaciones = self._puntuar(consulta)
+            if puntuaciones is None:
+                puntuaciones = dict.fromkeys(self._terminos, 0.0)
+
+            # Cada faceta se cuenta ignorando su propio filtro, para poder ampliar la selección
+            facetas = {campo: {} for campo in CAMPOS_FACETA}
+            coincidencias = []
+            for doc_id in puntuaciones:
+                valores = self._facetas[doc_id]
+                fallidos = [campo for campo, permitidos in filtros.items() if valores.get(campo) not in permitidos]
+                if not fallidos:
+                    coincidencias.append(doc_id)
+                    contar = CAMPOS_FACETA
+                elif len(fallidos) == 1:
+                    contar = fallidos
+                else:
+                    continue
+                for campo in contar:
+                    conteos = facetas[campo]
+                    conteos[valores.get(campo)] = conteos.get(valores.get(campo), 0) + 1
+
+            coincidencias.sort(key=lambda d: (-puntuaciones[d], self._orden[d]))
+
+        inicio = (pagina - 1) * por_pagina
+        return {
+            'total': len(coincidencias),
+            'pagina': pagina,
+            'por_pagina': por_pagina,
+            'resultados': [
+                {'id': doc_id, 'puntuacion': round(puntuaciones[doc_id], 4)}
+                for doc_id in coincidencias[inicio:inicio + por_pagina]
+            ],
+            'facetas': {
+                campo: [{'valor': valor, 'conteo': conteo}
+                        for valor, conteo in sorted(conteos.items(), key=_orden_faceta)]
+                for campo, conteos in facetas.items()
+            }
+        }
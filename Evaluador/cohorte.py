@@ -0,0 +1,283 @@
+"""Estadísticas de la cohorte para el panel del profesor, calculadas con NumPy.
+
+El progreso de todos los estudiantes y sus últimas K_RECIENTES evaluaciones
+se cargan una vez en arreglos; a partir de ahí cada cambio en los datos
+solo trae las evaluaciones nuevas y el progreso de sus estudiantes. El
+resultado se guarda por versión de los datos (último id de evaluaciones y
+de estudiantes): mientras no haya evaluaciones ni estudiantes nuevos, las
+consultas no tocan la base de datos más allá de leer esa versión.
+"""
+import itertools
+import sqlite3
+import threading
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from database import DatabaseManager
+from ejercicios import NIVELES
+from metricas import CONSULTAS_CACHE
+
+# Evaluaciones recientes por estudiante con las que se mide la tendencia
+K_RECIENTES = 10
+MIN_EVALUACIONES_TENDENCIA = 4
+
+# Pendiente (puntos de score por evaluación) a partir de la cual un estudiante está en descenso
+PENDIENTE_DESCENSO = -2.0
+MAX_EN_DESCENSO = 50
+
+# Con más evaluaciones nuevas que esto se recarga todo en vez de actualizar
+MAX_INCREMENTAL = 5000
+
+PERCENTILES = (10, 25, 50, 75, 90)
+ANCHO_INTERVALO_SCORE = 10
+
+
+def resumen(valores: np.ndarray) -> Dict[str, Any]:
+    """Media, desviación, extremos y percentiles de un arreglo"""
+    if not len(valores):
+        return {'cantidad': 0}
+    # Un solo ordenamiento para todos los percentiles (interpolación lineal, como np.percentile)
+    ordenados = np.sort(valores)
+    posiciones = np.array(PERCENTILES) / 100 * (len(ordenados) - 1)
+    abajo = np.floor(posiciones).astype(np.int64)
+    arriba = np.minimum(abajo + 1, len(ordenados) - 1)
+    percentiles = ordenados[abajo] + (ordenados[arriba] - ordenados[abajo]) * (posiciones - abajo)
+    return {
+        'cantidad': int(len(ordenados)),
+        'media': round(float(ordenados.mean()), 2),
+        'desviacion': round(float(ordenados.std()), 2),
+        'minimo': round(float(ordenados[0]), 2),
+        'maximo': round(float(ordenados[-1]), 2),
+        'percentiles': {f'p{p}': round(float(v), 2) for p, v in zip(PERCENTILES, percentiles)}
+    }
+
+
+def histograma_scores(valores: np.ndarray):
+    """Cantidad por intervalo de score (0-9, ..., 90-100)"""
+    intervalos = np.minimum(np.clip(valores, 0, 100) // ANCHO_INTERVALO_SCORE,
+                            100 // ANCHO_INTERVALO_SCORE - 1).astype(np.int64)
+    return [{'desde': i * ANCHO_INTERVALO_SCORE, 'cantidad': int(c)}
+            for i, c in enumerate(np.bincount(intervalos, minlength=100 // ANCHO_INTERVALO_SCORE))]
+
+
+def pendientes(recientes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Pendiente de mínimos cuadrados de cada fila (NaN = sin evaluación) y evaluaciones por fila"""
+    validos = ~np.isnan(recientes)
+    cantidad = validos.sum(axis=1)
+    x = np.broadcast_to(np.arange(recientes.shape[1], dtype=np.float64), recientes.shape)
+    y = np.where(validos, recientes, 0.0)
+    con_datos = np.maximum(cantidad, 1)
+    media_x = (x * validos).sum(axis=1) / con_datos
+    media_y = y.sum(axis=1) / con_datos
+    dx = np.where(validos, x - media_x[:, None], 0.0)
+    varianza = (dx * dx).sum(axis=1)
+    covarianza = (dx * (y - media_y[:, None])).sum(axis=1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(varianza > 0, covarianza / varianza, 0.0), cantidad
+
+
+class EstadisticasCohorte:
+    """Arreglos del progreso y las evaluaciones recientes, y estadísticas por versión de los datos"""
+
+    def __init__(self, db_path: str = './estudiantes.db'):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._version = None
+        self._resultado = None
+        self._datos = None
+        self._esquema_listo = False
+
+    @staticmethod
+    def _leer_version(cursor) -> Tuple[int, int]:
+        cursor.execute('''
+            SELECT (SELECT COALESCE(MAX(id), 0) FROM evaluaciones),
+                   (SELECT COALESCE(MAX(id), 0) FROM estudiantes)
+        ''')
+        return tuple(cursor.fetchone())
+
+    @staticmethod
+    def _leer_progreso(cursor, filtro: str = '', parametros=()):
+        cursor.execute(f'''
+            SELECT estudiante_id, evaluaciones_totales, score_promedio, score_maximo, nivel_actual
+            FROM progreso {filtro}
+            ORDER BY estudiante_id
+        ''', parametros)
+        return cursor.fetchall()
+
+    @staticmethod
+    def _codigos_nivel(datos, nombres) -> np.ndarray:
+        """Índice de cada nivel en datos['niveles'], que crece si aparece uno desconocido"""
+        niveles = datos['niveles']
+        codigos = []
+        for nombre in nombres:
+            nombre = nombre or 'principiante'
+            if nombre not in niveles:
+                niveles.append(nombre)
+            codigos.append(niveles.index(nombre))
+        return np.array(codigos, dtype=np.int64)
+
+    def _cargar(self, cursor, version) -> Dict[str, Any]:
+        """Progreso de todos los estudiantes y sus últimas evaluaciones, en arreglos"""
+        filas = self._leer_progreso(cursor)
+        columnas = list(zip(*filas)) or [()] * 5
+        ids = np.array(columnas[0], dtype=np.int64)
+        posicion = np.full(version[1] + 1, -1, dtype=np.int64)
+        posicion[ids] = np.arange(len(ids))
+
+        datos = {
+            'ids': ids,
+            'posicion': posicion,
+            'evaluaciones': np.array(columnas[1], dtype=np.int64),
+            'score_promedio': np.array(columnas[2], dtype=np.float64),
+            'score_maximo': np.array(columnas[3], dtype=np.float64),
+            'niveles': list(NIVELES),
+            'recientes': np.full((len(ids), K_RECIENTES), np.nan)
+        }
+        datos['nivel'] = self._codigos_nivel(datos, columnas[4])
+
+        # Todas las evaluaciones en orden de id (el de la tabla, sin ordenar) directo a un arreglo
+        cursor.execute('SELECT estudiante_id, COALESCE(score, 0) FROM evaluaciones WHERE id <= ?', (version[0],))
+        pares = np.fromiter(itertools.chain.from_iterable(cursor), dtype=np.int64).reshape(-1, 2)
+
+        # Últimas K de cada estudiante, alineadas a la derecha (la más nueva al final): tras
+        # agrupar por estudiante, la distancia al final de su grupo da la columna
+        orden = np.argsort(pares[:, 0], kind='stable')
+        estudiante, score = pares[orden, 0], pares[orden, 1]
+        ultimo_del_grupo = np.r_[estudiante[1:] != estudiante[:-1], True] if len(estudiante) else np.array([], bool)
+        fin = np.flatnonzero(ultimo_del_grupo)
+        desde_el_final = np.repeat(fin, np.diff(np.r_[-1, fin])) - np.arange(len(estudiante))
+        fila = posicion[np.minimum(estudiante, version[1])]
+        usar = (desde_el_final < K_RECIENTES) & (fila >= 0)
+        datos['recientes'][fila[usar], K_RECIENTES - 1 - desde_el_final[usar]] = score[usar]
+        return datos
+
+    def _actualizar(self, cursor, datos, anterior, version) -> bool:
+        """Aplica las evaluaciones y estudiantes nuevos; False si conviene recargar todo"""
+        cursor.execute('SELECT estudiante_id, COALESCE(score, 0) FROM evaluaciones WHERE id > ? ORDER BY id',
+                       (anterior[0],))
+        nuevas = cursor.fetchall()
+        if len(nuevas) > MAX_INCREMENTAL:
+            return False
+
+        # Estudiantes nuevos: se agregan al final
+        if version[1] > anterior[1]:
+            filas = self._leer_progreso(cursor, 'WHERE estudiante_id > ?', (anterior[1],))
+            if filas:
+                columnas = list(zip(*filas))
+                datos['ids'] = np.concatenate([datos['ids'], np.array(columnas[0], dtype=np.int64)])
+                for clave, indice, tipo in (('evaluaciones', 1, np.int64), ('score_promedio', 2, np.float64),
+                                            ('score_maximo', 3, np.float64)):
+                    datos[clave] = np.concatenate([datos[clave], np.array(columnas[indice], dtype=tipo)])
+                datos['nivel'] = np.concatenate([datos['nivel'], self._codigos_nivel(datos, columnas[4])])
+                datos['recientes'] = np.vstack([datos['recientes'], np.full((len(filas), K_RECIENTES), np.nan)])
+            datos['posicion'] = np.full(version[1] + 1, -1, dtype=np.int64)
+            datos['posicion'][datos['ids']] = np.arange(len(datos['ids']))
+
+        # Evaluaciones nuevas: desplazan las recientes y cambian el progreso de su estudiante
+        recientes, posicion = datos['recientes'], datos['posicion']
+        afectados = []
+        for estudiante_id, score in nuevas:
+            fila = posicion[estudiante_id] if estudiante_id < len(posicion) else -1
+            if fila < 0:
+                continue
+            recientes[fila, :-1] = recientes[fila, 1:]
+            recientes[fila, -1] = score
+            afectados.append(estudiante_id)
+
+        afectados = sorted(set(afectados))
+        for i in range(0, len(afectados), 900):
+            lote = afectados[i:i + 900]
+            for estudiante_id, evaluaciones, promedio, maximo, nivel in self._leer_progreso(
+                    cursor, f"WHERE estudiante_id IN ({','.join('?' * len(lote))})", lote):
+                fila = posicion[estudiante_id]
+                datos['evaluaciones'][fila] = evaluaciones
+                datos['score_promedio'][fila] = promedio
+                datos['score_maximo'][fila] = maximo
+                datos['nivel'][fila] = self._codigos_nivel(datos, [nivel])[0]
+        return True
+
+    def _calcular(self, datos, cursor, version) -> Dict[str, Any]:
+        activos = datos['evaluaciones'] > 0
+        promedio = datos['score_promedio'][activos]
+        nivel = datos['nivel'][activos]
+        niveles = datos['niveles']
+        por_nivel = {niveles[codigo]: resumen(promedio[nivel == codigo])
+                     for codigo in np.flatnonzero(np.bincount(nivel, minlength=len(niveles)))}
+
+        # Estudiantes en descenso: pendiente negativa en sus últimas evaluaciones
+        pendiente, cantidad = pendientes(datos['recientes'])
+        en_descenso = np.flatnonzero((cantidad >= MIN_EVALUACIONES_TENDENCIA) & (pendiente <= PENDIENTE_DESCENSO))
+        listados = en_descenso[np.argsort(pendiente[en_descenso], kind='stable')][:MAX_EN_DESCENSO]
+        nombres = {}
+        if len(listados):
+            ids = datos['ids'][listados].tolist()
+            cursor.execute(f"SELECT id, nombre FROM estudiantes WHERE id IN ({','.join('?' * len(ids))})", ids)
+            nombres = dict(cursor.fetchall())
+        recientes = datos['recientes']
+
+        return {
+            'version': {'evaluacion': version[0], 'estudiante': version[1]},
+            'estudiantes': int(len(datos['ids'])),
+            'estudiantes_activos': int(activos.sum()),
+            'evaluaciones': int(datos['evaluaciones'].sum()),
+            'score_promedio': dict(resumen(promedio), histograma=histograma_scores(promedio)),
+            'score_maximo': resumen(datos['score_maximo'][activos]),
+            'evaluaciones_por_estudiante': resumen(datos['evaluaciones'][activos].astype(np.float64)),
+            'por_nivel': por_nivel,
+            'en_descenso': {
+                'total': int(len(en_descenso)),
+                'pendiente_umbral': PENDIENTE_DESCENSO,
+                'estudiantes': [
+                    {
+                        'estudiante_id': int(datos['ids'][fila]),
+                        'nombre': nombres.get(int(datos['ids'][fila])),
+                        'nivel': niveles[datos['nivel'][fila]],
+                        'pendiente': round(float(pendiente[fila]), 2),
+                        'score_promedio': round(float(datos['score_promedio'][fila]), 2),
+                        'recientes': [int(s) for s in recientes[fila][~np.isnan(recientes[fila])]]
+                    } for fila in listados
+                ]
+            }
+        }
+
+    def obtener(self) -> Dict[str, Any]:
+        """Estadísticas de la cohorte; se recalculan solo si cambió la versión de los datos"""
+        if not self._esquema_listo:
+            DatabaseManager(self.db_path)  # crea las tablas si la base es nueva
+            self._esquema_listo = True
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            version = self._leer_version(cursor)
+            if version == self._version:
+                CONSULTAS_CACHE.etiquetas('estadisticas_cohorte', 'acierto').incrementar()
+                return self._resultado
+
+            with self._lock:
+                # Otro hilo pudo calcularla mientras se esperaba el lock
+                if version == self._version:
+                    CONSULTAS_CACHE.etiquetas('estadisticas_cohorte', 'acierto').incrementar()
+                    return self._resultado
+                CONSULTAS_CACHE.etiquetas('estadisticas_cohorte', 'fallo').incrementar()
+
+                # Lectura consistente entre la versión y los datos
+                cursor.execute('BEGIN')
+                version = self._leer_version(cursor)
+                try:
+                    if self._datos is None or not self._actualizar(cursor, self._datos, self._version, version):
+                        self._datos = self._cargar(cursor, version)
+                    resultado = self._calcular(self._datos, cursor, version)
+                except Exception:
+                    self._datos = self._version = None  # a medio actualizar: la próxima vez se recarga
+                    raise
+                finally:
+                    conn.rollback()
+
+                self._resultado, self._version = resultado, version
+                return resultado
+        finally:
+            conn.close()
+
+
+estadisticas_cohorte = EstadisticasCohorte()
@@ -0,0 +1,232 @@
+"""Corpus de envíos lentos: captura en producción y repetición como suite de regresión.
+
+Si se activa (WEBIA_CORPUS_LENTO_UMBRAL > 0; por defecto está desactivado,
+porque guarda en disco el código de los estudiantes) y el análisis de un
+envío (/api/evaluar, /api/evaluar-ia) supera ese umbral, la aplicación
+guarda el código y el desglose de tiempos por span en
+<directorio>/<sha256 de ruta y código>.json. `repetir` vuelve a analizar
+cada envío con el código actual y lo compara con la referencia guardada.
+
+Uso:
+    python corpus_lento.py repetir [--directorio corpus_lento] [--repeticiones 5] [--actualizar]
+    python corpus_lento.py agregar programa.py [--ruta /api/evaluar-ia]
+    python corpus_lento.py listar
+"""
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+from trazas import iniciar_traza, terminar_traza, Traza
+
+DIRECTORIO_POR_DEFECTO = 'corpus_lento'
+
+# Código más largo que esto no se guarda (el límite de la solicitud es mucho mayor)
+MAX_CODIGO = 256 * 1024
+
+# Más allá de esto no se capturan envíos nuevos
+MAX_ENTRADAS = 2000
+
+# Una entrada es una regresión si su mediana supera la referencia en este factor y margen
+TOLERANCIA = 1.25
+MARGEN_MS = 2.0
+
+
+def _analizar_estatico(codigo: str):
+    from evaluador import EvaluadorCodigo
+    return EvaluadorCodigo().evaluar_codigo_completo(codigo)
+
+
+def _analizar_ia(codigo: str):
+    from evaluador import EvaluadorCodigo
+    return EvaluadorCodigo().evaluar_con_ia(codigo)
+
+
+# Rutas cuyo análisis se captura -> función que lo repite
+ANALISIS = {
+    '/api/evaluar': _analizar_estatico,
+    '/api/evaluar-ia': _analizar_ia,
+}
+
+
+def huella(ruta: str, codigo: str) -> str:
+    return hashlib.sha256(f'{ruta}\n{codigo}'.encode('utf-8')).hexdigest()
+
+
+class CorpusLento:
+    """Directorio de envíos lentos, una entrada JSON por ruta y código distintos"""
+
+    def __init__(self, directorio: str = DIRECTORIO_POR_DEFECTO, max_entradas: int = MAX_ENTRADAS):
+        self.directorio = directorio
+        self.max_entradas = max_entradas
+        self._lock = threading.Lock()
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, f'{clave}.json')
+
+    def leer(self, clave: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._ruta(clave), encoding='utf-8') as archivo:
+                return json.load(archivo)
+        except (OSError, ValueError):
+            return None
+
+    def guardar(self, entrada: Dict[str, Any]):
+        """Escribe la entrada de forma atómica"""
+        ruta = self._ruta(entrada['huella'])
+        temporal = f'{ruta}.{os.getpid()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(entrada, archivo, ensure_ascii=False, indent=2)
+        os.replace(temporal, ruta)
+
+    def entradas(self):
+        if not os.path.isdir(self.directorio):
+            return
+        for nombre in sorted(os.listdir(self.directorio)):
+            if nombre.endswith('.json'):
+                entrada = self.leer(nombre[:-len('.json')])
+                if entrada is not None:
+                    yield entrada
+
+    def agregar(self, ruta: str, codigo: str, duracion_ms: float = None,
+                desglose: Dict[str, float] = None, id_solicitud: str = None) -> Optional[Dict[str, Any]]:
+        """Agrega el envío o, si ya estaba, actualiza sus ocurrencias y peor tiempo"""
+        if ruta not in ANALISIS or not codigo or len(codigo) > MAX_CODIGO:
+            return None
+        clave = huella(ruta, codigo)
+        ahora = datetime.now(timezone.utc).isoformat(timespec='seconds')
+        with self._lock:
+            os.makedirs(self.directorio, exist_ok=True)
+            entrada = self.leer(clave)
+            if entrada is None:
+                if len(os.listdir(self.directorio)) >= self.max_entradas:
+                    return None
+                entrada = {'huella': clave, 'ruta': ruta, 'codigo': codigo, 'capturas': 0,
+                           'primera_captura': ahora, 'peor': None, 'referencia': None}
+            entrada['capturas'] += 1
+            entrada['ultima_captura'] = ahora
+            if duracion_ms is not None and (entrada['peor'] is None or duracion_ms > entrada['peor']['total_ms']):
+                entrada['peor'] = {'total_ms': round(duracion_ms, 3), 'desglose_ms': desglose or {},
+                                   'id_solicitud': id_solicitud, 'fecha': ahora}
+            self.guardar(entrada)
+        return entrada
+
+    def capturar(self, ruta: str, codigo: str, duracion: float, traza: Traza):
+        """Guarda un envío lento de producción: duración del análisis (s) y desglose de su traza"""
+        try:
+            return self.agregar(ruta, codigo, duracion * 1000, traza.desglose(), traza.id_solicitud)
+        except OSError as e:
+            print(f"No se pudo capturar el envío lento: {e}")
+            return None
+
+
+def medir(ruta: str, codigo: str) -> Dict[str, Any]:
+    """Tiempo total y desglose por span de un análisis con el código actual"""
+    traza = iniciar_traza(f'repetir {ruta}', registrar=True)
+    try:
+        ANALISIS[ruta](codigo)
+    finally:
+        terminar_traza(traza)
+    return {'total_ms': traza.duracion * 1000, 'desglose_ms': traza.desglose()}
+
+
+def repetir(entrada: Dict[str, Any], repeticiones: int) -> Dict[str, Any]:
+    """Medianas de `repeticiones` análisis de la entrada (tras uno de calentamiento)"""
+    import statistics  # solo la usa la línea de comandos, no la aplicación
+    medir(entrada['ruta'], entrada['codigo'])
+    mediciones = [medir(entrada['ruta'], entrada['codigo']) for _ in range(repeticiones)]
+    etapas = sorted({etapa for m in mediciones for etapa in m['desglose_ms']})
+    return {
+        'total_ms': round(statistics.median(m['total_ms'] for m in mediciones), 3),
+        'desglose_ms': {
+            etapa: round(statistics.median(m['desglose_ms'].get(etapa, 0.0) for m in mediciones), 3)
+            for etapa in etapas
+        }
+    }
+
+
+def es_regresion(actual_ms: float, referencia_ms: float, tolerancia: float, margen_ms: float) -> bool:
+    return actual_ms > referencia_ms * tolerancia and actual_ms - referencia_ms > margen_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--directorio', default=os.environ.get('WEBIA_CORPUS_LENTO', DIRECTORIO_POR_DEFECTO))
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+
+    parser_repetir = subcomandos.add_parser('repetir', help='Repetir el corpus y reportar regresiones')
+    parser_repetir.add_argument('--repeticiones', type=int, default=5)
+    parser_repetir.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    parser_repetir.add_argument('--margen-ms', type=float, default=MARGEN_MS)
+    parser_repetir.add_argument('--actualizar', action='store_true',
+                                help='Guardar los tiempos actuales como nueva referencia')
+    parser_repetir.add_argument('--json', help='Archivo donde guardar los resultados')
+
+    parser_agregar = subcomandos.add_parser('agregar', help='Agregar un programa al corpus')
+    parser_agregar.add_argument('archivo')
+    parser_agregar.add_argument('--ruta', default='/api/evaluar-ia', choices=sorted(ANALISIS))
+
+    subcomandos.add_parser('listar', help='Listar las entradas del corpus')
+    args = parser.parse_args()
+
+    corpus = CorpusLento(args.directorio)
+
+    if args.comando == 'agregar':
+        with open(args.archivo, encoding='utf-8') as archivo:
+            entrada = corpus.agregar(args.ruta, archivo.read())
+        print(f"Agregado {entrada['huella'][:12]}" if entrada else "No se agregó (vacío, muy grande o corpus lleno)")
+        return
+
+    if args.comando == 'listar':
+        for entrada in corpus.entradas():
+            peor = entrada['peor']['total_ms'] if entrada.get('peor') else None
+            referencia = entrada['referencia']['total_ms'] if entrada.get('referencia') else None
+            print(f"{entrada['huella'][:12]}  {entrada['ruta']:16} capturas {entrada['capturas']:4}  "
+                  f"peor {peor or '-':>10} ms  referencia {referencia or '-':>10} ms")
+        return
+
+    resultados, regresiones = [], 0
+    for entrada in corpus.entradas():
+        inicio = time.perf_counter()
+        actual = repetir(entrada, args.repeticiones)
+        referencia = entrada.get('referencia')
+        fila = {'huella': entrada['huella'], 'ruta': entrada['ruta'], 'actual': actual,
+                'referencia': referencia, 'regresion': False, 'etapas_lentas': []}
+
+        if referencia:
+            fila['regresion'] = es_regresion(actual['total_ms'], referencia['total_ms'],
+                                             args.tolerancia, args.margen_ms)
+            fila['etapas_lentas'] = [
+                etapa for etapa, ms in actual['desglose_ms'].items()
+                if es_regresion(ms, referencia['desglose_ms'].get(etapa, 0.0), args.tolerancia, args.margen_ms)
+            ]
+            regresiones += fila['regresion']
+            estado = 'REGRESIÓN' if fila['regresion'] else 'ok'
+            detalle = f"{referencia['total_ms']:9.2f} -> {actual['total_ms']:9.2f} ms"
+        else:
+            estado = 'sin referencia'
+            detalle = f"{'':9}    {actual['total_ms']:9.2f} ms"
+        print(f"{entrada['huella'][:12]}  {entrada['ruta']:16} {detalle}  {estado}"
+              + (f"  ({', '.join(fila['etapas_lentas'])})" if fila['etapas_lentas'] else '')
+              + f"  [{time.perf_counter() - inicio:.1f} s]")
+
+        if args.actualizar:
+            entrada['referencia'] = dict(actual, fecha=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+            corpus.guardar(entrada)
+        resultados.append(fila)
+
+    print(f"{len(resultados)} entradas, {regresiones} regresiones")
+    if args.json:
+        with open(args.json, 'w') as archivo:
+            json.dump(resultados, archivo, indent=2)
+    if regresiones and not args.actualizar:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
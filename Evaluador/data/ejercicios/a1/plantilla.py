@@ -0,0 +1,25 @@
+class Calculadora:
+    def __init__(self):
+        # Constructor
+        pass
+    
+    def sumar(self, a, b):
+        # Implementa suma
+        pass
+    
+    def restar(self, a, b):
+        # Implementa resta
+        pass
+    
+    def multiplicar(self, a, b):
+        # Implementa multiplicación
+        pass
+    
+    def dividir(self, a, b):
+        # Implementa división (maneja división por cero)
+        pass
+
+# Prueba
+calc = Calculadora()
+print(calc.sumar(10, 5))
+print(calc.dividir(10, 2))
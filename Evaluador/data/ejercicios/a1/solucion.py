@@ -0,0 +1,18 @@
+class Calculadora:
+    def __init__(self):
+        self.historial = []
+
+    def sumar(self, a, b):
+        return a + b
+
+    def restar(self, a, b):
+        return a - b
+
+    def multiplicar(self, a, b):
+        return a * b
+
+    def dividir(self, a, b):
+        try:
+            return a / b
+        except ZeroDivisionError:
+            return None
@@ -0,0 +1,26 @@
+class Estudiante:
+    def __init__(self, nombre, edad):
+        # Inicializa atributos
+        self.nombre = nombre
+        self.edad = edad
+        self.notas = []
+    
+    def agregar_nota(self, nota):
+        # Agrega una nota a la lista
+        pass
+    
+    def calcular_promedio(self):
+        # Calcula y retorna el promedio de las notas
+        pass
+    
+    def mostrar_info(self):
+        # Muestra información del estudiante
+        pass
+
+# Prueba
+est = Estudiante("María", 20)
+est.agregar_nota(90)
+est.agregar_nota(85)
+est.agregar_nota(95)
+print(est.calcular_promedio())
+est.mostrar_info()
@@ -0,0 +1,16 @@
+class Estudiante:
+    def __init__(self, nombre, edad):
+        self.nombre = nombre
+        self.edad = edad
+        self.notas = []
+
+    def agregar_nota(self, nota):
+        self.notas.append(nota)
+
+    def calcular_promedio(self):
+        if not self.notas:
+            return 0
+        return sum(self.notas) / len(self.notas)
+
+    def mostrar_info(self):
+        print(f"{self.nombre} ({self.edad} años) - promedio: {self.calcular_promedio():.2f}")
@@ -0,0 +1,15 @@
+import time
+
+def medir_tiempo(funcion):
+    def wrapper(*args, **kwargs):
+        # Implementa el decorador aquí
+        pass
+    return wrapper
+
+@medir_tiempo
+def funcion_lenta():
+    time.sleep(1)
+    print("Función ejecutada")
+
+# Prueba
+funcion_lenta()
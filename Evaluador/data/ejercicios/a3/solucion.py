@@ -0,0 +1,9 @@
+import time
+
+def medir_tiempo(funcion):
+    def wrapper(*args, **kwargs):
+        inicio = time.time()
+        resultado = funcion(*args, **kwargs)
+        print(f"{funcion.__name__} tardó {time.time() - inicio:.4f} s")
+        return resultado
+    return wrapper
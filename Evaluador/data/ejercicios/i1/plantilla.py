@@ -0,0 +1,8 @@
+def contar_vocales(texto):
+    # Escribe tu código aquí
+    pass
+
+# Prueba
+frase = "Hola Mundo"
+cantidad = contar_vocales(frase)
+print(f"Hay {cantidad} vocales")
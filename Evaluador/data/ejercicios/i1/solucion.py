@@ -0,0 +1,6 @@
+def contar_vocales(texto):
+    contador = 0
+    for letra in texto.lower():
+        if letra in "aeiouáéíóú":
+            contador += 1
+    return contador
@@ -0,0 +1,8 @@
+def filtrar_pares(lista):
+    # Escribe tu código aquí
+    pass
+
+# Prueba
+numeros = [1, 2, 3, 4, 5, 6, 7, 8]
+pares = filtrar_pares(numeros)
+print(pares)  # [2, 4, 6, 8]
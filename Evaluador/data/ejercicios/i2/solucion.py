@@ -0,0 +1,2 @@
+def filtrar_pares(lista):
+    return [numero for numero in lista if numero % 2 == 0]
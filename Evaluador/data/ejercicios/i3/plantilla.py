@@ -0,0 +1,9 @@
+def agregar_estudiante(diccionario, nombre, edad, nota):
+    # Escribe tu código aquí
+    pass
+
+# Prueba
+estudiantes = {}
+agregar_estudiante(estudiantes, "Ana", 20, 95)
+agregar_estudiante(estudiantes, "Luis", 22, 88)
+print(estudiantes)
@@ -0,0 +1,3 @@
+def agregar_estudiante(diccionario, nombre, edad, nota):
+    diccionario[nombre] = {"edad": edad, "nota": nota}
+    return diccionario
@@ -0,0 +1,8 @@
+def calcular_promedio(numeros):
+    # Escribe tu código aquí
+    pass
+
+# Prueba
+notas = [85, 90, 78, 92, 88]
+promedio = calcular_promedio(notas)
+print(f"Promedio: {promedio}")
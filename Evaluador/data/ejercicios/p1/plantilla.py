@@ -0,0 +1,7 @@
+def sumar(a, b):
+    # Escribe tu código aquí
+    pass
+
+# Prueba tu función
+resultado = sumar(5, 3)
+print(f"La suma es: {resultado}")
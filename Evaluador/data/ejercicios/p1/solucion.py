@@ -0,0 +1,2 @@
+def sumar(a, b):
+    return a + b
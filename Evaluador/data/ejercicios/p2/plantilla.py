@@ -0,0 +1,7 @@
+def es_par(numero):
+    # Escribe tu código aquí
+    pass
+
+# Prueba tu función
+print(es_par(4))  # Debe imprimir True
+print(es_par(7))  # Debe imprimir False
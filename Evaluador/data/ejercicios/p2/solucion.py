@@ -0,0 +1,2 @@
+def es_par(numero):
+    return numero % 2 == 0
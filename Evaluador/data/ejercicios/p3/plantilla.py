@@ -0,0 +1,6 @@
+def saludar(nombre):
+    # Escribe tu código aquí
+    pass
+
+# Prueba tu función
+saludar("Juan")  # Debe imprimir: Hola, Juan!
@@ -0,0 +1,2 @@
+def saludar(nombre):
+    print(f"Hola, {nombre}!")
@@ -0,0 +1,7 @@
+def mayor(a, b):
+    # Escribe tu código aquí
+    pass
+
+# Prueba
+print(mayor(10, 5))  # Debe imprimir 10
+print(mayor(3, 8))   # Debe imprimir 8
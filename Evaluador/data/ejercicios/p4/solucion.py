@@ -0,0 +1,4 @@
+def mayor(a, b):
+    if a > b:
+        return a
+    return b
@@ -3,11 +3,33 @@ from datetime import datetime
 import json
 import os
 
+from badges import sistema_badges, CAMPOS_REGLAS
+from metricas import registro, cronometrado
+from trazas import trazado
+
+# Versión del esquema (PRAGMA user_version); ver DatabaseManager._migrar
+VERSION_ESQUEMA = 2
+
+# Resúmenes de evaluaciones por estudiante: granularidad -> (tabla, periodo de una fecha ISO).
+# La semana se identifica por su lunes
+RESUMENES = {
+    'dia': ('resumen_evaluaciones_dia', "date({})"),
+    'semana': ('resumen_evaluaciones_semana', "date({}, 'weekday 0', '-6 days')")
+}
+
+TIEMPO_CONSULTAS = registro.histograma('webia_db_consulta_segundos', 'Duración de cada método de DatabaseManager',
+                                       ('metodo',))
+
+def _medir_consulta(metodo):
+    """Observa la duración del método en TIEMPO_CONSULTAS y lo registra como span"""
+    return cronometrado(TIEMPO_CONSULTAS.etiquetas(metodo.__name__))(trazado()(metodo))
+
 class DatabaseManager:
     def __init__(self, db_path='./estudiantes.db'):
         self.db_path = db_path
         self.init_database()
     
+    @_medir_consulta
     def init_database(self):
         """Crear tablas si no existen"""
         conn = sqlite3.connect(self.db_path)
@@ -39,6 +61,12 @@ class DatabaseManager:
             )
         ''')
         
+        # Índice para el historial de cada estudiante
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_evaluaciones_estudiante_fecha
+            ON evaluaciones (estudiante_id, fecha)
+        ''')
+        
         # Tabla de progreso
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS progreso (
@@ -50,13 +78,29 @@ class DatabaseManager:
                 clases_creadas INTEGER DEFAULT 0,
                 score_maximo INTEGER DEFAULT 0,
                 score_promedio REAL DEFAULT 0,
-                badges_obtenidos TEXT DEFAULT '[]',
                 nivel_actual TEXT DEFAULT 'principiante',
                 ultima_actividad TEXT,
                 FOREIGN KEY (estudiante_id) REFERENCES estudiantes (id)
             )
         ''')
         
+        # Badges obtenidos por cada estudiante
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS estudiante_badges (
+                estudiante_id INTEGER NOT NULL,
+                badge_id TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                PRIMARY KEY (estudiante_id, badge_id),
+                FOREIGN KEY (estudiante_id) REFERENCES estudiantes (id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Índice para contar poseedores de cada badge
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_estudiante_badges_badge
+            ON estudiante_badges (badge_id)
+        ''')
+        
         # Tabla de sesiones activas
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS sesiones (
@@ -69,10 +113,100 @@ class DatabaseManager:
             )
         ''')
         
+        # Resúmenes diarios y semanales de evaluaciones (historial de largo plazo)
+        for tabla, _ in RESUMENES.values():
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS {tabla} (
+                    estudiante_id INTEGER NOT NULL,
+                    periodo TEXT NOT NULL,
+                    evaluaciones INTEGER NOT NULL,
+                    suma_score INTEGER NOT NULL,
+                    score_maximo INTEGER NOT NULL,
+                    suma_complejidad INTEGER NOT NULL,
+                    PRIMARY KEY (estudiante_id, periodo),
+                    FOREIGN KEY (estudiante_id) REFERENCES estudiantes (id)
+                ) WITHOUT ROWID
+            ''')
+        
+        self._migrar(cursor)
+        
         conn.commit()
         conn.close()
         print("Base de datos inicializada correctamente")
     
+    def _migrar(self, cursor):
+        """Aplica las migraciones pendientes según PRAGMA user_version"""
+        cursor.execute('PRAGMA user_version')
+        version = cursor.fetchone()[0]
+        if version >= VERSION_ESQUEMA:
+            return
+        
+        if version < 1:
+            # 1: badges_obtenidos (JSON en progreso) -> tabla estudiante_badges
+            cursor.execute('PRAGMA table_info(progreso)')
+            if 'badges_obtenidos' in {columna[1] for columna in cursor.fetchall()}:
+                cursor.execute('''
+                    SELECT estudiante_id, badges_obtenidos, ultima_actividad
+                    FROM progreso WHERE badges_obtenidos IS NOT NULL AND badges_obtenidos != '[]'
+                ''')
+                filas = []
+                for estudiante_id, badges, fecha in cursor.fetchall():
+                    try:
+                        ids = json.loads(badges)
+                    except ValueError:
+                        continue
+                    fecha = fecha or datetime.now().isoformat()
+                    filas.extend((estudiante_id, badge_id, fecha) for badge_id in ids)
+                cursor.executemany('INSERT OR IGNORE INTO estudiante_badges VALUES (?, ?, ?)', filas)
+            
+            # Desde aquí los badges se revisan solo al cambiar sus campos: los que el progreso
+            # actual ya cumple se otorgan ahora, o nunca se otorgarían
+            self._otorgar_badges_todos(cursor, sistema_badges.badges, datetime.now().isoformat())
+        
+        if version < 2:
+            # 2: resúmenes diarios y semanales, calculados a partir de las evaluaciones existentes
+            self._reconstruir_resumenes(cursor)
+        
+        cursor.execute(f'PRAGMA user_version = {VERSION_ESQUEMA}')
+    
+    def _reconstruir_resumenes(self, cursor):
+        """Recalcula los resúmenes de todas las evaluaciones"""
+        for tabla, periodo in RESUMENES.values():
+            cursor.execute(f'DELETE FROM {tabla}')
+            cursor.execute(f'''
+                INSERT INTO {tabla}
+                SELECT estudiante_id, {periodo.format('fecha')}, COUNT(*), SUM(COALESCE(score, 0)),
+                       MAX(COALESCE(score, 0)), SUM(COALESCE(complejidad, 0))
+                FROM evaluaciones
+                WHERE date(fecha) IS NOT NULL
+                GROUP BY 1, 2
+            ''')
+    
+    def _otorgar_badges_todos(self, cursor, badge_ids, fecha):
+        """Otorga cada badge a todos los estudiantes que cumplen sus reglas; retorna cuántos por badge"""
+        otorgados = {}
+        for badge_id in badge_ids:
+            condicion, parametros = sistema_badges.condicion_sql(badge_id)
+            cursor.execute(f'''
+                INSERT OR IGNORE INTO estudiante_badges (estudiante_id, badge_id, fecha)
+                SELECT progreso.estudiante_id, ?, ? FROM progreso WHERE {condicion}
+            ''', [badge_id, fecha] + parametros)
+            otorgados[badge_id] = cursor.rowcount
+        return otorgados
+    
+    def _acumular_resumenes(self, cursor, estudiante_id, score, complejidad, fecha):
+        """Suma una evaluación a los resúmenes de su día y su semana"""
+        for tabla, periodo in RESUMENES.values():
+            cursor.execute(f'''
+                INSERT INTO {tabla} VALUES (?, {periodo.format('?')}, 1, ?, ?, ?)
+                ON CONFLICT (estudiante_id, periodo) DO UPDATE SET
+                    evaluaciones = evaluaciones + 1,
+                    suma_score = suma_score + excluded.suma_score,
+                    score_maximo = MAX(score_maximo, excluded.score_maximo),
+                    suma_complejidad = suma_complejidad + excluded.suma_complejidad
+            ''', (estudiante_id, fecha, score, score, complejidad))
+    
+    @_medir_consulta
     def agregar_estudiante(self, nombre):
         """Registrar nuevo estudiante"""
         try:
@@ -108,6 +242,7 @@ class DatabaseManager:
         except Exception as e:
             return {'error': str(e)}
     
+    @_medir_consulta
     def iniciar_sesion(self, estudiante_id):
         """Iniciar sesión de estudiante"""
         conn = sqlite3.connect(self.db_path)
@@ -121,6 +256,7 @@ class DatabaseManager:
         conn.close()
         return sesion_id
     
+    @_medir_consulta
     def guardar_evaluacion(self, estudiante_id, resultado_evaluacion):
         """Guardar resultado de evaluación"""
         try:
@@ -132,6 +268,8 @@ class DatabaseManager:
             nivel = resultado_evaluacion.get('clasificacion_nivel', {}).get('nivel_predicho', 'principiante')
             score = resultado_evaluacion.get('score', 0)
             metricas = resultado_evaluacion.get('metricas', {})
+            complejidad = metricas.get('complejidad', 0)
+            fecha = datetime.now().isoformat()
             
             # Guardar evaluación
             cursor.execute('''
@@ -145,14 +283,15 @@ class DatabaseManager:
                 codigo[:500],  # Limitar tamaño del código guardado
                 nivel,
                 score,
-                metricas.get('complejidad', 0),
+                complejidad,
                 metricas.get('funciones', 0),
                 metricas.get('clases', 0),
-                datetime.now().isoformat()
+                fecha
             ))
+            self._acumular_resumenes(cursor, estudiante_id, score or 0, complejidad or 0, fecha)
             
-            # Actualizar progreso
-            self._actualizar_progreso(cursor, estudiante_id, resultado_evaluacion)
+            # Actualizar progreso y badges
+            resultado_evaluacion['badges_nuevos'] = self._actualizar_progreso(cursor, estudiante_id, resultado_evaluacion)
             
             conn.commit()
             conn.close()
@@ -162,29 +301,42 @@ class DatabaseManager:
             print(f"Error guardando evaluación: {e}")
             return False
     
+    # Campos de progreso de los que dependen los badges
+    CAMPOS_PROGRESO = CAMPOS_REGLAS
+    
     def _actualizar_progreso(self, cursor, estudiante_id, resultado):
-        """Actualizar el progreso del estudiante"""
+        """Actualizar el progreso del estudiante y otorgar los badges nuevos"""
         # Obtener progreso actual
-        cursor.execute('SELECT * FROM progreso WHERE estudiante_id = ?', (estudiante_id,))
-        progreso_actual = cursor.fetchone()
+        cursor.execute(f'''
+            SELECT {', '.join(self.CAMPOS_PROGRESO)}
+            FROM progreso WHERE estudiante_id = ?
+        ''', (estudiante_id,))
+        fila = cursor.fetchone()
         
-        if not progreso_actual:
-            return
+        if not fila:
+            return []
         
-        # Extraer valores actuales
-        eval_totales = progreso_actual[2] + 1
-        funciones = progreso_actual[3] + resultado.get('metricas', {}).get('funciones', 0)
-        clases = progreso_actual[4] + resultado.get('metricas', {}).get('clases', 0)
+        anterior = dict(zip(self.CAMPOS_PROGRESO, fila))
+        metricas = resultado.get('metricas', {})
+        
+        # Nuevos valores
+        eval_totales = anterior['evaluaciones_totales'] + 1
         score_nuevo = resultado.get('score', 0)
-        score_max_actual = progreso_actual[5]
-        score_promedio_actual = progreso_actual[6]
+        score_promedio = ((anterior['score_promedio'] * (eval_totales - 1)) + score_nuevo) / eval_totales
         
-        # Calcular nuevo promedio
-        score_maximo = max(score_max_actual, score_nuevo)
-        score_promedio = ((score_promedio_actual * (eval_totales - 1)) + score_nuevo) / eval_totales
+        actual = {
+            'evaluaciones_totales': eval_totales,
+            'funciones_creadas': anterior['funciones_creadas'] + metricas.get('funciones', 0),
+            'clases_creadas': anterior['clases_creadas'] + metricas.get('clases', 0),
+            'score_maximo': max(anterior['score_maximo'], score_nuevo),
+            'score_promedio': round(score_promedio, 2),
+            # Determinar nivel actual basado en la última evaluación
+            'nivel_actual': resultado.get('clasificacion_nivel', {}).get('nivel_predicho', 'principiante')
+        }
         
-        # Determinar nivel actual basado en historial
-        nivel_actual = resultado.get('clasificacion_nivel', {}).get('nivel_predicho', 'principiante')
+        # Solo se verifican los badges que dependen de los campos que cambiaron
+        cambiados = [campo for campo in self.CAMPOS_PROGRESO if actual[campo] != anterior[campo]]
+        nuevos = self._otorgar_badges(cursor, estudiante_id, actual, sistema_badges.badges_afectados(cambiados))
         
         # Actualizar
         cursor.execute('''
@@ -198,16 +350,138 @@ class DatabaseManager:
                 ultima_actividad = ?
             WHERE estudiante_id = ?
         ''', (
-            eval_totales,
-            funciones,
-            clases,
-            score_maximo,
-            round(score_promedio, 2),
-            nivel_actual,
+            actual['evaluaciones_totales'],
+            actual['funciones_creadas'],
+            actual['clases_creadas'],
+            actual['score_maximo'],
+            actual['score_promedio'],
+            actual['nivel_actual'],
             datetime.now().isoformat(),
             estudiante_id
         ))
+        
+        return nuevos
+    
+    def _otorgar_badges(self, cursor, estudiante_id, datos, candidatos):
+        """Verifica los badges candidatos que el estudiante aún no tiene y registra los obtenidos"""
+        cursor.execute('SELECT badge_id FROM estudiante_badges WHERE estudiante_id = ?', (estudiante_id,))
+        obtenidos = {fila[0] for fila in cursor.fetchall()}
+        candidatos = [b for b in candidatos if b not in obtenidos]
+        if not candidatos:
+            return []
+        
+        nuevos = sistema_badges.verificar_badges(datos, candidatos)
+        fecha = datetime.now().isoformat()
+        cursor.executemany(
+            'INSERT OR IGNORE INTO estudiante_badges (estudiante_id, badge_id, fecha) VALUES (?, ?, ?)',
+            [(estudiante_id, badge['id'], fecha) for badge in nuevos]
+        )
+        return nuevos
+    
+    @_medir_consulta
+    def obtener_badges(self, estudiante_id):
+        """Badges obtenidos por el estudiante (solo lectura)"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT badge_id FROM estudiante_badges
+            WHERE estudiante_id = ?
+            ORDER BY fecha, badge_id
+        ''', (estudiante_id,))
+        ids = [fila[0] for fila in cursor.fetchall()]
+        conn.close()
+        
+        return [sistema_badges.info_badge(b) for b in ids if b in sistema_badges.badges]
+    
+    @_medir_consulta
+    def actualizar_badges(self, estudiante_id):
+        """Verifica todos los badges del estudiante y agrega los que falten"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT {', '.join(self.CAMPOS_PROGRESO)}
+            FROM progreso WHERE estudiante_id = ?
+        ''', (estudiante_id,))
+        fila = cursor.fetchone()
+        
+        nuevos = []
+        if fila:
+            datos = dict(zip(self.CAMPOS_PROGRESO, fila))
+            nuevos = self._otorgar_badges(cursor, estudiante_id, datos, list(sistema_badges.badges))
+            conn.commit()
+        
+        conn.close()
+        return nuevos
     
+    @_medir_consulta
+    def recalcular_badges(self, badge_ids=None, revocar=False):
+        """Recalcula badges para todos los estudiantes con una consulta por badge.
+        
+        Con revocar=True también quita los badges cuyas reglas ya no se cumplen
+        (y los de badges que ya no existen). Solo se revocan los de
+        sistema_badges.revocables: los de nivel o promedio se conservan.
+        """
+        badge_ids = list(badge_ids or sistema_badges.badges)
+        fecha = datetime.now().isoformat()
+        resultado = {}
+        
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        for badge_id in badge_ids:
+            condicion, parametros = sistema_badges.condicion_sql(badge_id)
+            revocados = 0
+            if revocar and badge_id in sistema_badges.revocables:
+                cursor.execute(f'''
+                    DELETE FROM estudiante_badges
+                    WHERE badge_id = ? AND NOT EXISTS (
+                        SELECT 1 FROM progreso
+                        WHERE progreso.estudiante_id = estudiante_badges.estudiante_id AND {condicion}
+                    )
+                ''', [badge_id] + parametros)
+                revocados = cursor.rowcount
+            
+            otorgados = self._otorgar_badges_todos(cursor, [badge_id], fecha)[badge_id]
+            resultado[badge_id] = {'otorgados': otorgados, 'revocados': revocados}
+        
+        if revocar:
+            cursor.execute(
+                'DELETE FROM estudiante_badges WHERE badge_id NOT IN (%s)' % ','.join('?' * len(sistema_badges.badges)),
+                list(sistema_badges.badges)
+            )
+        
+        conn.commit()
+        conn.close()
+        return resultado
+    
+    @_medir_consulta
+    def obtener_estadisticas_badges(self):
+        """Cantidad de estudiantes que tiene cada badge"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT COUNT(*) FROM estudiantes')
+        total_estudiantes = cursor.fetchone()[0]
+        
+        # Recorre solo idx_estudiante_badges_badge
+        cursor.execute('''
+            SELECT badge_id, COUNT(*) FROM estudiante_badges
+            GROUP BY badge_id
+        ''')
+        conteos = dict(cursor.fetchall())
+        conn.close()
+        
+        return {
+            'total_estudiantes': total_estudiantes,
+            'badges': [
+                dict(badge,
+                     estudiantes=conteos.get(badge['id'], 0),
+                     porcentaje=round(100 * conteos.get(badge['id'], 0) / total_estudiantes, 1) if total_estudiantes else 0)
+                for badge in sistema_badges.obtener_todos_badges()
+            ]
+        }
+    
+    @_medir_consulta
     def obtener_estudiante_por_nombre(self, nombre):
         """Buscar estudiante por nombre"""
         conn = sqlite3.connect(self.db_path)
@@ -225,6 +499,7 @@ class DatabaseManager:
             }
         return None
     
+    @_medir_consulta
     def obtener_progreso(self, estudiante_id):
         """Obtener progreso completo del estudiante"""
         conn = sqlite3.connect(self.db_path)
@@ -235,9 +510,20 @@ class DatabaseManager:
         estudiante = cursor.fetchone()
         
         # Progreso
-        cursor.execute('SELECT * FROM progreso WHERE estudiante_id = ?', (estudiante_id,))
+        cursor.execute(f'''
+            SELECT {', '.join(self.CAMPOS_PROGRESO)}, ultima_actividad
+            FROM progreso WHERE estudiante_id = ?
+        ''', (estudiante_id,))
         progreso = cursor.fetchone()
         
+        # Badges
+        cursor.execute('''
+            SELECT badge_id FROM estudiante_badges
+            WHERE estudiante_id = ?
+            ORDER BY fecha, badge_id
+        ''', (estudiante_id,))
+        badges = [fila[0] for fila in cursor.fetchall()]
+        
         # Últimas evaluaciones
         cursor.execute('''
             SELECT score, nivel_detectado, fecha 
@@ -261,14 +547,14 @@ class DatabaseManager:
                 'fecha_registro': estudiante[3]
             },
             'progreso': {
-                'evaluaciones_totales': progreso[2],
-                'funciones_creadas': progreso[3],
-                'clases_creadas': progreso[4],
-                'score_maximo': progreso[5],
-                'score_promedio': progreso[6],
-                'badges': json.loads(progreso[7]),
-                'nivel_actual': progreso[8],
-                'ultima_actividad': progreso[9]
+                'evaluaciones_totales': progreso[0],
+                'funciones_creadas': progreso[1],
+                'clases_creadas': progreso[2],
+                'score_maximo': progreso[3],
+                'score_promedio': progreso[4],
+                'badges': badges,
+                'nivel_actual': progreso[5],
+                'ultima_actividad': progreso[6]
             },
             'historial_reciente': [
                 {
@@ -279,6 +565,82 @@ class DatabaseManager:
             ]
         }
     
+    @_medir_consulta
+    def obtener_historial(self, estudiante_id, granularidad='dia', desde=None):
+        """Serie de evaluaciones por día o semana desde `desde` (fecha ISO), o None si el estudiante no existe"""
+        tabla, periodo = RESUMENES[granularidad]
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT 1 FROM estudiantes WHERE id = ?', (estudiante_id,))
+        if cursor.fetchone() is None:
+            conn.close()
+            return None
+        
+        # `desde` se alinea al inicio de su periodo para incluir la semana que lo contiene
+        cursor.execute(f'''
+            SELECT periodo, evaluaciones, suma_score, score_maximo, suma_complejidad
+            FROM {tabla}
+            WHERE estudiante_id = ? AND periodo >= COALESCE({periodo.format('?')}, '')
+            ORDER BY periodo
+        ''', (estudiante_id, desde))
+        filas = cursor.fetchall()
+        conn.close()
+        
+        return [
+            {
+                'periodo': fila[0],
+                'evaluaciones': fila[1],
+                'score_promedio': round(fila[2] / fila[1], 2),
+                'score_maximo': fila[3],
+                'complejidad_promedio': round(fila[4] / fila[1], 2)
+            } for fila in filas
+        ]
+    
+    @_medir_consulta
+    def obtener_historial_lote(self, estudiante_ids=None, limite=10):
+        """Nivel actual y últimas evaluaciones de varios estudiantes en una sola consulta"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+        
+        filtro = ''
+        parametros = []
+        if estudiante_ids is not None:
+            filtro = 'WHERE p.estudiante_id IN (%s)' % ','.join('?' * len(estudiante_ids))
+            parametros = list(estudiante_ids)
+        
+        cursor.execute('SELECT p.estudiante_id, p.nivel_actual FROM progreso p ' + filtro, parametros)
+        historiales = {
+            fila[0]: {'nivel_actual': fila[1] or 'principiante', 'evaluaciones': []}
+            for fila in cursor.fetchall()
+        }
+        
+        cursor.execute(f'''
+            SELECT estudiante_id, score, complejidad, funciones, clases, nivel_detectado
+            FROM (
+                SELECT e.*, ROW_NUMBER() OVER (
+                    PARTITION BY e.estudiante_id ORDER BY e.fecha DESC
+                ) AS posicion
+                FROM evaluaciones e
+                JOIN progreso p ON p.estudiante_id = e.estudiante_id
+                {filtro}
+            )
+            WHERE posicion <= ?
+        ''', parametros + [limite])
+        
+        for fila in cursor.fetchall():
+            historiales[fila[0]]['evaluaciones'].append({
+                'score': fila[1] or 0,
+                'complejidad': fila[2] or 0,
+                'funciones': fila[3] or 0,
+                'clases': fila[4] or 0,
+                'nivel': fila[5]
+            })
+        
+        conn.close()
+        return historiales
+    
+    @_medir_consulta
     def listar_estudiantes(self):
         """Listar todos los estudiantes con su progreso"""
         conn = sqlite3.connect(self.db_path)
@@ -306,6 +668,7 @@ class DatabaseManager:
             } for est in estudiantes
         ]
     
+    @_medir_consulta
     def obtener_estadisticas_generales(self):
         """Estadísticas del sistema completo"""
         conn = sqlite3.connect(self.db_path)
@@ -339,37 +702,3 @@ class DatabaseManager:
             'promedio_general': round(promedio_general, 2),
             'distribucion_niveles': distribucion
         }
-
-def actualizar_badges(self, estudiante_id):
-    """Actualizar badges del estudiante"""
-    from badges import SistemaBadges
-    
-    # Obtener datos del estudiante
-    progreso = self.obtener_progreso(estudiante_id)
-    if not progreso:
-        return []
-    
-    # Preparar datos para verificación
-    datos = {
-        'evaluaciones_totales': progreso['progreso']['evaluaciones_totales'],
-        'funciones_creadas': progreso['progreso']['funciones_creadas'],
-        'clases_creadas': progreso['progreso']['clases_creadas'],
-        'score_maximo': progreso['progreso']['score_maximo'],
-        'nivel_actual': progreso['progreso']['nivel_actual']
-    }
-    
-    # Verificar badges
-    sistema_badges = SistemaBadges()
-    badges_obtenidos = sistema_badges.verificar_badges(datos)
-    
-    # Guardar en BD
-    conn = sqlite3.connect(self.db_path)
-    cursor = conn.cursor()
-    cursor.execute('''
-        UPDATE progreso SET badges_obtenidos = ?
-        WHERE estudiante_id = ?
-    ''', (json.dumps([b['id'] for b in badges_obtenidos]), estudiante_id))
-    conn.commit()
-    conn.close()
-    
-    return badges_obtenidos
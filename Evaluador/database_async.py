@@ -0,0 +1,104 @@
+"""Acceso asíncrono a la base de datos a través de un hilo dedicado.
+
+SQLite no tiene API asíncrona: las consultas de DatabaseManager se encolan y
+las ejecuta un único hilo, y el resultado vuelve al event loop como un
+futuro. Así ninguna conexión HTTP ocupa un hilo mientras espera a la base de
+datos, y el número de conexiones abiertas no depende del de hilos.
+
+Las lecturas idénticas que llegan mientras otra igual está en la cola se
+agrupan: todos los clientes esperan la misma consulta.
+"""
+import asyncio
+import os
+import queue
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from database import DatabaseManager
+from metricas import CONSULTAS_CACHE
+
+
+def _resolver(futuro: asyncio.Future, resultado: Any, error: BaseException):
+    if futuro.cancelled():
+        return
+    if error is not None:
+        futuro.set_exception(error)
+    else:
+        futuro.set_result(resultado)
+
+
+class DatabaseAsync:
+    """Lecturas de DatabaseManager como corrutinas, ejecutadas en un hilo dedicado"""
+
+    def __init__(self, db_path: str = './estudiantes.db', db: DatabaseManager = None):
+        self.db = db or DatabaseManager(db_path)
+        self._cola = queue.SimpleQueue()
+        self._hilo = None
+        self._pid = None
+        self._lock = threading.Lock()
+        # (método, argumentos) -> futuro de la consulta en curso; solo se usa desde el event loop
+        self._en_curso: Dict[Tuple, asyncio.Future] = {}
+
+    def _iniciar(self):
+        # Tras un fork el hilo del padre no existe en el hijo: se crea uno nuevo
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                self._cola = queue.SimpleQueue()
+                self._hilo = threading.Thread(target=self._atender, args=(self._cola,),
+                                              name='database-async', daemon=True)
+                self._hilo.start()
+                self._pid = os.getpid()
+
+    @staticmethod
+    def _atender(cola: queue.SimpleQueue):
+        while True:
+            trabajo = cola.get()
+            if trabajo is None:
+                return
+            loop, futuro, funcion, args = trabajo
+            try:
+                resultado, error = funcion(*args), None
+            except Exception as e:
+                resultado, error = None, e
+            try:
+                loop.call_soon_threadsafe(_resolver, futuro, resultado, error)
+            except RuntimeError:
+                pass  # el event loop ya se cerró
+
+    async def ejecutar(self, funcion: Callable, *args) -> Any:
+        """Ejecuta `funcion(*args)` en el hilo de la base de datos"""
+        self._iniciar()
+        loop = asyncio.get_running_loop()
+        futuro = loop.create_future()
+        self._cola.put((loop, futuro, funcion, args))
+        return await futuro
+
+    async def _leer(self, nombre: str, *args) -> Any:
+        clave = (nombre, args)
+        futuro = self._en_curso.get(clave)
+        if futuro is None:
+            CONSULTAS_CACHE.etiquetas('lecturas_db_en_curso', 'fallo').incrementar()
+            futuro = asyncio.ensure_future(self.ejecutar(getattr(self.db, nombre), *args))
+            self._en_curso[clave] = futuro
+            futuro.add_done_callback(lambda _: self._en_curso.pop(clave, None))
+        else:
+            CONSULTAS_CACHE.etiquetas('lecturas_db_en_curso', 'acierto').incrementar()
+        # shield: si un cliente se desconecta no se cancela la consulta de los demás
+        return await asyncio.shield(futuro)
+
+    async def obtener_progreso(self, estudiante_id: int):
+        return await self._leer('obtener_progreso', estudiante_id)
+
+    async def listar_estudiantes(self):
+        return await self._leer('listar_estudiantes')
+
+    async def obtener_estadisticas_generales(self):
+        return await self._leer('obtener_estadisticas_generales')
+
+    def cerrar(self):
+        """Termina el hilo cuando acaben las consultas ya encoladas"""
+        if self._pid == os.getpid():
+            self._cola.put(None)
+            self._pid = None
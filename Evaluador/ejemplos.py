@@ -0,0 +1,57 @@
+# Ejemplos de código que se ofrecen en el evaluador (/api/ejemplos)
+EJEMPLOS = {
+    'basic': '''def calcular_factorial(n):
+    """
+    Calcula el factorial de un número entero positivo
+    """
+    if n < 0:
+        raise ValueError("El número debe ser positivo")
+    elif n <= 1:
+        return 1
+    else:
+        return n * calcular_factorial(n - 1)
+
+# Ejemplo de uso
+try:
+    numero = 5
+    resultado = calcular_factorial(numero)
+    print(f"El factorial de {numero} es {resultado}")
+except ValueError as e:
+    print(f"Error: {e}")''',
+
+    'loop': '''# Análisis de datos con bucles y condicionales
+import random
+
+def analizar_ventas():
+    meses = ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio"]
+    ventas = [random.randint(1000, 5000) for _ in range(len(meses))]
+    total_ventas = sum(ventas)
+    promedio = total_ventas / len(meses)
+    print("📊 REPORTE DE VENTAS")
+    for mes, venta in zip(meses, ventas):
+        print(f"{mes}: ${venta:,}")
+    print(f"Promedio mensual: ${promedio:,.2f}")
+
+resultado = analizar_ventas()
+print(f"✅ Análisis completado: {resultado}")''',
+
+    'class': '''class GestorInventario:
+    """Sistema de gestión de inventario para una tienda"""
+
+    def __init__(self):
+        self.productos = {}
+
+    def agregar_producto(self, nombre, precio, stock=0):
+        self.productos[nombre] = {"precio": precio, "stock": stock}
+        print(f"Producto {nombre} agregado.")
+
+    def mostrar_productos(self):
+        for nombre, datos in self.productos.items():
+            print(f"{nombre}: {datos['stock']} unidades a ${datos['precio']}")
+
+# Demo
+inventario = GestorInventario()
+inventario.agregar_producto("Laptop", 800, 10)
+inventario.agregar_producto("Mouse", 25, 50)
+inventario.mostrar_productos()'''
+}
@@ -1,329 +1,310 @@
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, Any, Optional
+
+from buscador import IndiceBusqueda
+from perfiles import leer_perfil
+
+# Directorio con un subdirectorio por ejercicio:
+#   ejercicio.json  metadatos (id, nivel, orden, titulo, descripcion, dificultad, puntos, etiquetas, pistas)
+#   plantilla.py    código de plantilla (se carga al pedirlo)
+#   tests.json      casos de prueba (se cargan al pedirlos)
+#   solucion.py     solución de referencia (nunca se envía al cliente)
+#   perfil.json     perfil de dificultad precalculado con `python perfiles.py` (solo se lee)
+DIRECTORIO_EJERCICIOS = os.environ.get(
+    'WEBIA_EJERCICIOS_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'ejercicios')
+)
+
+NIVELES = ('principiante', 'intermedio', 'avanzado')
+
+# Metadatos sin los que un ejercicio no se puede indexar ni mostrar
+CAMPOS_REQUERIDOS = ('id', 'nivel', 'titulo', 'dificultad', 'puntos')
+
+# Archivos cuyo cambio obliga a recargar el ejercicio (y descartar su JSON serializado);
+# perfil.json incluido: recalcular un perfil cambia la respuesta del ejercicio y de su nivel
+ARCHIVOS_EJERCICIO = ('ejercicio.json', 'plantilla.py', 'tests.json', 'solucion.py', 'perfil.json')
+
+
+class EntradaEjercicio:
+    """Ejercicio del catálogo: metadatos en memoria, plantilla y tests bajo demanda"""
+
+    def __init__(self, directorio: str, firma: tuple):
+        self.directorio = directorio
+        self.firma = firma
+
+        with open(os.path.join(directorio, 'ejercicio.json'), encoding='utf-8') as archivo:
+            self.metadatos = json.load(archivo)
+
+        # Un ejercicio incompleto se rechaza aquí, donde revisar_cambios lo descarta, y no
+        # al indexarlo, donde rompería la recarga de todo el catálogo
+        if not isinstance(self.metadatos, dict):
+            raise ValueError('ejercicio.json debe contener un objeto')
+        faltantes = [campo for campo in CAMPOS_REQUERIDOS if campo not in self.metadatos]
+        if faltantes:
+            raise KeyError(f"faltan campos en ejercicio.json: {', '.join(faltantes)}")
+
+        self.id = self.metadatos['id']
+        self.nivel = self.metadatos['nivel']
+        self.orden = self.metadatos.get('orden', 0)
+        self._completo = None
+        self._perfil = None
+
+    def _leer(self, nombre: str) -> Optional[str]:
+        ruta = os.path.join(self.directorio, nombre)
+        if not os.path.exists(ruta):
+            return None
+        with open(ruta, encoding='utf-8') as archivo:
+            return archivo.read()
+
+    def completo(self) -> Dict[str, Any]:
+        """Ejercicio completo (con plantilla y tests), cargado una sola vez"""
+        if self._completo is None:
+            ejercicio = {k: v for k, v in self.metadatos.items() if k != 'orden'}
+            ejercicio['codigo_plantilla'] = (self._leer('plantilla.py') or '').rstrip('\n')
+            ejercicio['tests'] = json.loads(self._leer('tests.json') or '[]')
+            ejercicio['perfil'] = {k: v for k, v in self.perfil().items() if k != 'fuente'}
+            self._completo = ejercicio
+        return self._completo
+
+    def actualizar_perfil(self, forzar: bool = False) -> bool:
+        """Recalcula perfil.json si sus fuentes cambiaron; True si se recalculó.
+
+        Solo lo usa `python perfiles.py` (despliegue); la aplicación no calcula perfiles.
+        """
+        from perfiles import calcular_perfil, firma_fuentes, guardar_perfil
+        plantilla = (self._leer('plantilla.py') or '').rstrip('\n')
+        solucion = self._leer('solucion.py')
+        perfil = None if forzar else leer_perfil(self.directorio)
+        recalcular = perfil is None or perfil.get('fuente') != firma_fuentes(plantilla, solucion)
+        if recalcular:
+            perfil = calcular_perfil(plantilla, solucion)
+            guardar_perfil(self.directorio, perfil)
+            self._completo = None
+        self._perfil = perfil
+        return recalcular
+
+    def perfil(self) -> Dict[str, Any]:
+        """Perfil de dificultad guardado en perfil.json ({} si aún no se generó)"""
+        if self._perfil is None:
+            self._perfil = leer_perfil(self.directorio) or {}
+        return self._perfil
+
+
+class CatalogoEjercicios:
+    """Catálogo de ejercicios indexado y cargado desde disco.
+
+    Los cambios en los archivos se detectan comparando sus mtime como mucho
+    una vez cada `intervalo_revision` segundos; solo los ejercicios
+    modificados se vuelven a leer e indexar.
+    """
+
+    def __init__(self, directorio: str = DIRECTORIO_EJERCICIOS, intervalo_revision: float = 2.0):
+        self.directorio = directorio
+        self.intervalo_revision = intervalo_revision
+        self.version = 0
+
+        self.por_id = {}
+        self.por_nivel = {}
+        self.por_etiqueta = {}
+        self.por_dificultad = {}
+        self.busqueda = IndiceBusqueda()
+
+        self._json_por_id = {}
+        self._json_por_nivel = {}
+        self._lock = threading.RLock()
+        self._ultima_revision = 0.0
+
+        self.revisar_cambios(forzar=True)
+
+    def _firmas_en_disco(self) -> Dict[str, tuple]:
+        """Firma (mtime, tamaño) de los archivos de cada ejercicio en disco"""
+        firmas = {}
+        if not os.path.isdir(self.directorio):
+            return firmas
+
+        with os.scandir(self.directorio) as entradas:
+            for entrada in entradas:
+                if not entrada.is_dir():
+                    continue
+                firma = []
+                for nombre in ARCHIVOS_EJERCICIO:
+                    try:
+                        estado = os.stat(os.path.join(entrada.path, nombre))
+                        firma.append((estado.st_mtime_ns, estado.st_size))
+                    except FileNotFoundError:
+                        firma.append(None)
+                if firma[0] is not None:
+                    firmas[entrada.path] = tuple(firma)
+        return firmas
+
+    def revisar_cambios(self, forzar: bool = False) -> bool:
+        """Recarga los ejercicios modificados; retorna True si hubo cambios"""
+        ahora = time.monotonic()
+        if not forzar and ahora - self._ultima_revision < self.intervalo_revision:
+            return False
+
+        with self._lock:
+            self._ultima_revision = ahora
+            firmas = self._firmas_en_disco()
+            actuales = {entrada.directorio: entrada for entrada in self.por_id.values()}
+            niveles_afectados = set()
+
+            for directorio, entrada in actuales.items():
+                if firmas.get(directorio) != entrada.firma:
+                    self._desindexar(entrada)
+                    niveles_afectados.add(entrada.nivel)
+
+            for directorio, firma in firmas.items():
+                entrada = actuales.get(directorio)
+                if entrada is not None and entrada.firma == firma:
+                    continue
+                try:
+                    entrada = EntradaEjercicio(directorio, firma)
+                except (OSError, ValueError, KeyError) as e:
+                    print(f"Ejercicio inválido en {directorio}: {e}")
+                    continue
+                self._indexar(entrada)
+                niveles_afectados.add(entrada.nivel)
+
+            if not niveles_afectados:
+                return False
+
+            for nivel in niveles_afectados:
+                self._ordenar_nivel(nivel)
+                self._json_por_nivel.pop(nivel, None)
+            self.version += 1
+            return True
+
+    def _indexar(self, entrada: EntradaEjercicio):
+        self.por_id[entrada.id] = entrada
+        self.por_nivel.setdefault(entrada.nivel, ())
+        for etiqueta in entrada.metadatos.get('etiquetas', []):
+            self.por_etiqueta.setdefault(etiqueta, {})[entrada.id] = entrada
+        self.por_dificultad.setdefault(entrada.metadatos['dificultad'], {})[entrada.id] = entrada
+        self.busqueda.agregar(entrada.id, entrada.metadatos, orden=(self._posicion_nivel(entrada.nivel), entrada.orden, entrada.id))
+
+    def _desindexar(self, entrada: EntradaEjercicio):
+        self.por_id.pop(entrada.id, None)
+        self._json_por_id.pop(entrada.id, None)
+        for etiqueta in entrada.metadatos.get('etiquetas', []):
+            self.por_etiqueta.get(etiqueta, {}).pop(entrada.id, None)
+        self.por_dificultad.get(entrada.metadatos['dificultad'], {}).pop(entrada.id, None)
+        self.busqueda.eliminar(entrada.id)
+
+    def _ordenar_nivel(self, nivel: str):
+        """Reconstruye la tupla ordenada de un nivel"""
+        entradas = sorted(
+            (e for e in self.por_id.values() if e.nivel == nivel),
+            key=lambda e: (e.orden, e.id)
+        )
+        if entradas:
+            self.por_nivel[nivel] = tuple(entradas)
+        else:
+            self.por_nivel.pop(nivel, None)
+
+    @staticmethod
+    def _posicion_nivel(nivel: str) -> int:
+        return NIVELES.index(nivel) if nivel in NIVELES else len(NIVELES)
+
+    @staticmethod
+    def _serializar(datos) -> bytes:
+        return json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def niveles(self):
+        """Niveles con ejercicios, en orden de dificultad"""
+        self.revisar_cambios()
+        return sorted(self.por_nivel, key=lambda n: (self._posicion_nivel(n), n))
+
+    def entrada(self, ejercicio_id: str) -> Optional[EntradaEjercicio]:
+        self.revisar_cambios()
+        return self.por_id.get(ejercicio_id)
+
+    def ejercicios_nivel(self, nivel: str):
+        """Ejercicios completos de un nivel (lista vacía si no existe)"""
+        self.revisar_cambios()
+        return [entrada.completo() for entrada in self.por_nivel.get(nivel, ())]
+
+    def buscar(self, consulta: str = '', filtros: Dict[str, set] = None,
+               pagina: int = 1, por_pagina: int = 10) -> Dict[str, Any]:
+        """Búsqueda de texto completo sobre titulo, descripcion y pistas, con facetas"""
+        self.revisar_cambios()
+        resultado = self.busqueda.buscar(consulta, filtros, pagina, por_pagina)
+        for item in resultado['resultados']:
+            metadatos = self.por_id[item['id']].metadatos
+            item.update({k: v for k, v in metadatos.items() if k not in ('orden', 'pistas')})
+        return resultado
+
+    def json_ejercicio(self, ejercicio_id: str) -> Optional[bytes]:
+        """JSON de un ejercicio, o None si no existe"""
+        self.revisar_cambios()
+        datos = self._json_por_id.get(ejercicio_id)
+        if datos is None:
+            entrada = self.por_id.get(ejercicio_id)
+            if entrada is None:
+                return None
+            datos = self._json_por_id[ejercicio_id] = self._serializar(entrada.completo())
+        return datos
+
+    def json_nivel(self, nivel: str) -> bytes:
+        """JSON de los ejercicios de un nivel (principiante si el nivel no existe)"""
+        self.revisar_cambios()
+        if nivel not in self.por_nivel:
+            nivel = 'principiante'
+        datos = self._json_por_nivel.get(nivel)
+        if datos is None:
+            datos = self._json_por_nivel[nivel] = self._serializar(self.ejercicios_nivel(nivel))
+        return datos
+
+
+catalogo = CatalogoEjercicios()
+
+
 class BibliotecaEjercicios:
     def __init__(self):
-        self.ejercicios = {
-            'principiante': [
-                {
-                    'id': 'p1',
-                    'titulo': 'Suma de dos números',
-                    'descripcion': 'Crea una función llamada "sumar" que reciba dos números y retorne su suma',
-                    'dificultad': 1,
-                    'puntos': 10,
-                    'codigo_plantilla': '''def sumar(a, b):
-    # Escribe tu código aquí
-    pass
-
-# Prueba tu función
-resultado = sumar(5, 3)
-print(f"La suma es: {resultado}")''',
-                    'pistas': [
-                        'Usa el operador + para sumar',
-                        'No olvides usar return para devolver el resultado',
-                        'Los parámetros a y b son los números a sumar'
-                    ],
-                    'tests': [
-                        {'input': (2, 3), 'output': 5, 'descripcion': 'sumar(2, 3) debe retornar 5'},
-                        {'input': (10, 5), 'output': 15, 'descripcion': 'sumar(10, 5) debe retornar 15'},
-                        {'input': (0, 0), 'output': 0, 'descripcion': 'sumar(0, 0) debe retornar 0'}
-                    ]
-                },
-                {
-                    'id': 'p2',
-                    'titulo': 'Número par o impar',
-                    'descripcion': 'Crea una función "es_par" que determine si un número es par',
-                    'dificultad': 1,
-                    'puntos': 10,
-                    'codigo_plantilla': '''def es_par(numero):
-    # Escribe tu código aquí
-    pass
-
-# Prueba tu función
-print(es_par(4))  # Debe imprimir True
-print(es_par(7))  # Debe imprimir False''',
-                    'pistas': [
-                        'Usa el operador módulo % para obtener el resto',
-                        'Un número es par si el resto de dividirlo entre 2 es 0',
-                        'Retorna True o False según corresponda'
-                    ],
-                    'tests': [
-                        {'input': 4, 'output': True},
-                        {'input': 7, 'output': False},
-                        {'input': 0, 'output': True}
-                    ]
-                },
-                {
-                    'id': 'p3',
-                    'titulo': 'Saludo personalizado',
-                    'descripcion': 'Crea una función que salude a una persona por su nombre',
-                    'dificultad': 1,
-                    'puntos': 10,
-                    'codigo_plantilla': '''def saludar(nombre):
-    # Escribe tu código aquí
-    pass
-
-# Prueba tu función
-saludar("Juan")  # Debe imprimir: Hola, Juan!''',
-                    'pistas': [
-                        'Usa print() para mostrar el mensaje',
-                        'Usa f-strings para incluir el nombre: f"Hola, {nombre}!"',
-                        'No necesitas return, solo print'
-                    ],
-                    'tests': []
-                },
-                {
-                    'id': 'p4',
-                    'titulo': 'Mayor de dos números',
-                    'descripcion': 'Crea una función que retorne el mayor de dos números',
-                    'dificultad': 2,
-                    'puntos': 15,
-                    'codigo_plantilla': '''def mayor(a, b):
-    # Escribe tu código aquí
-    pass
-
-# Prueba
-print(mayor(10, 5))  # Debe imprimir 10
-print(mayor(3, 8))   # Debe imprimir 8''',
-                    'pistas': [
-                        'Usa una estructura if-else',
-                        'Compara los números con el operador >',
-                        'Retorna el número mayor'
-                    ],
-                    'tests': [
-                        {'input': (10, 5), 'output': 10},
-                        {'input': (3, 8), 'output': 8},
-                        {'input': (5, 5), 'output': 5}
-                    ]
-                }
-            ],
-            'intermedio': [
-                {
-                    'id': 'i1',
-                    'titulo': 'Contar vocales',
-                    'descripcion': 'Crea una función que cuente cuántas vocales hay en un texto',
-                    'dificultad': 3,
-                    'puntos': 20,
-                    'codigo_plantilla': '''def contar_vocales(texto):
-    # Escribe tu código aquí
-    pass
-
-# Prueba
-frase = "Hola Mundo"
-cantidad = contar_vocales(frase)
-print(f"Hay {cantidad} vocales")''',
-                    'pistas': [
-                        'Define una lista o string con las vocales: "aeiouAEIOU"',
-                        'Recorre cada letra del texto con un bucle for',
-                        'Usa un contador que incremente cuando encuentres una vocal'
-                    ],
-                    'tests': [
-                        {'input': 'Hola', 'output': 2},
-                        {'input': 'Python', 'output': 1},
-                        {'input': 'Programacion', 'output': 5}
-                    ]
-                },
-                {
-                    'id': 'i2',
-                    'titulo': 'Lista de números pares',
-                    'descripcion': 'Crea una función que retorne solo los números pares de una lista',
-                    'dificultad': 3,
-                    'puntos': 20,
-                    'codigo_plantilla': '''def filtrar_pares(lista):
-    # Escribe tu código aquí
-    pass
-
-# Prueba
-numeros = [1, 2, 3, 4, 5, 6, 7, 8]
-pares = filtrar_pares(numeros)
-print(pares)  # [2, 4, 6, 8]''',
-                    'pistas': [
-                        'Crea una lista vacía para almacenar los pares',
-                        'Recorre la lista original con un for',
-                        'Si el número es par (numero % 2 == 0), agrégalo a la nueva lista'
-                    ],
-                    'tests': [
-                        {'input': [1,2,3,4,5,6], 'output': [2,4,6]},
-                        {'input': [10,15,20,25], 'output': [10,20]}
-                    ]
-                },
-                {
-                    'id': 'i3',
-                    'titulo': 'Diccionario de estudiantes',
-                    'descripcion': 'Crea una función que agregue un estudiante a un diccionario',
-                    'dificultad': 4,
-                    'puntos': 25,
-                    'codigo_plantilla': '''def agregar_estudiante(diccionario, nombre, edad, nota):
-    # Escribe tu código aquí
-    pass
-
-# Prueba
-estudiantes = {}
-agregar_estudiante(estudiantes, "Ana", 20, 95)
-agregar_estudiante(estudiantes, "Luis", 22, 88)
-print(estudiantes)''',
-                    'pistas': [
-                        'Usa el nombre como clave del diccionario',
-                        'El valor debe ser otro diccionario con edad y nota',
-                        'Ejemplo: diccionario[nombre] = {"edad": edad, "nota": nota}'
-                    ],
-                    'tests': []
-                },
-                {
-                    'id': 'i4',
-                    'titulo': 'Promedio de una lista',
-                    'descripcion': 'Crea una función que calcule el promedio de una lista de números',
-                    'dificultad': 3,
-                    'puntos': 20,
-                    'codigo_plantilla': '''def calcular_promedio(numeros):
-    # Escribe tu código aquí
-    pass
-
-# Prueba
-notas = [85, 90, 78, 92, 88]
-promedio = calcular_promedio(notas)
-print(f"Promedio: {promedio}")''',
-                    'pistas': [
-                        'Usa sum() para sumar todos los números',
-                        'Usa len() para contar cuántos números hay',
-                        'Divide la suma entre la cantidad: sum(numeros) / len(numeros)'
-                    ],
-                    'tests': [
-                        {'input': [10,20,30], 'output': 20},
-                        {'input': [85,90,95], 'output': 90}
-                    ]
-                }
-            ],
-            'avanzado': [
-                {
-                    'id': 'a1',
-                    'titulo': 'Clase Calculadora',
-                    'descripcion': 'Implementa una clase Calculadora con métodos para operaciones básicas',
-                    'dificultad': 5,
-                    'puntos': 30,
-                    'codigo_plantilla': '''class Calculadora:
-    def __init__(self):
-        # Constructor
-        pass
-    
-    def sumar(self, a, b):
-        # Implementa suma
-        pass
-    
-    def restar(self, a, b):
-        # Implementa resta
-        pass
-    
-    def multiplicar(self, a, b):
-        # Implementa multiplicación
-        pass
-    
-    def dividir(self, a, b):
-        # Implementa división (maneja división por cero)
-        pass
-
-# Prueba
-calc = Calculadora()
-print(calc.sumar(10, 5))
-print(calc.dividir(10, 2))''',
-                    'pistas': [
-                        'Cada método debe retornar el resultado de la operación',
-                        'En dividir, verifica que b no sea 0 antes de dividir',
-                        'Usa if b == 0: return "Error" o raise ValueError'
-                    ],
-                    'tests': []
-                },
-                {
-                    'id': 'a2',
-                    'titulo': 'Clase Estudiante',
-                    'descripcion': 'Crea una clase Estudiante con atributos y método para calcular promedio',
-                    'dificultad': 5,
-                    'puntos': 30,
-                    'codigo_plantilla': '''class Estudiante:
-    def __init__(self, nombre, edad):
-        # Inicializa atributos
-        self.nombre = nombre
-        self.edad = edad
-        self.notas = []
-    
-    def agregar_nota(self, nota):
-        # Agrega una nota a la lista
-        pass
-    
-    def calcular_promedio(self):
-        # Calcula y retorna el promedio de las notas
-        pass
-    
-    def mostrar_info(self):
-        # Muestra información del estudiante
-        pass
-
-# Prueba
-est = Estudiante("María", 20)
-est.agregar_nota(90)
-est.agregar_nota(85)
-est.agregar_nota(95)
-print(est.calcular_promedio())
-est.mostrar_info()''',
-                    'pistas': [
-                        'agregar_nota debe hacer: self.notas.append(nota)',
-                        'calcular_promedio: sum(self.notas) / len(self.notas)',
-                        'mostrar_info debe usar print para mostrar nombre, edad y promedio'
-                    ],
-                    'tests': []
-                },
-                {
-                    'id': 'a3',
-                    'titulo': 'Decorador de tiempo',
-                    'descripcion': 'Crea un decorador que mida el tiempo de ejecución de una función',
-                    'dificultad': 7,
-                    'puntos': 40,
-                    'codigo_plantilla': '''import time
-
-def medir_tiempo(funcion):
-    def wrapper(*args, **kwargs):
-        # Implementa el decorador aquí
-        pass
-    return wrapper
-
-@medir_tiempo
-def funcion_lenta():
-    time.sleep(1)
-    print("Función ejecutada")
-
-# Prueba
-funcion_lenta()''',
-                    'pistas': [
-                        'Guarda el tiempo inicial: inicio = time.time()',
-                        'Ejecuta la función: resultado = funcion(*args, **kwargs)',
-                        'Calcula tiempo transcurrido: time.time() - inicio',
-                        'Imprime el tiempo y retorna el resultado'
-                    ],
-                    'tests': []
-                }
-            ]
-        }
-    
+        self.catalogo = catalogo
+
+    @property
+    def ejercicios(self):
+        """Ejercicios completos agrupados por nivel"""
+        return {nivel: self.catalogo.ejercicios_nivel(nivel) for nivel in self.catalogo.niveles()}
+
     def obtener_ejercicios_por_nivel(self, nivel):
         """Retorna todos los ejercicios de un nivel"""
-        return self.ejercicios.get(nivel, self.ejercicios['principiante'])
-    
+        if nivel not in self.catalogo.niveles():
+            nivel = 'principiante'
+        return self.catalogo.ejercicios_nivel(nivel)
+
     def obtener_ejercicio(self, ejercicio_id):
         """Obtiene un ejercicio específico por su ID"""
-        for nivel, ejercicios in self.ejercicios.items():
-            for ejercicio in ejercicios:
-                if ejercicio['id'] == ejercicio_id:
-                    return ejercicio
-        return None
-    
+        entrada = self.catalogo.entrada(ejercicio_id)
+        return entrada.completo() if entrada else None
+
+    def obtener_ejercicios_por_etiqueta(self, etiqueta):
+        """Retorna los ejercicios que tienen una etiqueta"""
+        self.catalogo.revisar_cambios()
+        return [e.completo() for e in self.catalogo.por_etiqueta.get(etiqueta, {}).values()]
+
+    def obtener_ejercicios_por_dificultad(self, dificultad):
+        """Retorna los ejercicios de una dificultad"""
+        self.catalogo.revisar_cambios()
+        return [e.completo() for e in self.catalogo.por_dificultad.get(dificultad, {}).values()]
+
     def obtener_ejercicio_aleatorio(self, nivel):
         """Retorna un ejercicio aleatorio del nivel especificado"""
-        import random
-        ejercicios_nivel = self.ejercicios.get(nivel, [])
+        self.catalogo.revisar_cambios()
+        ejercicios_nivel = self.catalogo.por_nivel.get(nivel, ())
         if ejercicios_nivel:
-            return random.choice(ejercicios_nivel)
+            return random.choice(ejercicios_nivel).completo()
         return None
-    
+
     def contar_ejercicios(self):
         """Cuenta total de ejercicios por nivel"""
+        self.catalogo.revisar_cambios()
         return {
-            nivel: len(ejercicios) 
-            for nivel, ejercicios in self.ejercicios.items()
+            nivel: len(ejercicios)
+            for nivel, ejercicios in self.catalogo.por_nivel.items()
         }
@@ -1,10 +1,36 @@
 import ast
 import sys
-import io
-import contextlib
 import re
 from typing import Dict, List, Any, Tuple
 from datetime import datetime
+import sandbox
+from sandbox import ejecutar_codigo, cache_ejecuciones
+from metricas import registro, LIMITES_RAPIDOS
+from trazas import span, trazado
+
+TIEMPO_ETAPAS = registro.histograma('webia_analisis_etapa_segundos', 'Duración de cada etapa del análisis de código',
+                                    ('etapa',), limites=LIMITES_RAPIDOS)
+
+# Se crean en la primera evaluación que los usa (no al importar ni en cada llamada):
+# EvaluadorInteligente no guarda estado entre evaluaciones y DatabaseManager
+# crea el esquema al construirse
+_evaluador_ia = None
+_db = None
+
+def _obtener_evaluador_ia():
+    global _evaluador_ia
+    if _evaluador_ia is None:
+        from ia_evaluador import EvaluadorInteligente
+        with span('EvaluadorInteligente.__init__'):
+            _evaluador_ia = EvaluadorInteligente()
+    return _evaluador_ia
+
+def _obtener_db():
+    global _db
+    if _db is None:
+        from database import DatabaseManager
+        _db = DatabaseManager()
+    return _db
 
 class AnalizadorAST(ast.NodeVisitor):
     """Analizador avanzado de AST de Python"""
@@ -134,6 +160,7 @@ class EvaluadorCodigo:
     def __init__(self):
         self.analizador = None
     
+    @trazado()
     def analizar_codigo_estatico(self, codigo: str) -> Dict[str, Any]:
         """Analiza el código sin ejecutarlo"""
         try:
@@ -142,9 +169,11 @@ class EvaluadorCodigo:
             lineas_comentarios = len([l for l in lineas if l.strip().startswith('#')])
             lineas_vacias = len([l for l in lineas if not l.strip()])
             
-            tree = ast.parse(codigo)
+            with TIEMPO_ETAPAS.etiquetas('parse').medir(), span('parse'):
+                tree = ast.parse(codigo)
             self.analizador = AnalizadorAST()
-            self.analizador.visit(tree)
+            with TIEMPO_ETAPAS.etiquetas('visita_ast').medir(), span('AnalizadorAST.visit'):
+                self.analizador.visit(tree)
             
             self.analizador.metricas.update({
                 'lineas_codigo': lineas_codigo,
@@ -254,53 +283,44 @@ class EvaluadorCodigo:
         
         return min(max(score, 0), 100)
     
-    def ejecutar_codigo_seguro(self, codigo: str, timeout: int = 5) -> Dict[str, Any]:
+    @trazado()
+    def ejecutar_codigo_seguro(self, codigo: str, timeout: int = 5,
+                               consultar_cache: bool = True) -> Dict[str, Any]:
         """Ejecuta código Python de forma segura"""
+        if consultar_cache:
+            resultado = cache_ejecuciones.obtener(codigo)
+            if resultado is not None:
+                return resultado
+        
         try:
-            try:
-                compile(codigo, '<string>', 'exec')
-            except SyntaxError as e:
-                return {
-                    'success': False,
-                    'error': f'Error de sintaxis en línea {e.lineno}: {e.msg}',
-                    'output': ''
-                }
-            
-            captured_output = io.StringIO()
-            restricted_builtins = {
-                'print': print,
-                'len': len,
-                'range': range,
-                'sum': sum,
-                'min': min,
-                'max': max,
-            }
-            
-            with contextlib.redirect_stdout(captured_output):
-                with contextlib.redirect_stderr(captured_output):
-                    exec(codigo, {'__builtins__': restricted_builtins})
-            
-            output = captured_output.getvalue()
-            
-            return {
-                'success': True,
-                'output': output if output else 'Código ejecutado sin salida visible',
-                'error': None
-            }
-            
+            if sandbox.MODO_EJECUCION == 'fork':
+                from servidor_fork import cliente_fork
+                resultado, determinista = cliente_fork.ejecutar(codigo, timeout)
+            else:
+                resultado, determinista = ejecutar_codigo(codigo, timeout)
         except Exception as e:
             return {
                 'success': False,
                 'error': f'{type(e).__name__}: {str(e)}',
                 'output': ''
             }
+        
+        # Solo los programas deterministas pueden reutilizar su resultado
+        if determinista:
+            cache_ejecuciones.guardar(codigo, resultado)
+        
+        resultado['cache'] = False
+        return resultado
     
+    @trazado()
     def evaluar_codigo_completo(self, codigo: str) -> Dict[str, Any]:
         """Evaluación completa del código con todas las métricas"""
-        analisis = self.analizar_codigo_estatico(codigo)
-        feedback = self.generar_feedback(analisis)
-        sugerencias = self.generar_sugerencias(analisis)
-        score = self.calcular_puntuacion(analisis)
+        with TIEMPO_ETAPAS.etiquetas('estatico').medir():
+            analisis = self.analizar_codigo_estatico(codigo)
+        with TIEMPO_ETAPAS.etiquetas('feedback').medir(), span('feedback'):
+            feedback = self.generar_feedback(analisis)
+            sugerencias = self.generar_sugerencias(analisis)
+            score = self.calcular_puntuacion(analisis)
         
         if analisis.get('sintaxis_valida', False):
             metricas_frontend = {
@@ -328,20 +348,19 @@ class EvaluadorCodigo:
     def evaluar_con_ia(self, codigo):
         """Nueva función que usa IA real para evaluación adaptativa"""
         try:
-            from ia_evaluador import EvaluadorInteligente
-            evaluador_ia = EvaluadorInteligente()
-            return evaluador_ia.evaluacion_completa_con_ia(codigo)
+            evaluador_ia = _obtener_evaluador_ia()
         except ImportError:
             return {'error': 'Módulo de IA no disponible'}
+        return evaluador_ia.evaluacion_completa_con_ia(codigo)
     
+    @trazado()
     def evaluar_y_guardar(self, codigo, estudiante_id=None):
         """Evaluar código y guardar en base de datos"""
         resultado = self.evaluar_codigo_completo(codigo)
         
         if estudiante_id:
             try:
-                from database import DatabaseManager
-                db = DatabaseManager()
+                db = _obtener_db()
                 resultado['codigo'] = codigo
                 db.guardar_evaluacion(estudiante_id, resultado)
             except ImportError:
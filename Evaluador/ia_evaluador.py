@@ -1,8 +1,16 @@
 import re
 import math
 from collections import Counter
+from datetime import datetime
 from typing import Dict, List, Tuple, Any
 
+from metricas import registro, LIMITES_RAPIDOS
+from trazas import trazado
+
+TIEMPO_COMPONENTES = registro.histograma('webia_ia_componente_segundos',
+                                         'Duración de cada componente de la evaluación con IA',
+                                         ('componente',), limites=LIMITES_RAPIDOS)
+
 class ClasificadorNivel:
     """Clasificador de IA que determina automáticamente el nivel del programador"""
     
@@ -106,6 +114,7 @@ class ClasificadorNivel:
         
         return puntuacion_estructura
 
+    @trazado()
     def clasificar_nivel(self, codigo: str) -> Dict[str, Any]:
         """Clasificador principal que determina el nivel del programador"""
         
@@ -201,6 +210,7 @@ class SistemaRecomendacionesAdaptativo:
             'sintaxis_print_python2': r'print\s+[^(]',
         }
 
+    @trazado()
     def analizar_errores_comunes(self, codigo: str) -> List[str]:
         """Detecta patrones de errores comunes"""
         errores_detectados = []
@@ -211,6 +221,7 @@ class SistemaRecomendacionesAdaptativo:
         
         return errores_detectados
 
+    @trazado()
     def generar_recomendaciones(self, nivel: str, codigo: str, errores: List[str]) -> Dict[str, List[str]]:
         """Genera recomendaciones adaptativas basadas en el nivel y errores"""
         
@@ -302,6 +313,7 @@ class PredictorDificultad:
         
         return len(conceptos)
 
+    @trazado()
     def predecir_dificultad(self, codigo: str, nivel_estudiante: str) -> Dict[str, Any]:
         """Predice la dificultad del código para el estudiante"""
         
@@ -405,23 +417,28 @@ class EvaluadorInteligente:
         self.recomendador = SistemaRecomendacionesAdaptativo()
         self.predictor = PredictorDificultad()
         
+    @trazado()
     def evaluacion_completa_con_ia(self, codigo: str) -> Dict[str, Any]:
         """Evaluación completa usando todos los componentes de IA"""
         
         # 1. Clasificar nivel del estudiante
-        clasificacion = self.clasificador.clasificar_nivel(codigo)
+        with TIEMPO_COMPONENTES.etiquetas('clasificador').medir():
+            clasificacion = self.clasificador.clasificar_nivel(codigo)
         nivel_estudiante = clasificacion['nivel_predicho']
         
         # 2. Detectar errores comunes
-        errores = self.recomendador.analizar_errores_comunes(codigo)
+        with TIEMPO_COMPONENTES.etiquetas('errores_comunes').medir():
+            errores = self.recomendador.analizar_errores_comunes(codigo)
         
         # 3. Generar recomendaciones adaptativas
-        recomendaciones = self.recomendador.generar_recomendaciones(
-            nivel_estudiante, codigo, errores
-        )
+        with TIEMPO_COMPONENTES.etiquetas('recomendaciones').medir():
+            recomendaciones = self.recomendador.generar_recomendaciones(
+                nivel_estudiante, codigo, errores
+            )
         
         # 4. Predecir dificultad del ejercicio
-        prediccion_dificultad = self.predictor.predecir_dificultad(codigo, nivel_estudiante)
+        with TIEMPO_COMPONENTES.etiquetas('predictor_dificultad').medir():
+            prediccion_dificultad = self.predictor.predecir_dificultad(codigo, nivel_estudiante)
         
         # 5. Compilar resultado final
         return {
@@ -434,5 +451,4 @@ class EvaluadorInteligente:
     
     def _obtener_timestamp(self):
         """Obtiene timestamp actual"""
-        from datetime import datetime
         return datetime.now().isoformat()
@@ -0,0 +1,231 @@
+import contextlib
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, Any
+
+from metricas import registro
+
+# Límites (en segundos) de los buckets del histograma de espera en cola
+LIMITES_ESPERA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LimiteExcedido(Exception):
+    """Solicitud rechazada por el control de admisión"""
+
+    def __init__(self, mensaje: str, retry_after: float):
+        super().__init__(mensaje)
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_segundos(self) -> int:
+        """Valor entero para la cabecera Retry-After"""
+        return max(1, math.ceil(self.retry_after))
+
+
+class CuboTokens:
+    """Token bucket que limita la frecuencia de ejecuciones de un estudiante"""
+
+    def __init__(self, capacidad: float, tasa: float, ahora: float):
+        self.capacidad = capacidad
+        self.tasa = tasa
+        self.tokens = capacidad
+        self.ultimo = ahora
+
+    def rellenar(self, ahora: float):
+        """Agrega los tokens generados desde la última consulta"""
+        self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+        self.ultimo = ahora
+
+    def espera(self, ahora: float) -> float:
+        """Segundos hasta que haya un token (0 si ya hay uno), sin consumirlo"""
+        self.rellenar(ahora)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.tasa
+
+    def consumir(self, ahora: float) -> float:
+        """Consume un token; retorna 0 o los segundos hasta el próximo token"""
+        espera = self.espera(ahora)
+        if not espera:
+            self.tokens -= 1
+        return espera
+
+    def devolver(self):
+        """Reintegra el token de una solicitud que no llegó a ejecutarse"""
+        self.tokens = min(self.capacidad, self.tokens + 1)
+
+    def lleno(self, ahora: float) -> bool:
+        """Indica si el cubo ya se habría rellenado por completo"""
+        return self.tokens + (ahora - self.ultimo) * self.tasa >= self.capacidad
+
+
+class ControlAdmision:
+    """Control de admisión para ejecuciones: concurrencia global, token bucket
+    por estudiante y cola justa (round-robin entre estudiantes).
+
+    Con `direccion` cada ejecución consume además del token bucket de esa
+    dirección, más grande: el estudiante lo declara el cliente y la dirección
+    la observa el servidor, así que inventar estudiantes no supera el límite
+    de la dirección, y un aula detrás de un mismo NAT no comparte un único
+    cubo de estudiante.
+    """
+
+    MAX_CUBOS = 10000
+
+    def __init__(self, max_concurrentes: int = 4, max_cola: int = 32,
+                 capacidad_cubo: float = 5, tasa_cubo: float = 1.0,
+                 espera_maxima: float = 10.0, capacidad_direccion: float = 50,
+                 tasa_direccion: float = 10.0):
+        self.max_concurrentes = max_concurrentes
+        self.max_cola = max_cola
+        self.capacidad_cubo = capacidad_cubo
+        self.tasa_cubo = tasa_cubo
+        self.capacidad_direccion = capacidad_direccion
+        self.tasa_direccion = tasa_direccion
+        self.espera_maxima = espera_maxima
+
+        self._lock = threading.Lock()
+        self._activos = 0
+        self._en_cola = 0
+        self._colas = OrderedDict()  # estudiante -> deque de turnos pendientes
+        self._cubos = {}
+        self._cubos_direccion = {}
+        self._duracion_media = 0.5
+
+        self.espera_cola = registro.histograma('webia_sandbox_espera_cola_segundos',
+                                               'Espera de las ejecuciones hasta obtener turno',
+                                               limites=LIMITES_ESPERA)
+        self.rechazos = {'frecuencia': 0, 'frecuencia_direccion': 0, 'cola_llena': 0, 'espera_agotada': 0}
+        self._contador_rechazos = registro.contador('webia_sandbox_rechazos_total',
+                                                    'Ejecuciones rechazadas por el control de admisión',
+                                                    ('motivo',))
+        registro.medidor('webia_sandbox_en_cola', 'Ejecuciones esperando turno',
+                         funcion=lambda: self._en_cola)
+        registro.medidor('webia_sandbox_activas', 'Ejecuciones en curso',
+                         funcion=lambda: self._activos)
+
+    def _obtener_cubo(self, cubos: dict, clave, capacidad: float, tasa: float, ahora: float) -> CuboTokens:
+        """Obtiene (o crea) el token bucket de `clave` en `cubos`"""
+        cubo = cubos.get(clave)
+        if cubo is None:
+            if len(cubos) >= self.MAX_CUBOS:
+                # Descartar cubos inactivos: uno nuevo estaría igual de lleno
+                for inactivo in [k for k, c in cubos.items() if c.lleno(ahora)]:
+                    del cubos[inactivo]
+            cubo = CuboTokens(capacidad, tasa, ahora)
+            cubos[clave] = cubo
+        return cubo
+
+    def _estimar_espera(self) -> float:
+        """Estima cuánto tardará en liberarse un lugar en la cola"""
+        rondas = (self._en_cola + 1) / max(self.max_concurrentes, 1)
+        return rondas * self._duracion_media
+
+    def _rechazar(self, motivo: str, mensaje: str, espera: float):
+        self.rechazos[motivo] += 1
+        self._contador_rechazos.etiquetas(motivo).incrementar()
+        raise LimiteExcedido(mensaje, espera)
+
+    def adquirir(self, estudiante, direccion=None):
+        """Espera un lugar de ejecución o lanza LimiteExcedido"""
+        inicio = time.monotonic()
+
+        with self._lock:
+            inmediato = self._activos < self.max_concurrentes and not self._en_cola
+            # Con la cola llena se rechaza antes de consumir: el intento no gasta cuota
+            if not inmediato and self._en_cola >= self.max_cola:
+                self._rechazar('cola_llena', 'El servidor está ocupado, intenta de nuevo', self._estimar_espera())
+
+            # Se verifican los dos cubos antes de consumir: un rechazo no gasta el token del otro
+            cubos = [self._obtener_cubo(self._cubos, estudiante, self.capacidad_cubo, self.tasa_cubo, inicio)]
+            espera = cubos[0].espera(inicio)
+            if espera:
+                self._rechazar('frecuencia', 'Demasiadas ejecuciones seguidas, espera un momento', espera)
+            if direccion is not None:
+                cubos.append(self._obtener_cubo(self._cubos_direccion, direccion, self.capacidad_direccion,
+                                                self.tasa_direccion, inicio))
+                espera = cubos[1].espera(inicio)
+                if espera:
+                    self._rechazar('frecuencia_direccion',
+                                   'Demasiadas ejecuciones desde esta red, espera un momento', espera)
+            for cubo in cubos:
+                cubo.consumir(inicio)
+
+            if inmediato:
+                self._activos += 1
+                self.espera_cola.observar(0.0)
+                return
+
+            turno = threading.Event()
+            self._colas.setdefault(estudiante, deque()).append(turno)
+            self._en_cola += 1
+
+        if not turno.wait(self.espera_maxima):
+            with self._lock:
+                # El turno pudo concederse justo después del timeout
+                if not turno.is_set():
+                    self._retirar_turno(estudiante, turno)
+                    for cubo in cubos:
+                        cubo.devolver()
+                    self._rechazar('espera_agotada', 'Tiempo de espera agotado en la cola', self._estimar_espera())
+
+        self.espera_cola.observar(time.monotonic() - inicio)
+
+    def liberar(self, duracion: float = None):
+        """Libera un lugar de ejecución y despacha el siguiente turno"""
+        with self._lock:
+            self._activos -= 1
+            if duracion is not None:
+                self._duracion_media = 0.8 * self._duracion_media + 0.2 * duracion
+            self._despachar()
+
+    def _despachar(self):
+        """Concede turnos en round-robin entre los estudiantes en cola"""
+        while self._activos < self.max_concurrentes and self._colas:
+            estudiante, cola = next(iter(self._colas.items()))
+            turno = cola.popleft()
+            self._en_cola -= 1
+
+            if cola:
+                self._colas.move_to_end(estudiante)
+            else:
+                del self._colas[estudiante]
+
+            self._activos += 1
+            turno.set()
+
+    def _retirar_turno(self, estudiante, turno):
+        """Elimina de la cola un turno que se cansó de esperar"""
+        cola = self._colas.get(estudiante)
+        if cola is None:
+            return
+        cola.remove(turno)
+        self._en_cola -= 1
+        if not cola:
+            del self._colas[estudiante]
+
+    @contextlib.contextmanager
+    def ejecucion(self, estudiante, direccion=None):
+        """Context manager que envuelve una ejecución admitida"""
+        self.adquirir(estudiante, direccion)
+        inicio = time.monotonic()
+        try:
+            yield
+        finally:
+            self.liberar(time.monotonic() - inicio)
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Estado actual del control de admisión"""
+        with self._lock:
+            estado = {
+                'activos': self._activos,
+                'en_cola': self._en_cola,
+                'estudiantes_en_cola': len(self._colas),
+                'max_concurrentes': self.max_concurrentes,
+                'max_cola': self.max_cola,
+                'rechazos': dict(self.rechazos)
+            }
+        estado['espera_cola_segundos'] = self.espera_cola.exportar()
+        return estado
@@ -0,0 +1,370 @@
+"""Registro de métricas en proceso, exportado en formato de texto de Prometheus.
+
+Cada módulo declara sus métricas al importarse:
+
+    LATENCIA = registro.histograma('webia_x_segundos', 'Duración de x', ('ruta',))
+    with LATENCIA.etiquetas(ruta='/api/x').medir():
+        ...
+
+Contadores, medidores e histogramas son seguros entre hilos. Con varios
+workers (servidor.py) cada proceso vuelca una instantánea a
+<directorio>/<pid>.json y /metrics suma las de todos: contadores e
+histogramas de workers ya terminados se conservan, los medidores solo se
+suman para los procesos vivos. Tras un fork los valores del hijo empiezan
+de cero para no contar dos veces lo heredado.
+"""
+import bisect
+import contextlib
+import functools
+import glob
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Tuple
+
+# Límites (en segundos) por defecto de los histogramas de latencia
+LIMITES_LATENCIA = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Para etapas que suelen durar menos de un milisegundo
+LIMITES_RAPIDOS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+
+class Contador:
+    """Valor que solo crece"""
+
+    def __init__(self):
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+    def incrementar(self, cantidad: float = 1.0):
+        with self._lock:
+            self.valor += cantidad
+
+    def volcar(self) -> float:
+        return self.valor
+
+    def reiniciar(self):
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+
+class Medidor:
+    """Valor que sube y baja; con `funcion` se lee al exportar"""
+
+    def __init__(self, funcion: Callable[[], float] = None):
+        self.valor = 0.0
+        self.funcion = funcion
+        self._lock = threading.Lock()
+
+    def fijar(self, valor: float):
+        self.valor = valor
+
+    def incrementar(self, cantidad: float = 1.0):
+        with self._lock:
+            self.valor += cantidad
+
+    def decrementar(self, cantidad: float = 1.0):
+        self.incrementar(-cantidad)
+
+    def volcar(self) -> float:
+        if self.funcion is not None:
+            try:
+                return float(self.funcion())
+            except Exception:
+                return float('nan')
+        return self.valor
+
+    def reiniciar(self):
+        self.valor = 0.0
+        self._lock = threading.Lock()
+
+
+class Histograma:
+    """Histograma acumulativo seguro entre hilos"""
+
+    def __init__(self, limites=LIMITES_LATENCIA):
+        self.limites = tuple(limites)
+        self.conteos = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float):
+        """Registra una observación"""
+        indice = bisect.bisect_left(self.limites, valor)
+        with self._lock:
+            self.conteos[indice] += 1
+            self.suma += valor
+            self.total += 1
+
+    @contextlib.contextmanager
+    def medir(self):
+        """Observa la duración del bloque"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(time.perf_counter() - inicio)
+
+    def exportar(self) -> Dict[str, Any]:
+        """Retorna los buckets acumulados al estilo Prometheus"""
+        with self._lock:
+            conteos = list(self.conteos)
+            suma = self.suma
+            total = self.total
+
+        buckets = []
+        acumulado = 0
+        for limite, conteo in zip(self.limites + (float('inf'),), conteos):
+            acumulado += conteo
+            buckets.append({'le': '+Inf' if limite == float('inf') else limite, 'conteo': acumulado})
+
+        return {'buckets': buckets, 'suma': round(suma, 6), 'total': total}
+
+    def volcar(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'conteos': list(self.conteos), 'suma': self.suma, 'total': self.total}
+
+    def reiniciar(self):
+        self.conteos = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+        self.total = 0
+        self._lock = threading.Lock()
+
+
+def cronometrado(histograma: Histograma):
+    """Decorador que observa en `histograma` la duración de cada llamada"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                histograma.observar(time.perf_counter() - inicio)
+        return envoltura
+    return decorador
+
+
+class Familia:
+    """Métrica con etiquetas: una serie (Contador, Medidor o Histograma) por combinación de valores"""
+
+    def __init__(self, nombre: str, ayuda: str, tipo: str, etiquetas: Tuple[str, ...], crear: Callable):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.tipo = tipo
+        self.nombres_etiquetas = tuple(etiquetas)
+        self.limites = None
+        self._crear = crear
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def etiquetas(self, *valores, **por_nombre):
+        """Serie de la combinación de valores dada (posicional o por nombre)"""
+        if por_nombre:
+            valores = tuple(str(por_nombre[n]) for n in self.nombres_etiquetas)
+        else:
+            valores = tuple(str(v) for v in valores)
+        serie = self._series.get(valores)
+        if serie is None:
+            if len(valores) != len(self.nombres_etiquetas):
+                raise ValueError(f"{self.nombre} espera las etiquetas {self.nombres_etiquetas}")
+            with self._lock:
+                serie = self._series.setdefault(valores, self._crear())
+        return serie
+
+    def volcar(self) -> Dict[str, Any]:
+        return {
+            'tipo': self.tipo,
+            'ayuda': self.ayuda,
+            'etiquetas': list(self.nombres_etiquetas),
+            'limites': list(self.limites) if self.limites else None,
+            'series': [[list(valores), serie.volcar()] for valores, serie in list(self._series.items())]
+        }
+
+    def reiniciar(self):
+        self._lock = threading.Lock()
+        for serie in list(self._series.values()):
+            serie.reiniciar()
+
+
+class RegistroMetricas:
+    """Métricas del proceso y, si hay directorio compartido, las de los demás workers"""
+
+    def __init__(self):
+        self.familias: Dict[str, Familia] = {}
+        self.directorio = None
+        self._lock = threading.Lock()
+        self._volcado_pid = None
+        os.register_at_fork(after_in_child=self._tras_fork)
+
+    def _familia(self, nombre, ayuda, tipo, etiquetas, crear, limites=None) -> Familia:
+        with self._lock:
+            familia = self.familias.get(nombre)
+            if familia is None:
+                familia = Familia(nombre, ayuda, tipo, etiquetas, crear)
+                familia.limites = limites
+                self.familias[nombre] = familia
+            elif familia.tipo != tipo or familia.nombres_etiquetas != tuple(etiquetas):
+                raise ValueError(f"La métrica {nombre} ya existe con otro tipo o etiquetas")
+        return familia
+
+    @staticmethod
+    def _serie_o_familia(familia: Familia, etiquetas):
+        # Sin etiquetas se usa directamente la única serie
+        return familia if etiquetas else familia.etiquetas()
+
+    def contador(self, nombre: str, ayuda: str, etiquetas=()):
+        return self._serie_o_familia(self._familia(nombre, ayuda, 'counter', etiquetas, Contador), etiquetas)
+
+    def medidor(self, nombre: str, ayuda: str, etiquetas=(), funcion: Callable[[], float] = None):
+        familia = self._familia(nombre, ayuda, 'gauge', etiquetas, Medidor)
+        if funcion is not None:
+            familia.etiquetas().funcion = funcion
+        return self._serie_o_familia(familia, etiquetas)
+
+    def histograma(self, nombre: str, ayuda: str, etiquetas=(), limites=LIMITES_LATENCIA):
+        familia = self._familia(nombre, ayuda, 'histogram', etiquetas,
+                                lambda: Histograma(limites), limites=tuple(limites))
+        return self._serie_o_familia(familia, etiquetas)
+
+    def volcar(self) -> Dict[str, Any]:
+        """Instantánea serializable de todas las métricas del proceso"""
+        return {nombre: familia.volcar() for nombre, familia in list(self.familias.items())}
+
+    def configurar_directorio(self, directorio: str):
+        """Directorio compartido por los workers para sus instantáneas"""
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+
+    def escribir_instantanea(self):
+        """Escribe la instantánea del proceso en el directorio compartido"""
+        if not self.directorio:
+            return
+        ruta = os.path.join(self.directorio, f'{os.getpid()}.json')
+        temporal = f'{ruta}.tmp'
+        with open(temporal, 'w') as archivo:
+            json.dump(self.volcar(), archivo, separators=(',', ':'))
+        os.replace(temporal, ruta)
+
+    def iniciar_volcado(self, intervalo: float = 5.0):
+        """Escribe la instantánea cada `intervalo` segundos en un hilo del proceso actual"""
+        if not self.directorio or self._volcado_pid == os.getpid():
+            return
+        self._volcado_pid = os.getpid()
+
+        def volcar_periodicamente():
+            while self._volcado_pid == os.getpid():
+                try:
+                    self.escribir_instantanea()
+                except OSError as e:
+                    print(f"No se pudo escribir la instantánea de métricas: {e}")
+                time.sleep(intervalo)
+
+        threading.Thread(target=volcar_periodicamente, name='metricas', daemon=True).start()
+
+    def _tras_fork(self):
+        # Lo heredado ya lo cuenta el padre; el hilo de volcado no sobrevive al fork
+        self._lock = threading.Lock()
+        self._volcado_pid = None
+        for familia in list(self.familias.values()):
+            familia.reiniciar()
+
+    def _instantaneas(self):
+        """(instantánea, vivo) de este proceso y de los demás del directorio"""
+        propia = self.volcar()
+        yield propia, True
+        if not self.directorio:
+            return
+        for ruta in glob.glob(os.path.join(self.directorio, '*.json')):
+            try:
+                pid = int(os.path.basename(ruta)[:-len('.json')])
+            except ValueError:
+                continue
+            if pid == os.getpid():
+                continue
+            try:
+                with open(ruta) as archivo:
+                    instantanea = json.load(archivo)
+            except (OSError, ValueError):
+                continue
+            try:
+                os.kill(pid, 0)
+                vivo = True
+            except ProcessLookupError:
+                vivo = False
+            except PermissionError:
+                vivo = True
+            yield instantanea, vivo
+
+    def combinar(self) -> Dict[str, Any]:
+        """Suma las instantáneas de todos los procesos"""
+        combinadas = {}
+        for instantanea, vivo in self._instantaneas():
+            for nombre, familia in instantanea.items():
+                if familia['tipo'] == 'gauge' and not vivo:
+                    continue
+                destino = combinadas.setdefault(nombre, dict(familia, series={}))
+                for valores, valor in familia['series']:
+                    clave = tuple(valores)
+                    actual = destino['series'].get(clave)
+                    if actual is None:
+                        destino['series'][clave] = (dict(valor, conteos=list(valor['conteos']))
+                                                    if isinstance(valor, dict) else valor)
+                    elif isinstance(valor, dict):
+                        actual['conteos'] = [a + b for a, b in zip(actual['conteos'], valor['conteos'])]
+                        actual['suma'] += valor['suma']
+                        actual['total'] += valor['total']
+                    else:
+                        destino['series'][clave] = actual + valor
+        return combinadas
+
+    def exportar(self) -> str:
+        """Todas las métricas en el formato de texto de Prometheus"""
+        lineas = []
+        for nombre, familia in sorted(self.combinar().items()):
+            lineas.append(f"# HELP {nombre} {_escapar_ayuda(familia['ayuda'])}")
+            lineas.append(f"# TYPE {nombre} {familia['tipo']}")
+            for valores, valor in sorted(familia['series'].items()):
+                etiquetas = list(zip(familia['etiquetas'], valores))
+                if familia['tipo'] != 'histogram':
+                    lineas.append(f"{nombre}{_formatear_etiquetas(etiquetas)} {_formatear_numero(valor)}")
+                    continue
+                acumulado = 0
+                for limite, conteo in zip(familia['limites'] + ['+Inf'], valor['conteos']):
+                    acumulado += conteo
+                    le = limite if limite == '+Inf' else _formatear_numero(limite)
+                    lineas.append(f"{nombre}_bucket{_formatear_etiquetas(etiquetas + [('le', le)])} {acumulado}")
+                lineas.append(f"{nombre}_sum{_formatear_etiquetas(etiquetas)} {_formatear_numero(valor['suma'])}")
+                lineas.append(f"{nombre}_count{_formatear_etiquetas(etiquetas)} {valor['total']}")
+        return '\n'.join(lineas) + '\n'
+
+
+def _escapar_ayuda(texto: str) -> str:
+    return texto.replace('\\', '\\\\').replace('\n', '\\n')
+
+
+def _formatear_etiquetas(etiquetas) -> str:
+    if not etiquetas:
+        return ''
+    partes = []
+    for nombre, valor in etiquetas:
+        valor = str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        partes.append(f'{nombre}="{valor}"')
+    return '{' + ','.join(partes) + '}'
+
+
+def _formatear_numero(valor: float) -> str:
+    if valor != valor:
+        return 'NaN'
+    if valor in (float('inf'), float('-inf')):
+        return '+Inf' if valor > 0 else '-Inf'
+    return repr(float(valor)) if not float(valor).is_integer() else str(int(valor))
+
+
+registro = RegistroMetricas()
+
+# Consultas a los caches en memoria, compartido por todos los módulos que tienen uno
+CONSULTAS_CACHE = registro.contador('webia_cache_consultas_total', 'Consultas a caches en memoria por resultado',
+                                    ('cache', 'resultado'))
@@ -0,0 +1,116 @@
+"""Perfilador estadístico de pilas para un worker en ejecución.
+
+Un hilo en segundo plano toma cada `intervalo` segundos las pilas de todos
+los hilos con sys._current_frames() y cuenta cuántas veces aparece cada una.
+El resultado son pilas colapsadas ('modulo.funcion;modulo.funcion N'),
+listas para flamegraph.pl o speedscope. Por defecto solo se cuentan las
+pilas que pasan por código de la aplicación (evaluador.py, ia_evaluador.py,
+database.py, ...), no las de hilos inactivos esperando conexiones.
+
+Como el hilo de muestreo necesita el GIL, las llamadas que lo liberan (E/S,
+syscalls) aparecen algo sobrerrepresentadas frente al código Python puro.
+"""
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any
+
+DIRECTORIO_APP = os.path.dirname(os.path.abspath(__file__))
+
+# Archivos de la aplicación que no cuentan como código propio al filtrar: servidores
+# e hilos auxiliares que pasan casi todo el tiempo esperando
+ARCHIVOS_EXCLUIDOS = {
+    os.path.join(DIRECTORIO_APP, nombre)
+    for nombre in ('perfilador.py', 'servidor.py', 'asgi.py', 'metricas.py', 'database_async.py')
+}
+
+SEGUNDOS_MAXIMOS = 60
+
+# Etiquetas recordadas como mucho; al llegar al límite se empieza de nuevo
+MAX_ETIQUETAS = 20000
+
+
+class PerfilEnCurso(Exception):
+    """Ya hay un perfil en curso en este proceso"""
+
+
+class PerfiladorMuestreo:
+    """Muestrea las pilas de los hilos del proceso durante un tiempo dado"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (archivo, función, primera línea) -> (etiqueta, es de la aplicación). No se usa el
+        # objeto de código como clave: cada programa ejecutado en el sandbox local crea
+        # códigos nuevos que, además, quedarían vivos en el diccionario
+        self._etiquetas = {}
+
+    def _etiqueta(self, marco):
+        codigo = marco.f_code
+        nombre = getattr(codigo, 'co_qualname', codigo.co_name)
+        clave = (codigo.co_filename, nombre, codigo.co_firstlineno)
+        etiqueta = self._etiquetas.get(clave)
+        if etiqueta is None:
+            if len(self._etiquetas) >= MAX_ETIQUETAS:
+                self._etiquetas.clear()
+            archivo = codigo.co_filename
+            modulo = marco.f_globals.get('__name__') or os.path.splitext(os.path.basename(archivo))[0]
+            es_app = archivo.startswith(DIRECTORIO_APP) and archivo not in ARCHIVOS_EXCLUIDOS
+            etiqueta = self._etiquetas[clave] = (f'{modulo}.{nombre}'.replace(';', ','), es_app)
+        return etiqueta
+
+    def _muestrear(self, pilas: Counter, excluidos, solo_app: bool):
+        for id_hilo, marco in sys._current_frames().items():
+            if id_hilo in excluidos:
+                continue
+            pila = []
+            en_app = False
+            while marco is not None:
+                etiqueta, es_app = self._etiqueta(marco)
+                pila.append(etiqueta)
+                en_app = en_app or es_app
+                marco = marco.f_back
+            if en_app or not solo_app:
+                pilas[';'.join(reversed(pila))] += 1
+
+    def perfilar(self, segundos: float, intervalo: float = 0.005, solo_app: bool = True) -> Dict[str, Any]:
+        """Muestrea durante `segundos` y retorna las pilas colapsadas; bloquea hasta terminar"""
+        if not self._lock.acquire(blocking=False):
+            raise PerfilEnCurso('Ya hay un perfil en curso en este worker')
+        try:
+            pilas = Counter()
+            muestras = [0]
+            excluidos = {threading.get_ident()}
+
+            def muestrear():
+                excluidos.add(threading.get_ident())
+                limite = time.monotonic() + segundos
+                siguiente = time.monotonic()
+                while siguiente < limite:
+                    self._muestrear(pilas, excluidos, solo_app)
+                    muestras[0] += 1
+                    siguiente += intervalo
+                    time.sleep(max(0.0, siguiente - time.monotonic()))
+
+            inicio = time.monotonic()
+            hilo = threading.Thread(target=muestrear, name='perfilador', daemon=True)
+            hilo.start()
+            hilo.join()
+            return {
+                'pid': os.getpid(),
+                'segundos': round(time.monotonic() - inicio, 3),
+                'intervalo': intervalo,
+                'muestras': muestras[0],
+                'pilas': dict(pilas)
+            }
+        finally:
+            self._lock.release()
+
+
+def colapsado(perfil: Dict[str, Any]) -> str:
+    """Texto de pilas colapsadas, una por línea con su número de muestras"""
+    return ''.join(f'{pila} {cuenta}\n' for pila, cuenta in sorted(perfil['pilas'].items()))
+
+
+perfilador = PerfiladorMuestreo()
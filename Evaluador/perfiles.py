@@ -0,0 +1,128 @@
+"""Perfiles de dificultad precalculados de los ejercicios del catálogo.
+
+Cada ejercicio guarda en perfil.json las métricas de PredictorDificultad
+para su plantilla y su solución de referencia (solucion.py), normalizadas
+a [0, 1]. El perfil solo se recalcula cuando cambian esas fuentes.
+
+La aplicación nunca calcula perfiles, solo lee perfil.json: se generan al
+desplegar (o al cambiar ejercicios) con este script, y los workers en
+marcha los recogen con la recarga en caliente del catálogo.
+
+Uso:
+    python perfiles.py [--forzar]
+"""
+import argparse
+import hashlib
+import json
+import os
+from typing import Dict, Any, Optional
+
+ARCHIVO_PERFIL = 'perfil.json'
+
+# Cambiar si cambia el formato o el predictor, para invalidar los perfiles guardados
+VERSION_PERFIL = 1
+
+# La aplicación solo lee perfiles (leer_perfil): el predictor se crea al calcular el primero
+_predictor = None
+
+
+def _obtener_predictor():
+    global _predictor
+    if _predictor is None:
+        from ia_evaluador import PredictorDificultad
+        _predictor = PredictorDificultad()
+    return _predictor
+
+
+def metricas() -> tuple:
+    """Orden de las componentes de cada vector"""
+    return tuple(_obtener_predictor().metricas_dificultad)
+
+
+def firma_fuentes(plantilla: str, solucion: Optional[str]) -> str:
+    """Hash de las fuentes a partir de las que se calcula el perfil"""
+    contenido = f"{VERSION_PERFIL}\0{plantilla}\0{solucion or ''}"
+    return hashlib.sha256(contenido.encode('utf-8')).hexdigest()
+
+
+def perfil_codigo(codigo: str) -> Dict[str, Any]:
+    """Dificultad y vector de métricas normalizadas de un código"""
+    prediccion = _obtener_predictor().predecir_dificultad(codigo, 'intermedio')
+    detalladas = prediccion['metricas_detalladas']
+    return {
+        'dificultad': prediccion['dificultad_numerica'],
+        'categoria': prediccion['categoria_dificultad'],
+        'vector': [round(detalladas[m] / 10, 4) for m in metricas()]
+    }
+
+
+def calcular_perfil(plantilla: str, solucion: Optional[str]) -> Dict[str, Any]:
+    """Perfil de un ejercicio; la dificultad predicha sale de la solución si existe"""
+    perfil_plantilla = perfil_codigo(plantilla)
+    perfil_solucion = perfil_codigo(solucion) if solucion else None
+    referencia = perfil_solucion or perfil_plantilla
+    return {
+        'fuente': firma_fuentes(plantilla, solucion),
+        'metricas': list(metricas()),
+        'dificultad_predicha': referencia['dificultad'],
+        'categoria_predicha': referencia['categoria'],
+        'plantilla': perfil_plantilla,
+        'solucion': perfil_solucion
+    }
+
+
+def leer_perfil(directorio: str) -> Optional[Dict[str, Any]]:
+    """Perfil guardado de un ejercicio, o None si no existe o es ilegible"""
+    try:
+        with open(os.path.join(directorio, ARCHIVO_PERFIL), encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def guardar_perfil(directorio: str, perfil: Dict[str, Any]) -> bool:
+    """Escribe perfil.json de forma atómica; False si el directorio no es escribible"""
+    ruta = os.path.join(directorio, ARCHIVO_PERFIL)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    try:
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            json.dump(perfil, archivo, ensure_ascii=False, indent=4)
+            archivo.write('\n')
+        os.replace(temporal, ruta)
+        return True
+    except OSError:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        return False
+
+
+def generar_perfiles(catalogo_ejercicios, forzar: bool = False) -> Dict[str, int]:
+    """Calcula y guarda los perfiles vencidos (o todos, con forzar) del catálogo"""
+    catalogo_ejercicios.revisar_cambios(forzar=True)
+    conteo = {'generados': 0, 'vigentes': 0}
+    for entrada in list(catalogo_ejercicios.por_id.values()):
+        if entrada.actualizar_perfil(forzar):
+            conteo['generados'] += 1
+        else:
+            conteo['vigentes'] += 1
+    if conteo['generados']:
+        # Los perfil.json nuevos cambian la firma: se descartan los JSON serializados
+        catalogo_ejercicios.revisar_cambios(forzar=True)
+    return conteo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--forzar', action='store_true', help='Recalcula también los perfiles vigentes')
+    args = parser.parse_args()
+
+    from ejercicios import catalogo
+
+    conteo = generar_perfiles(catalogo, forzar=args.forzar)
+    print(f"Perfiles generados: {conteo['generados']}, vigentes: {conteo['vigentes']}")
+
+
+if __name__ == '__main__':
+    main()
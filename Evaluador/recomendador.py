@@ -0,0 +1,141 @@
+import threading
+from typing import Dict, Any, List
+
+import numpy as np
+
+from ejercicios import catalogo, NIVELES
+from metricas import CONSULTAS_CACHE
+
+# Conceptos que se cruzan con las etiquetas de los ejercicios
+CONCEPTOS = ('funciones', 'clases', 'bucles', 'condicionales', 'listas',
+             'diccionarios', 'strings', 'decoradores', 'excepciones', 'operadores')
+
+# Pesos de cada término de la afinidad estudiante-ejercicio
+PESO_DIFICULTAD = 1.0
+PESO_NIVEL = 0.75
+PESO_NOVEDAD = 0.5
+
+
+class RecomendadorEjercicios:
+    """Recomienda ejercicios según el historial reciente y el nivel del estudiante.
+
+    Las características de cada ejercicio se calculan una sola vez (y de nuevo
+    solo si sus archivos cambian); la puntuación de todos los estudiantes
+    contra todos los ejercicios es una operación matricial.
+    """
+
+    def __init__(self, catalogo_ejercicios=catalogo):
+        self.catalogo = catalogo_ejercicios
+        self._caracteristicas = {}  # id -> (firma, vector)
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _caracteristicas_ejercicio(self, entrada) -> np.ndarray:
+        """Vector [dificultad efectiva, nivel, conceptos...] de un ejercicio"""
+        cacheado = self._caracteristicas.get(entrada.id)
+        if cacheado is not None and cacheado[0] == entrada.firma:
+            CONSULTAS_CACHE.etiquetas('caracteristicas_ejercicios', 'acierto').incrementar()
+            return cacheado[1]
+        CONSULTAS_CACHE.etiquetas('caracteristicas_ejercicios', 'fallo').incrementar()
+
+        # Dificultad declarada combinada con la predicha por el perfil precalculado (si existe)
+        declarada = entrada.metadatos['dificultad']
+        dificultad = 0.7 * declarada + 0.3 * entrada.perfil().get('dificultad_predicha', declarada)
+        nivel = NIVELES.index(entrada.nivel) if entrada.nivel in NIVELES else len(NIVELES) - 1
+        etiquetas = set(entrada.metadatos.get('etiquetas', []))
+
+        vector = np.array(
+            [dificultad, nivel] + [1.0 if concepto in etiquetas else 0.0 for concepto in CONCEPTOS]
+        )
+        self._caracteristicas[entrada.id] = (entrada.firma, vector)
+        return vector
+
+    def _matriz_ejercicios(self):
+        """Ids y matriz de características, reconstruida si cambió el catálogo"""
+        self.catalogo.revisar_cambios()
+        with self._lock:
+            if self._version != self.catalogo.version:
+                entradas = [e for nivel in self.catalogo.niveles() for e in self.catalogo.por_nivel[nivel]]
+                self._ids = [e.id for e in entradas]
+                self._matriz = np.vstack([self._caracteristicas_ejercicio(e) for e in entradas]) \
+                    if entradas else np.zeros((0, 2 + len(CONCEPTOS)))
+                self._version = self.catalogo.version
+            return self._ids, self._matriz
+
+    @staticmethod
+    def perfil_estudiante(historial: Dict[str, Any]) -> np.ndarray:
+        """Vector [dificultad objetivo, nivel, familiaridad con cada concepto]"""
+        nivel = historial.get('nivel_actual', 'principiante')
+        nivel = NIVELES.index(nivel) if nivel in NIVELES else 0
+        evaluaciones = historial.get('evaluaciones', [])
+
+        familiaridad = dict.fromkeys(CONCEPTOS, 0.5)
+        if evaluaciones:
+            scores = np.array([e['score'] for e in evaluaciones], dtype=float)
+            # Las evaluaciones más recientes pesan más
+            pesos = np.linspace(1.0, 0.5, len(scores))
+            habilidad = float(np.average(scores, weights=pesos)) / 100
+            total = len(evaluaciones)
+            familiaridad['funciones'] = sum(1 for e in evaluaciones if e['funciones'] > 0) / total
+            familiaridad['clases'] = sum(1 for e in evaluaciones if e['clases'] > 0) / total
+            control = sum(1 for e in evaluaciones if e['complejidad'] >= 3) / total
+            familiaridad['bucles'] = familiaridad['condicionales'] = control
+        else:
+            habilidad = 0.5
+
+        objetivo = 1 + 2.5 * nivel + 2.5 * habilidad
+        return np.array([objetivo, nivel] + [familiaridad[c] for c in CONCEPTOS])
+
+    def puntuar(self, perfiles: np.ndarray, matriz: np.ndarray) -> np.ndarray:
+        """Afinidad (estudiantes x ejercicios)"""
+        distancia_dificultad = np.abs(perfiles[:, [0]] - matriz[:, 0])
+        distancia_nivel = np.abs(perfiles[:, [1]] - matriz[:, 1])
+
+        # Novedad: conceptos del ejercicio que el estudiante aún no domina
+        conceptos = matriz[:, 2:]
+        necesidad = 1 - perfiles[:, 2:]
+        novedad = (necesidad @ conceptos.T) / np.maximum(conceptos.sum(axis=1), 1)
+
+        return (-PESO_DIFICULTAD * distancia_dificultad
+                - PESO_NIVEL * distancia_nivel
+                + PESO_NOVEDAD * novedad)
+
+    def recomendar_lote(self, historiales: Dict[Any, Dict[str, Any]], k: int = 5) -> Dict[Any, List[Dict[str, Any]]]:
+        """Top-k ejercicios para cada estudiante, en una sola pasada"""
+        if not historiales:
+            return {}
+
+        ids, matriz = self._matriz_ejercicios()
+        k = min(k, len(ids))
+        if k < 1:
+            return {estudiante: [] for estudiante in historiales}
+        estudiantes = list(historiales)
+        perfiles = np.vstack([self.perfil_estudiante(historiales[e]) for e in estudiantes])
+        afinidad = self.puntuar(perfiles, matriz)
+
+        mejores = np.argpartition(-afinidad, k - 1, axis=1)[:, :k]
+        filas = np.arange(len(estudiantes))[:, None]
+        orden = np.argsort(-afinidad[filas, mejores], axis=1)
+        mejores = mejores[filas, orden]
+
+        recomendaciones = {}
+        for fila, estudiante in enumerate(estudiantes):
+            recomendaciones[estudiante] = []
+            for columna in mejores[fila]:
+                metadatos = self.catalogo.por_id[ids[columna]].metadatos
+                recomendaciones[estudiante].append({
+                    'id': ids[columna],
+                    'titulo': metadatos['titulo'],
+                    'nivel': metadatos['nivel'],
+                    'dificultad': metadatos['dificultad'],
+                    'puntos': metadatos['puntos'],
+                    'afinidad': round(float(afinidad[fila, columna]), 3)
+                })
+        return recomendaciones
+
+    def recomendar(self, historial: Dict[str, Any], k: int = 5) -> List[Dict[str, Any]]:
+        """Top-k ejercicios para un estudiante"""
+        return self.recomendar_lote({0: historial}, k)[0]
+
+
+recomendador = RecomendadorEjercicios()
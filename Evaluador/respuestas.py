@@ -0,0 +1,69 @@
+import gzip
+import hashlib
+import json
+from typing import Any
+
+from flask import Response
+
+from metricas import CONSULTAS_CACHE
+
+try:
+    import brotli
+except ImportError:  # brotli es opcional
+    brotli = None
+
+# Las respuestas solo cambian con un nuevo despliegue, pero sus URLs no llevan versión:
+# el navegador las guarda y revalida en cada uso (304 con el mismo ETag, sin cuerpo)
+CACHE_CONTROL_REVALIDAR = 'public, no-cache'
+
+
+class RespuestaInmutable:
+    """Respuesta JSON que no cambia mientras corre el servidor.
+
+    Se serializa y comprime (gzip y, si está instalado, brotli) una sola vez;
+    cada petición solo elige la variante según Accept-Encoding y responde
+    304 si el cliente ya tiene el mismo ETag. Como la URL no cambia entre
+    despliegues, el cliente debe revalidar siempre (no-cache).
+    """
+
+    def __init__(self, datos: Any, mimetype: str = 'application/json'):
+        cuerpo = json.dumps(datos, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        huella = hashlib.sha256(cuerpo).hexdigest()[:32]
+        self.mimetype = mimetype
+
+        # codificación -> (cuerpo, etag); cada variante tiene su propio ETag fuerte
+        self.variantes = {'identity': (cuerpo, f'"{huella}"')}
+        comprimidos = {'gzip': gzip.compress(cuerpo, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            comprimidos['br'] = brotli.compress(cuerpo, quality=11)
+        for codificacion, datos_comprimidos in comprimidos.items():
+            if len(datos_comprimidos) < len(cuerpo):
+                self.variantes[codificacion] = (datos_comprimidos, f'"{huella}-{codificacion}"')
+
+        self.etags = {etag.strip('"') for _, etag in self.variantes.values()}
+
+    def _elegir_codificacion(self, peticion) -> str:
+        aceptadas = peticion.accept_encodings
+        for codificacion in ('br', 'gzip'):
+            if codificacion in self.variantes and aceptadas.quality(codificacion) > 0:
+                return codificacion
+        return 'identity'
+
+    def responder(self, peticion) -> Response:
+        """Response (o 304) para la petición actual"""
+        codificacion = self._elegir_codificacion(peticion)
+        cuerpo, etag = self.variantes[codificacion]
+
+        if any(peticion.if_none_match.contains(e) for e in self.etags):
+            CONSULTAS_CACHE.etiquetas('respuestas_inmutables', 'no_modificado').incrementar()
+            respuesta = Response(status=304)
+        else:
+            CONSULTAS_CACHE.etiquetas('respuestas_inmutables', 'completa').incrementar()
+            respuesta = Response(cuerpo, mimetype=self.mimetype)
+            if codificacion != 'identity':
+                respuesta.headers['Content-Encoding'] = codificacion
+
+        respuesta.headers['ETag'] = etag
+        respuesta.headers['Cache-Control'] = CACHE_CONTROL_REVALIDAR
+        respuesta.headers['Vary'] = 'Accept-Encoding'
+        return respuesta
@@ -0,0 +1,504 @@
+import ast
+import builtins
+import ctypes
+import hashlib
+import importlib
+import io
+import os
+import re
+import string
+import sys
+import threading
+import types
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+import _string
+
+from metricas import CONSULTAS_CACHE
+
+# 'fork' ejecuta en procesos hijos del zygoto (servidor_fork.py), sin privilegios; 'local' en
+# el mismo proceso y con el usuario del servidor, solo para desarrollo
+MODO_EJECUCION = os.environ.get('WEBIA_SANDBOX', 'fork' if hasattr(os, 'fork') else 'local')
+
+# Módulos que el código del estudiante puede importar
+MODULOS_PERMITIDOS = frozenset(os.environ.get(
+    'WEBIA_MODULOS_PERMITIDOS',
+    'math,random,time,datetime,collections,itertools,functools,statistics,decimal,fractions,re,json'
+).split(','))
+
+# Builtins expuestos al código del estudiante
+BUILTINS_PERMITIDOS = {
+    nombre: getattr(builtins, nombre) for nombre in (
+        'print', 'len', 'range', 'sum', 'min', 'max', 'abs', 'round', 'pow', 'divmod',
+        'int', 'float', 'str', 'bool', 'list', 'dict', 'set', 'tuple', 'frozenset',
+        'enumerate', 'zip', 'map', 'filter', 'sorted', 'reversed', 'any', 'all',
+        'isinstance', 'issubclass', 'chr', 'ord', 'repr', 'iter', 'next',
+        'super', 'property', 'staticmethod', 'classmethod', '__build_class__',
+        'Exception', 'ValueError', 'TypeError', 'KeyError', 'IndexError',
+        'ZeroDivisionError', 'AttributeError', 'NameError', 'RuntimeError',
+        'StopIteration', 'ImportError', 'NotImplementedError', 'AssertionError',
+    )
+}
+
+# Atributos de introspección que llevan de cualquier función u objeto a sus módulos y builtins
+ATRIBUTOS_PROHIBIDOS = frozenset({
+    '__globals__', '__builtins__', '__code__', '__closure__', '__dict__', '__subclasses__',
+    '__bases__', '__base__', '__mro__', '__getattribute__', '__reduce__', '__reduce_ex__',
+    '__loader__', '__spec__', '__self__', '__func__', '__wrapped__', '__objclass__',
+    '__mro_entries__', 'mro', 'gi_frame', 'gi_code', 'cr_frame', 'ag_frame', 'tb_frame',
+    'f_globals', 'f_builtins', 'f_locals', 'f_back'
+})
+
+# Métodos de str que recorren atributos desde la cadena ('{0.__globals__}'), invisibles para el AST
+METODOS_FORMATO = frozenset({'format', 'format_map'})
+
+# Fuentes de no determinismo: si el código las usa, su resultado no se cachea
+BUILTINS_NO_DETERMINISTAS = frozenset({'input', 'open', 'id', 'hash'})
+
+# Módulos cuyo uso no impide cachear; cualquier otro (random, time, ...) marca la ejecución
+MODULOS_DETERMINISTAS = frozenset({
+    'math', 'string', 'collections', 'itertools', 'functools', 'statistics',
+    'decimal', 'fractions', 're', 'json'
+})
+# Atributos no deterministas dentro de esos módulos (NormalDist.samples usa random)
+ATRIBUTOS_NO_DETERMINISTAS = frozenset({'statistics.NormalDist'})
+
+# El repr por defecto de los objetos incluye su dirección de memoria, distinta en cada ejecución
+PATRON_DIRECCION = re.compile(r' at 0x[0-9a-fA-F]+')
+
+# Módulos permitidos ya importados, compartidos por todas las ejecuciones del proceso
+_modulos_cargados = {}
+_lock_modulos = threading.Lock()
+
+
+def configurar_modulos_permitidos(nombres):
+    """Reemplaza la lista de módulos importables"""
+    global MODULOS_PERMITIDOS
+    MODULOS_PERMITIDOS = frozenset(nombres)
+
+
+def cargar_modulo(nombre: str):
+    """Importa un módulo permitido una sola vez por proceso"""
+    modulo = _modulos_cargados.get(nombre)
+    if modulo is None:
+        with _lock_modulos:
+            modulo = _modulos_cargados.get(nombre)
+            if modulo is None:
+                modulo = importlib.import_module(nombre)
+                _modulos_cargados[nombre] = modulo
+    return modulo
+
+
+def precargar_modulos(nombres=None):
+    """Importa de antemano los módulos permitidos (p. ej. antes de hacer fork)"""
+    for nombre in sorted(nombres or MODULOS_PERMITIDOS):
+        cargar_modulo(nombre)
+
+
+def _input_no_disponible(*args):
+    """input() no tiene de dónde leer dentro del evaluador"""
+    raise EOFError('input() no está disponible en el evaluador')
+
+
+class RegistroDeterminismo:
+    """Registra las fuentes no deterministas usadas durante una ejecución"""
+
+    def __init__(self):
+        self.fuentes = set()
+
+    def marcar(self, fuente: str):
+        """Anota el uso de una fuente no determinista"""
+        self.fuentes.add(fuente)
+
+    @property
+    def determinista(self) -> bool:
+        return not self.fuentes
+
+
+def _envolver_llamable(funcion, nombre: str):
+    """Función que llama a `funcion` sin exponerla: ni __self__ ni globals del módulo"""
+    def llamar(*args, **kwargs):
+        return funcion(*args, **kwargs)
+    # Solo __import__: el código en C importa con los builtins del frame que lo llama
+    envoltura = types.FunctionType(llamar.__code__, {'__builtins__': {'__import__': builtins.__import__}},
+                                   getattr(funcion, '__name__', nombre), None, llamar.__closure__)
+    envoltura.__qualname__ = nombre
+    envoltura.__doc__ = getattr(funcion, '__doc__', None)
+    return envoltura
+
+
+# Objetos ya protegidos por nombre completo: el acceso repetido (math.sqrt en un bucle) no
+# crea una envoltura nueva cada vez
+_protegidos = {}
+
+
+def proteger(valor, nombre: str):
+    """Lo que el sandbox entrega en lugar de un objeto de un módulo permitido.
+
+    Las funciones se envuelven y las clases pasan detrás de una ClaseProtegida.
+    Las excepciones son la excepción: `except` necesita la clase real.
+    """
+    if isinstance(valor, type) and issubclass(valor, BaseException):
+        return valor
+    if not isinstance(valor, type) and not callable(valor):
+        return valor
+
+    guardado = _protegidos.get(nombre)
+    if guardado is not None and guardado[0] is valor:
+        return guardado[1]
+    if isinstance(valor, type):
+        protegido = ClaseProtegida(valor, nombre)
+    else:
+        protegido = _envolver_llamable(valor, nombre)
+    _protegidos[nombre] = (valor, protegido)
+    return protegido
+
+
+class ClaseProtegida:
+    """Clase de un módulo permitido vista desde el código del estudiante.
+
+    Se instancia, se puede heredar de ella y sirve en isinstance/issubclass,
+    pero no entrega la clase real: sus atributos públicos pasan también por
+    proteger() y los que empiezan con '_' se rechazan.
+    """
+
+    __slots__ = ('_clase', '_nombre')
+
+    def __init__(self, clase: type, nombre: str):
+        object.__setattr__(self, '_clase', clase)
+        object.__setattr__(self, '_nombre', nombre)
+
+    def __getattribute__(self, atributo):
+        clase, nombre = _clase_real(self), _nombre_clase(self)
+        if atributo == '__mro_entries__':
+            return object.__getattribute__(self, atributo)
+        if atributo in ('__name__', '__qualname__', '__doc__'):
+            return getattr(clase, atributo)
+        if atributo.startswith('_'):
+            raise AttributeError(f"No se permite acceder a '{nombre}.{atributo}'")
+        return proteger(getattr(clase, atributo), f'{nombre}.{atributo}')
+
+    def __setattr__(self, atributo, valor):
+        raise AttributeError('No se permite modificar clases del sistema')
+
+    def __call__(self, *args, **kwargs):
+        return _clase_real(self)(*args, **kwargs)
+
+    def __instancecheck__(self, objeto):
+        return isinstance(objeto, _clase_real(self))
+
+    def __subclasscheck__(self, clase):
+        return issubclass(clase, _clase_real(self))
+
+    def __mro_entries__(self, bases):
+        # class MiContador(collections.Counter): hereda de la clase real
+        return (_clase_real(self),)
+
+    def __repr__(self):
+        return f"<class '{_nombre_clase(self)}'>"
+
+
+# Los slots se leen con su descriptor: __getattribute__ rechaza todo nombre con '_'
+_clase_real = ClaseProtegida._clase.__get__
+_nombre_clase = ClaseProtegida._nombre.__get__
+
+
+class ProxyModulo:
+    """Proxy perezoso de un módulo permitido.
+
+    El módulo real se importa (una vez por proceso) en el primer acceso a un
+    atributo; si es una fuente no determinista, el acceso queda registrado.
+    Los submódulos se devuelven también como proxy, cualquier otro módulo
+    alcanzable como atributo se rechaza y el resto pasa por proteger().
+    """
+
+    __slots__ = ('_nombre', '_registro')
+
+    def __init__(self, nombre: str, registro: RegistroDeterminismo):
+        object.__setattr__(self, '_nombre', nombre)
+        object.__setattr__(self, '_registro', registro)
+
+    def __getattribute__(self, atributo):
+        modulo = _nombre_proxy(self)
+        if atributo.startswith('_'):
+            raise AttributeError(f"No se permite acceder a '{modulo}.{atributo}'")
+        nombre = f'{modulo}.{atributo}'
+        valor = getattr(cargar_modulo(modulo), atributo)
+        if isinstance(valor, types.ModuleType):
+            # Solo los submódulos propios del paquete, y también detrás de un proxy: otros
+            # módulos que el paquete importó (re.enum, json.decoder.re) darían acceso a sys y os
+            if sys.modules.get(nombre) is not valor:
+                raise AttributeError(f"No se permite acceder al módulo '{nombre}'")
+            return ProxyModulo(nombre, _registro_proxy(self))
+        if modulo.split('.')[0] not in MODULOS_DETERMINISTAS or nombre in ATRIBUTOS_NO_DETERMINISTAS:
+            _registro_proxy(self).marcar(nombre)
+        return proteger(valor, nombre)
+
+    def __setattr__(self, atributo, valor):
+        raise AttributeError('No se permite modificar módulos del sistema')
+
+    def __repr__(self):
+        return f"<module '{_nombre_proxy(self)}'>"
+
+
+_nombre_proxy = ProxyModulo._nombre.__get__
+_registro_proxy = ProxyModulo._registro.__get__
+
+
+class FormateadorSeguro(string.Formatter):
+    """str.format que no sigue atributos con '_' desde los campos de la cadena"""
+
+    def get_field(self, field_name, args, kwargs):
+        _, resto = _string.formatter_field_name_split(field_name)
+        for es_atributo, clave in resto:
+            if es_atributo and clave.startswith('_'):
+                raise AttributeError(f"No se permite acceder a '{clave}' desde una cadena de formato")
+        return super().get_field(field_name, args, kwargs)
+
+
+_formateador = FormateadorSeguro()
+
+
+def _formato(objeto, metodo: str):
+    """Reemplaza `objeto.format` y `objeto.format_map` en el código del estudiante"""
+    if objeto is str:
+        # str.format(plantilla, ...) sin enlazar
+        return lambda plantilla, *args, **kwargs: _formato(plantilla, metodo)(*args, **kwargs)
+    if not isinstance(objeto, str):
+        return getattr(objeto, metodo)
+    if metodo == 'format':
+        return lambda *args, **kwargs: _formateador.vformat(objeto, args, kwargs)
+    return lambda mapeo: _formateador.vformat(objeto, (), mapeo)
+
+
+class _ReescribirFormato(ast.NodeTransformer):
+    """Cambia `x.format` por `__formato__(x, 'format')` para pasar por FormateadorSeguro"""
+
+    def visit_Attribute(self, nodo):
+        self.generic_visit(nodo)
+        if nodo.attr in METODOS_FORMATO and isinstance(nodo.ctx, ast.Load):
+            llamada = ast.Call(ast.Name('__formato__', ast.Load()), [nodo.value, ast.Constant(nodo.attr)], [])
+            return ast.copy_location(llamada, nodo)
+        return nodo
+
+
+def _instrumentar_funcion(nombre: str, funcion, registro: RegistroDeterminismo):
+    """Envuelve una función para que marque el registro al llamarse"""
+    def envoltura(*args, **kwargs):
+        registro.marcar(nombre)
+        return funcion(*args, **kwargs)
+    envoltura.__name__ = getattr(funcion, '__name__', nombre)
+    return envoltura
+
+
+def _crear_importador(registro: RegistroDeterminismo):
+    """Crea el __import__ restringido de una ejecución"""
+    proxies = {}
+
+    def proxy(nombre):
+        if nombre not in proxies:
+            proxies[nombre] = ProxyModulo(nombre, registro)
+        return proxies[nombre]
+
+    def importar(nombre, globals=None, locals=None, fromlist=(), level=0):
+        if level:
+            raise ImportError('No se permiten imports relativos')
+        raiz = nombre.split('.')[0]
+        if raiz not in MODULOS_PERMITIDOS:
+            raise ImportError(f"No se permite importar el módulo '{nombre}'")
+        if raiz != nombre:
+            # Los submódulos solo son atributos del paquete una vez importados
+            cargar_modulo(nombre)
+        return proxy(nombre if fromlist else raiz)
+
+    return importar
+
+
+def construir_builtins(registro: RegistroDeterminismo) -> Dict[str, Any]:
+    """Construye los builtins restringidos de una ejecución, instrumentados"""
+    builtins_ejecucion = {}
+    for nombre, objeto in BUILTINS_PERMITIDOS.items():
+        if nombre in BUILTINS_NO_DETERMINISTAS:
+            builtins_ejecucion[nombre] = _instrumentar_funcion(nombre, objeto, registro)
+        else:
+            builtins_ejecucion[nombre] = objeto
+    builtins_ejecucion['input'] = _instrumentar_funcion('input', _input_no_disponible, registro)
+    builtins_ejecucion['__import__'] = _crear_importador(registro)
+    builtins_ejecucion['__formato__'] = _formato
+    return builtins_ejecucion
+
+
+def _atributo_prohibido(arbol: ast.AST) -> Optional[ast.Attribute]:
+    """Primer acceso a un atributo de ATRIBUTOS_PROHIBIDOS en el código, o None"""
+    for nodo in ast.walk(arbol):
+        if isinstance(nodo, ast.Attribute) and nodo.attr in ATRIBUTOS_PROHIBIDOS:
+            return nodo
+    return None
+
+
+def _crear_print(salida: io.StringIO):
+    """print() que escribe en la salida de la ejecución y no en el sys.stdout del proceso"""
+    def imprimir(*args, sep=' ', end='\n', file=None, flush=False):
+        builtins.print(*args, sep=sep, end=end, file=salida if file is None else file, flush=flush)
+    return imprimir
+
+
+class TiempoAgotado(BaseException):
+    """Se lanza en el hilo de una ejecución local que superó su tiempo"""
+
+
+def _interrumpir_hilo(hilo: threading.Thread):
+    """Lanza TiempoAgotado en el hilo (se atiende en la siguiente instrucción de Python)"""
+    ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(hilo.ident), ctypes.py_object(TiempoAgotado))
+
+
+def _ejecutar(codigo: types.CodeType, registro: RegistroDeterminismo, salida: io.StringIO) -> Dict[str, Any]:
+    builtins_ejecucion = construir_builtins(registro)
+    builtins_ejecucion['print'] = _crear_print(salida)
+    try:
+        exec(codigo, {'__builtins__': builtins_ejecucion, '__name__': '__main__'})
+    except Exception as e:
+        return {
+            'success': False,
+            'error': f'{type(e).__name__}: {str(e)}',
+            'output': ''
+        }
+    output = salida.getvalue()
+    return {
+        'success': True,
+        'output': output if output else 'Código ejecutado sin salida visible',
+        'error': None
+    }
+
+
+def _ejecutar_con_limite(codigo: types.CodeType, registro: RegistroDeterminismo, salida: io.StringIO,
+                         timeout: float) -> Dict[str, Any]:
+    """Ejecuta en un hilo aparte y lo interrumpe si supera `timeout`"""
+    resultados = []
+
+    def objetivo():
+        try:
+            resultados.append(_ejecutar(codigo, registro, salida))
+        except TiempoAgotado:
+            pass
+
+    hilo = threading.Thread(target=objetivo, name='sandbox-local', daemon=True)
+    hilo.start()
+    hilo.join(timeout)
+    # El código puede atrapar la excepción con un except desnudo: se insiste un momento
+    intentos = 0
+    while hilo.is_alive() and intentos < 10:
+        _interrumpir_hilo(hilo)
+        hilo.join(0.1)
+        intentos += 1
+
+    if resultados:
+        return resultados[0]
+    registro.marcar('timeout')
+    return {
+        'success': False,
+        'error': f'TimeoutError: ejecución interrumpida (límite de {timeout} s)',
+        'output': ''
+    }
+
+
+def ejecutar_codigo(codigo: str, timeout: Optional[float] = None) -> Tuple[Dict[str, Any], bool]:
+    """Ejecuta el código con builtins restringidos.
+
+    La salida de print() va a un buffer propio de la ejecución, así varias
+    pueden correr a la vez en hilos del mismo proceso. Con `timeout` la
+    ejecución se interrumpe al superarlo. Retorna el resultado y si la
+    ejecución fue determinista.
+    """
+    try:
+        arbol = ast.parse(codigo, '<string>')
+        compilado = compile(ast.fix_missing_locations(_ReescribirFormato().visit(arbol)), '<string>', 'exec')
+    except SyntaxError as e:
+        return {
+            'success': False,
+            'error': f'Error de sintaxis en línea {e.lineno}: {e.msg}',
+            'output': ''
+        }, True
+
+    prohibido = _atributo_prohibido(arbol)
+    if prohibido is not None:
+        return {
+            'success': False,
+            'error': f"AttributeError: No se permite acceder a '{prohibido.attr}' (línea {prohibido.lineno})",
+            'output': ''
+        }, True
+
+    registro = RegistroDeterminismo()
+    salida = io.StringIO()
+    if timeout:
+        resultado = _ejecutar_con_limite(compilado, registro, salida, timeout)
+    else:
+        resultado = _ejecutar(compilado, registro, salida)
+
+    # Un objeto impreso con su repr por defecto muestra una dirección distinta en cada ejecución
+    if PATRON_DIRECCION.search(resultado['output'] or '') or PATRON_DIRECCION.search(resultado['error'] or ''):
+        registro.marcar('direccion')
+
+    return resultado, registro.determinista
+
+
+class CacheEjecuciones:
+    """Cache LRU de resultados de ejecuciones deterministas, por hash del código"""
+
+    def __init__(self, max_entradas: int = 2048, max_salida: int = 64 * 1024):
+        self.max_entradas = max_entradas
+        self.max_salida = max_salida
+        self._entradas = OrderedDict()
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def clave(codigo: str) -> str:
+        """Hash del código fuente"""
+        return hashlib.sha256(codigo.encode('utf-8')).hexdigest()
+
+    def obtener(self, codigo: str) -> Optional[Dict[str, Any]]:
+        """Retorna una copia del resultado cacheado o None"""
+        clave = self.clave(codigo)
+        with self._lock:
+            resultado = self._entradas.get(clave)
+            if resultado is None:
+                self.fallos += 1
+                CONSULTAS_CACHE.etiquetas('ejecuciones', 'fallo').incrementar()
+                return None
+            self._entradas.move_to_end(clave)
+            self.aciertos += 1
+        CONSULTAS_CACHE.etiquetas('ejecuciones', 'acierto').incrementar()
+        return dict(resultado, cache=True)
+
+    def guardar(self, codigo: str, resultado: Dict[str, Any]):
+        """Guarda el resultado si su salida no es demasiado grande"""
+        if len(resultado.get('output') or '') > self.max_salida:
+            return
+        clave = self.clave(codigo)
+        with self._lock:
+            self._entradas[clave] = dict(resultado)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def limpiar(self):
+        """Vacía el cache"""
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Tamaño y tasa de aciertos del cache"""
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                'entradas': len(self._entradas),
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': round(self.aciertos / consultas, 4) if consultas else 0
+            }
+
+
+cache_ejecuciones = CacheEjecuciones()
@@ -0,0 +1,246 @@
+"""Servidor de producción: N workers pre-forkeados sobre un mismo socket.
+
+El proceso maestro abre el socket de escucha y crea los workers con fork().
+Cada worker crea la aplicación (o la hereda ya creada, con --precargar),
+hace su inicialización propia (p. ej. su zygoto del sandbox) y atiende
+peticiones con un hilo por conexión sobre el socket compartido.
+
+Señales del maestro:
+    SIGHUP           recarga: arranca workers nuevos y drena los anteriores
+    SIGTERM, SIGINT  apagado: los workers terminan las peticiones en curso
+
+Sin --precargar cada worker importa la aplicación desde disco, así que
+SIGHUP también recarga el código. Cada worker vuelca sus métricas en un
+directorio temporal común y /metrics las combina (ver metricas.py).
+
+Uso:
+    python servidor.py [--host 0.0.0.0] [--puerto 5000] [--workers 4] [--precargar]
+"""
+import argparse
+import gc
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+from werkzeug.serving import make_server, WSGIRequestHandler
+
+
+class ManejadorSolicitudes(WSGIRequestHandler):
+    # Las conexiones keep-alive inactivas se cierran pronto para no demorar el drenado
+    timeout = 5
+
+
+def configuracion_worker(workers: int):
+    """Configuración de la aplicación en cada worker.
+
+    El control de admisión de /api/ejecutar vive en cada proceso, así que sus
+    límites se reparten entre los workers: la concurrencia del sandbox y
+    también la ráfaga y la tasa de cada estudiante y de cada dirección. Como
+    el kernel reparte las conexiones entre workers, el límite del conjunto
+    es aproximado (la ráfaga de un worker nunca baja de una ejecución).
+    """
+    from app import CONFIGURACION_POR_DEFECTO
+    return {
+        'EJECUCION_MAX_CONCURRENTES': max(1, (os.cpu_count() or 2) // workers),
+        'EJECUCION_RAFAGA_ESTUDIANTE': max(1.0, CONFIGURACION_POR_DEFECTO['EJECUCION_RAFAGA_ESTUDIANTE'] / workers),
+        'EJECUCION_TASA_ESTUDIANTE': CONFIGURACION_POR_DEFECTO['EJECUCION_TASA_ESTUDIANTE'] / workers,
+        'EJECUCION_RAFAGA_DIRECCION': max(1.0, CONFIGURACION_POR_DEFECTO['EJECUCION_RAFAGA_DIRECCION'] / workers),
+        'EJECUCION_TASA_DIRECCION': CONFIGURACION_POR_DEFECTO['EJECUCION_TASA_DIRECCION'] / workers
+    }
+
+
+def inicializar_worker(aplicacion):
+    """Recursos propios de cada worker, creados después del fork"""
+    from metricas import registro
+    registro.iniciar_volcado()
+    # Todos los workers lo inician; un bloqueo de archivo deja exportar a uno por vez
+    if aplicacion.config['ANALITICA_INTERVALO'] > 0:
+        from app import exportador_analitica
+        exportador_analitica(aplicacion).iniciar()
+    import sandbox
+    if sandbox.MODO_EJECUCION == 'fork':
+        from servidor_fork import cliente_fork
+        cliente_fork.iniciar()
+
+
+def finalizar_worker():
+    """Libera los recursos del worker (os._exit no ejecuta atexit)"""
+    metricas = sys.modules.get('metricas')
+    if metricas is not None:
+        try:
+            metricas.registro.escribir_instantanea()  # los contadores del worker sobreviven a su salida
+        except OSError:
+            pass
+    servidor_fork = sys.modules.get('servidor_fork')
+    if servidor_fork is not None:
+        servidor_fork.cliente_fork.detener()
+
+
+def ejecutar_worker(escucha: socket.socket, args, aplicacion=None):
+    """Cuerpo de un worker; no retorna"""
+    maestro = os.getppid()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl-C lo maneja el maestro
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    if aplicacion is None:
+        from app import create_app
+        aplicacion = create_app(configuracion_worker(args.workers))
+    inicializar_worker(aplicacion)
+
+    servidor = make_server(args.host, args.puerto, aplicacion, threaded=True,
+                           request_handler=ManejadorSolicitudes, fd=escucha.fileno())
+    # Los hilos de las peticiones en curso no son daemon y server_close() los espera
+    servidor.daemon_threads = False
+    servidor.block_on_close = True
+
+    def drenar(*_):
+        # shutdown() bloquea hasta que serve_forever() termina: no puede llamarse desde su hilo
+        threading.Thread(target=servidor.shutdown, daemon=True).start()
+
+    def vigilar_maestro():
+        while os.getppid() == maestro:
+            time.sleep(1)
+        drenar()
+
+    signal.signal(signal.SIGTERM, drenar)
+    threading.Thread(target=vigilar_maestro, daemon=True).start()
+
+    try:
+        servidor.serve_forever()
+    finally:
+        servidor.server_close()
+        finalizar_worker()
+    os._exit(0)
+
+
+class Maestro:
+    """Crea, vigila y reemplaza los workers"""
+
+    def __init__(self, args):
+        self.args = args
+        self.escucha = None
+        self.aplicacion = None
+        self.generacion = 0
+        self.workers = {}  # pid -> (generación, inicio)
+        self._terminar = False
+        self._recargar = False
+
+    def _lanzar_worker(self):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                ejecutar_worker(self.escucha, self.args, self.aplicacion)
+            except BaseException:
+                traceback.print_exc()
+            finally:
+                os._exit(1)
+        self.workers[pid] = (self.generacion, time.monotonic())
+
+    def _recolectar(self):
+        """Retira los workers que terminaron y repone los de la generación actual"""
+        while self.workers:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            generacion, inicio = self.workers.pop(pid, (None, 0))
+            if generacion == self.generacion and not self._terminar:
+                print(f"Worker {pid} terminó inesperadamente; se reemplaza")
+                if time.monotonic() - inicio < 1:
+                    time.sleep(1)  # evita reiniciar en bucle un worker que falla al arrancar
+                self._lanzar_worker()
+
+    def _senal(self, numero, _):
+        if numero == signal.SIGHUP:
+            self._recargar = True
+        else:
+            self._terminar = True
+
+    def recargar(self):
+        """Arranca una generación nueva y drena la anterior"""
+        anteriores = [pid for pid, (generacion, _) in self.workers.items() if generacion == self.generacion]
+        self.generacion += 1
+        for _ in range(self.args.workers):
+            self._lanzar_worker()
+        for pid in anteriores:
+            os.kill(pid, signal.SIGTERM)
+        print(f"Recarga: generación {self.generacion}, drenando {len(anteriores)} workers")
+
+    def detener(self):
+        """Drena todos los workers y mata los que no terminen a tiempo"""
+        self._terminar = True
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+        limite = time.monotonic() + self.args.gracia
+        while self.workers and time.monotonic() < limite:
+            self._recolectar()
+            time.sleep(0.05)
+        for pid in self.workers:
+            print(f"Worker {pid} no terminó en {self.args.gracia} s; se mata")
+            os.kill(pid, signal.SIGKILL)
+        while self.workers:
+            pid, _ = os.waitpid(-1, 0)
+            self.workers.pop(pid, None)
+
+    def ejecutar(self):
+        self.escucha = socket.create_server((self.args.host, self.args.puerto), backlog=self.args.backlog)
+
+        # Directorio de las instantáneas de métricas de los workers, limpio en cada arranque
+        directorio_metricas = None
+        if not os.environ.get('WEBIA_METRICAS_DIR'):
+            directorio_metricas = tempfile.mkdtemp(prefix='webia-metricas-')
+            os.environ['WEBIA_METRICAS_DIR'] = directorio_metricas
+
+        if self.args.precargar:
+            from app import create_app
+            self.aplicacion = create_app(configuracion_worker(self.args.workers))
+            gc.freeze()  # los objetos ya creados no se tocan en el GC: menos copias tras el fork
+
+        for numero in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(numero, self._senal)
+
+        for _ in range(self.args.workers):
+            self._lanzar_worker()
+        print(f"Servidor en http://{self.args.host}:{self.args.puerto} con {self.args.workers} workers "
+              f"(maestro {os.getpid()})")
+
+        try:
+            while not self._terminar:
+                if self._recargar:
+                    self._recargar = False
+                    self.recargar()
+                self._recolectar()
+                time.sleep(0.1)
+        finally:
+            self.detener()
+            self.escucha.close()
+            if directorio_metricas:
+                shutil.rmtree(directorio_metricas, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--puerto', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 2)
+    parser.add_argument('--precargar', action='store_true',
+                        help='Crear la aplicación en el maestro antes del fork (SIGHUP no recarga el código)')
+    parser.add_argument('--gracia', type=float, default=30,
+                        help='Segundos para terminar las peticiones en curso al apagar')
+    parser.add_argument('--backlog', type=int, default=1024)
+    args = parser.parse_args()
+
+    Maestro(args).ejecutar()
+
+
+if __name__ == '__main__':
+    main()
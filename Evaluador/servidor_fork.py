@@ -0,0 +1,261 @@
+import atexit
+import ctypes
+import gc
+import json
+import os
+import pwd
+import resource
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Tuple
+
+import sandbox
+from metricas import registro
+
+# Límites de recursos de cada hijo
+MEMORIA_MAXIMA = 256 * 1024 * 1024
+
+# Usuario al que bajan los hijos cuando el zygoto corre como root
+USUARIO_SANDBOX = os.environ.get('WEBIA_SANDBOX_USUARIO', 'nobody')
+
+# prctl(2): desde aquí ningún execve puede ganar privilegios (binarios setuid, capacidades)
+PR_SET_NO_NEW_PRIVS = 38
+
+# Buckets (en segundos) del histograma de arranque de los hijos
+LIMITES_ARRANQUE = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1)
+
+
+def _resolver_usuario():
+    """(uid, gid) de USUARIO_SANDBOX si el zygoto corre como root; None si no"""
+    if os.geteuid() != 0:
+        return None
+    try:
+        entrada = pwd.getpwnam(USUARIO_SANDBOX)
+    except KeyError:
+        raise SystemExit(f"El usuario del sandbox '{USUARIO_SANDBOX}' no existe (WEBIA_SANDBOX_USUARIO)")
+    return entrada.pw_uid, entrada.pw_gid
+
+
+def _bajar_privilegios(usuario, libc):
+    """Deja al hijo sin privilegios antes de ejecutar código del estudiante.
+
+    Los rlimits solo acotan recursos: si el código escapa del sandbox de
+    Python, correría con el usuario del servidor. Por eso el hijo cambia a
+    un usuario sin privilegios, activa no_new_privs y no puede crear
+    procesos.
+    """
+    if usuario is not None:
+        uid, gid = usuario
+        os.setgroups([])
+        os.setgid(gid)
+        os.setuid(uid)
+    if libc is not None and libc.prctl(PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0) != 0:
+        raise OSError(ctypes.get_errno(), 'prctl(PR_SET_NO_NEW_PRIVS) falló')
+    resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))
+
+
+def _atender_trabajo(conexion: socket.socket, usuario, libc):
+    """Código del hijo: lee un trabajo, lo ejecuta y escribe la respuesta"""
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    archivo = conexion.makefile('rwb')
+    trabajo = json.loads(archivo.readline())
+    limite = int(trabajo.get('timeout', 5))
+
+    # Un reloj de pared y otro de CPU: el primero cubre sleeps, el segundo bucles en C
+    resource.setrlimit(resource.RLIMIT_CPU, (limite, limite + 1))
+    resource.setrlimit(resource.RLIMIT_AS, (MEMORIA_MAXIMA, MEMORIA_MAXIMA))
+    signal.alarm(limite + 1)
+    _bajar_privilegios(usuario, libc)
+
+    # Todos los hijos heredan el mismo estado del generador aleatorio
+    if 'random' in sys.modules:
+        sys.modules['random'].seed()
+
+    inicio = time.monotonic()
+    resultado, determinista = sandbox.ejecutar_codigo(trabajo['codigo'])
+
+    respuesta = {
+        'resultado': resultado,
+        'determinista': determinista,
+        'arranque': inicio - trabajo['enviado']
+    }
+    archivo.write(json.dumps(respuesta).encode('utf-8') + b'\n')
+    archivo.flush()
+
+
+def servir(ruta_socket: str, modulos):
+    """Bucle principal del zygoto"""
+    # Los módulos permitidos del sandbox se importan una vez y los hijos los heredan
+    sandbox.configurar_modulos_permitidos(modulos)
+    sandbox.precargar_modulos()
+
+    # Se resuelven una vez en el zygoto y los hijos los heredan
+    usuario = _resolver_usuario()
+    libc = ctypes.CDLL(None, use_errno=True) if sys.platform.startswith('linux') else None
+
+    # Los hijos se recogen solos; el zygoto nunca espera por ellos
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    padre = os.getppid()
+
+    servidor = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    servidor.bind(ruta_socket + '.tmp')
+    servidor.listen(128)
+    servidor.settimeout(1.0)
+    os.rename(ruta_socket + '.tmp', ruta_socket)
+
+    # Congelar los objetos actuales evita que el GC de los hijos rompa el copy-on-write
+    gc.collect()
+    gc.freeze()
+
+    while os.getppid() == padre:
+        try:
+            conexion, _ = servidor.accept()
+        except socket.timeout:
+            continue
+
+        pid = os.fork()
+        if pid == 0:
+            servidor.close()
+            try:
+                _atender_trabajo(conexion, usuario, libc)
+            finally:
+                os._exit(0)
+        conexion.close()
+
+
+class ClienteFork:
+    """Cliente del servidor de fork (zygoto).
+
+    El zygoto importa una sola vez los módulos más usados y crea un hijo con
+    fork() por cada trabajo, que hereda en copy-on-write el intérprete ya
+    inicializado: ni el arranque de Python ni las importaciones pasan por
+    cada ejecución.
+    """
+
+    def __init__(self, modulos=None):
+        self.modulos = tuple(sorted(modulos or sandbox.MODULOS_PERMITIDOS))
+        self.arranque = registro.histograma('webia_sandbox_arranque_segundos',
+                                            'Tiempo desde el envío de un trabajo hasta que el hijo lo empieza',
+                                            limites=LIMITES_ARRANQUE)
+        self._proceso = None
+        self._directorio = None
+        self._ruta = None
+        self._lock = threading.Lock()
+
+    def iniciar(self):
+        """Arranca el zygoto si no está corriendo"""
+        with self._lock:
+            if self._proceso is not None and self._proceso.poll() is None:
+                return
+
+            self._limpiar()
+            self._directorio = tempfile.mkdtemp(prefix='webia-zygoto-')
+            self._ruta = os.path.join(self._directorio, 'zygoto.sock')
+            self._proceso = subprocess.Popen(
+                [sys.executable, os.path.abspath(__file__), self._ruta, *self.modulos]
+            )
+
+            limite = time.monotonic() + 10
+            while not os.path.exists(self._ruta):
+                if self._proceso.poll() is not None:
+                    raise RuntimeError('El servidor de fork terminó al iniciar')
+                if time.monotonic() > limite:
+                    raise RuntimeError('El servidor de fork no respondió a tiempo')
+                time.sleep(0.005)
+
+    def detener(self):
+        """Detiene el zygoto"""
+        with self._lock:
+            if self._proceso is not None and self._proceso.poll() is None:
+                self._proceso.terminate()
+                self._proceso.wait(timeout=5)
+            self._proceso = None
+            self._limpiar()
+
+    def _limpiar(self):
+        """Elimina el directorio temporal del socket"""
+        if self._directorio:
+            shutil.rmtree(self._directorio, ignore_errors=True)
+            self._directorio = None
+
+    def _tras_fork(self):
+        """En un proceso hijo (p. ej. un worker de servidor.py) el zygoto del padre no es suyo"""
+        self._proceso = None
+        self._directorio = None
+        self._ruta = None
+        self._lock = threading.Lock()
+
+    def _conectar(self) -> socket.socket:
+        """Abre una conexión con el zygoto, reiniciándolo si murió"""
+        for intento in range(2):
+            self.iniciar()
+            conexion = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                conexion.connect(self._ruta)
+                return conexion
+            except OSError:
+                conexion.close()
+                if intento:
+                    raise
+                self.detener()
+
+    def ejecutar_trabajo(self, codigo: str, timeout: int = 5) -> Dict[str, Any]:
+        """Ejecuta el código en un hijo y retorna la respuesta completa"""
+        enviado = time.monotonic()
+        conexion = self._conectar()
+        conexion.settimeout(timeout + 5)
+
+        try:
+            archivo = conexion.makefile('rwb')
+            trabajo = {'codigo': codigo, 'timeout': timeout, 'enviado': enviado}
+            archivo.write(json.dumps(trabajo).encode('utf-8') + b'\n')
+            archivo.flush()
+            linea = archivo.readline()
+        except socket.timeout:
+            linea = b''
+        finally:
+            conexion.close()
+
+        if not linea:
+            # El hijo murió por tiempo o memoria antes de responder
+            return {
+                'resultado': {
+                    'success': False,
+                    'error': f'TimeoutError: ejecución interrumpida (límite de {timeout} s o de memoria)',
+                    'output': ''
+                },
+                'determinista': False,
+                'arranque': None
+            }
+
+        respuesta = json.loads(linea)
+        self.arranque.observar(respuesta['arranque'])
+        return respuesta
+
+    def ejecutar(self, codigo: str, timeout: int = 5) -> Tuple[Dict[str, Any], bool]:
+        """Ejecuta el código en un hijo; retorna el resultado y si fue determinista"""
+        respuesta = self.ejecutar_trabajo(codigo, timeout)
+        return respuesta['resultado'], respuesta['determinista']
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Estado del zygoto e histograma de arranque de los hijos"""
+        return {
+            'activo': self._proceso is not None and self._proceso.poll() is None,
+            'modulos_precargados': list(self.modulos),
+            'arranque_segundos': self.arranque.exportar()
+        }
+
+
+cliente_fork = ClienteFork()
+atexit.register(cliente_fork.detener)
+os.register_at_fork(after_in_child=cliente_fork._tras_fork)
+
+
+if __name__ == '__main__':
+    servir(sys.argv[1], sys.argv[2:])
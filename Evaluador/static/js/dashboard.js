@@ -0,0 +1,177 @@
+    // Verificar sesión
+    const estudianteId = sessionStorage.getItem('estudiante_id');
+    const estudianteNombre = sessionStorage.getItem('estudiante_nombre');
+
+    if (!estudianteId) {
+        window.location.href = '/';
+    }
+
+    // Cargar datos del estudiante
+async function cargarDatos() {
+    try {
+        const response = await fetch(`/api/estudiante/${estudianteId}/progreso`);
+
+        // Verificar si la respuesta es válida
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+
+        const data = await response.json();
+
+        // Si hay error pero podemos recuperar
+        if (data.error) {
+            console.warn('Advertencia:', data.error);
+            // Usar valores por defecto en lugar de redirigir
+            mostrarDatosDefecto();
+            return;
+        }
+
+        // Verificar estructura mínima de datos
+        const estudiante = data.estudiante || {};
+        const progreso = data.progreso || {};
+
+        // Actualizar interfaz con valores seguros
+        document.getElementById('userName').textContent = estudiante.nombre || estudianteNombre || 'Usuario';
+        document.getElementById('userAvatar').textContent = (estudiante.nombre || estudianteNombre || 'U').charAt(0).toUpperCase();
+        document.getElementById('welcomeTitle').textContent = `¡Hola, ${estudiante.nombre || estudianteNombre || 'Usuario'}!`;
+
+        const nivel = progreso.nivel_actual || 'principiante';
+        document.getElementById('userLevel').textContent = `Nivel: ${nivel}`;
+        document.getElementById('levelBadge').textContent = `📊 Nivel ${nivel}`;
+
+        // Estadísticas
+        document.getElementById('totalEvaluaciones').textContent = progreso.evaluaciones_totales || 0;
+        document.getElementById('scorePromedio').textContent = Math.round(progreso.score_promedio || 0);
+        document.getElementById('scorePercentage').textContent = `${Math.round(progreso.score_promedio || 0)}%`;
+        document.getElementById('scoreProgress').style.width = `${progreso.score_promedio || 0}%`;
+
+        // Cargar badges (con manejo de error)
+        try {
+            await cargarBadges();
+        } catch (e) {
+            console.error('Error cargando badges:', e);
+        }
+
+        // Cargar actividad
+        cargarActividad(data.historial_reciente || []);
+
+    } catch (error) {
+        console.error('Error cargando datos:', error);
+        // Mostrar datos por defecto en lugar de redirigir
+        mostrarDatosDefecto();
+    }
+}
+
+function mostrarDatosDefecto() {
+    // Mostrar interfaz básica con datos por defecto
+    document.getElementById('userName').textContent = estudianteNombre || 'Usuario';
+    document.getElementById('userAvatar').textContent = (estudianteNombre || 'U').charAt(0).toUpperCase();
+    document.getElementById('welcomeTitle').textContent = `¡Hola, ${estudianteNombre || 'Usuario'}!`;
+    document.getElementById('userLevel').textContent = 'Nivel: principiante';
+    document.getElementById('levelBadge').textContent = '📊 Nivel principiante';
+
+    document.getElementById('totalEvaluaciones').textContent = '0';
+    document.getElementById('scorePromedio').textContent = '0';
+    document.getElementById('scorePercentage').textContent = '0%';
+    document.getElementById('scoreProgress').style.width = '0%';
+    document.getElementById('badgesCount').textContent = '0';
+
+    // Mensaje informativo
+    const activityList = document.getElementById('activityList');
+    activityList.innerHTML = `
+        <div style="text-align: center; padding: 2rem; color: #64748b;">
+            <p>👋 Bienvenido! Comienza evaluando tu primer código.</p>
+            <p style="margin-top: 1rem;">
+                <a href="/evaluador" style="color: var(--primary); text-decoration: none; font-weight: 600;">
+                    💻 Ir al Evaluador →
+                </a>
+            </p>
+        </div>
+    `;
+}
+
+async function cargarBadges() {
+    try {
+        const response = await fetch(`/api/estudiante/${estudianteId}/badges`);
+
+        if (!response.ok) {
+            throw new Error('Error cargando badges');
+        }
+
+        const data = await response.json();
+
+        const badgesObtenidos = data.badges || [];
+        document.getElementById('badgesCount').textContent = badgesObtenidos.length;
+
+        // Obtener todos los badges disponibles
+        const todosResponse = await fetch('/api/badges/todos');
+
+        if (!todosResponse.ok) {
+            throw new Error('Error cargando lista de badges');
+        }
+
+        const todosData = await todosResponse.json();
+        const todosBadges = todosData.badges || [];
+
+        const container = document.getElementById('badgesContainer');
+        container.innerHTML = '';
+
+        if (todosBadges.length === 0) {
+            container.innerHTML = '<p style="text-align: center; color: #64748b;">Sistema de badges en preparación</p>';
+            return;
+        }
+
+        todosBadges.forEach(badge => {
+            const obtenido = badgesObtenidos.some(b => b.id === badge.id);
+            const badgeEl = document.createElement('div');
+            badgeEl.className = `badge-item ${obtenido ? 'unlocked' : 'locked'}`;
+            badgeEl.title = badge.descripcion;
+            badgeEl.innerHTML = `
+                <div class="badge-icon">${badge.icono}</div>
+                <div class="badge-name">${badge.nombre}</div>
+            `;
+            container.appendChild(badgeEl);
+        });
+
+    } catch (error) {
+        console.error('Error cargando badges:', error);
+        document.getElementById('badgesContainer').innerHTML = 
+            '<p style="text-align: center; color: #64748b;">Badges no disponibles temporalmente</p>';
+    }
+}
+
+    function cargarActividad(historial) {
+        const container = document.getElementById('activityList');
+        container.innerHTML = '';
+
+        if (!historial || historial.length === 0) {
+            container.innerHTML = '<p style="text-align: center; color: #64748b;">Sin actividad reciente</p>';
+            return;
+        }
+
+        historial.slice(0, 5).forEach(item => {
+            const activityEl = document.createElement('div');
+            activityEl.className = 'activity-item';
+
+            const iconClass = item.score >= 70 ? 'success' : item.score >= 50 ? 'warning' : 'info';
+            const icon = item.score >= 70 ? '✅' : item.score >= 50 ? '⚠️' : 'ℹ️';
+
+            activityEl.innerHTML = `
+                <div class="activity-icon-circle activity-icon-${iconClass}">
+                    ${icon}
+                </div>
+                <div class="activity-content">
+                    <div class="activity-title">Evaluación - Score: ${item.score}%</div>
+                    <div class="activity-time">Nivel: ${item.nivel} - ${new Date(item.fecha).toLocaleDateString()}</div>
+                </div>
+            `;
+            container.appendChild(activityEl);
+        });
+    }
+
+    function verProgreso() {
+        alert('Función de progreso detallado próximamente');
+    }
+
+    // Cargar datos al iniciar
+    cargarDatos();
@@ -0,0 +1,189 @@
+let ejerciciosTodos = {};
+let nivelActual = 'todos';
+let ejercicioSeleccionado = null;
+
+async function cargarEjercicios() {
+    try {
+        const niveles = ['principiante', 'intermedio', 'avanzado'];
+
+        for (const nivel of niveles) {
+            const response = await fetch(`/api/ejercicios/${nivel}`);
+            const ejercicios = await response.json();
+            ejerciciosTodos[nivel] = ejercicios;
+        }
+
+        mostrarEjercicios('todos');
+    } catch (error) {
+        console.error('Error cargando ejercicios:', error);
+        document.getElementById('ejerciciosContainer').innerHTML = `
+            <div class="empty-state">
+                <div class="empty-icon">❌</div>
+                <h3>Error cargando ejercicios</h3>
+                <p>Intenta recargar la página</p>
+            </div>
+        `;
+    }
+}
+
+function filtrarNivel(nivel) {
+    nivelActual = nivel;
+
+    // Actualizar botones activos
+    document.querySelectorAll('.filter-btn').forEach(btn => {
+        btn.classList.remove('active');
+    });
+    event.target.classList.add('active');
+
+    mostrarEjercicios(nivel);
+}
+
+function mostrarEjercicios(nivel) {
+    const container = document.getElementById('ejerciciosContainer');
+    container.innerHTML = '';
+
+    let ejerciciosAMostrar = [];
+
+    if (nivel === 'todos') {
+        Object.values(ejerciciosTodos).forEach(arr => {
+            ejerciciosAMostrar = ejerciciosAMostrar.concat(arr);
+        });
+    } else {
+        ejerciciosAMostrar = ejerciciosTodos[nivel] || [];
+    }
+
+    if (ejerciciosAMostrar.length === 0) {
+        container.innerHTML = `
+            <div class="empty-state">
+                <div class="empty-icon">📭</div>
+                <h3>No hay ejercicios disponibles</h3>
+            </div>
+        `;
+        return;
+    }
+
+    ejerciciosAMostrar.forEach(ejercicio => {
+        const card = crearTarjetaEjercicio(ejercicio);
+        container.appendChild(card);
+    });
+}
+
+function crearTarjetaEjercicio(ejercicio) {
+    const card = document.createElement('div');
+    card.className = 'ejercicio-card';
+    card.onclick = () => abrirEjercicio(ejercicio);
+
+    const dificultadClass = `dificultad-${ejercicio.dificultad || 1}`;
+    const dificultadTexto = ejercicio.dificultad <= 2 ? 'Fácil' : 
+                            ejercicio.dificultad <= 4 ? 'Medio' : 'Difícil';
+
+    card.innerHTML = `
+        <div class="ejercicio-header">
+            <span class="ejercicio-id">${ejercicio.id.toUpperCase()}</span>
+            <span class="ejercicio-dificultad ${dificultadClass}">${dificultadTexto}</span>
+        </div>
+        <h3 class="ejercicio-title">${ejercicio.titulo}</h3>
+        <p class="ejercicio-description">${ejercicio.descripcion}</p>
+        <div class="ejercicio-meta">
+            <div class="meta-item">
+                <span>🎯</span>
+                <span>${ejercicio.puntos || 10} puntos</span>
+            </div>
+            <div class="meta-item">
+                <span>💡</span>
+                <span>${ejercicio.pistas ? ejercicio.pistas.length : 0} pistas</span>
+            </div>
+            <button class="btn-primary" onclick="event.stopPropagation(); abrirEjercicio(${JSON.stringify(ejercicio).replace(/"/g, '&quot;')})">
+                Ver Ejercicio →
+            </button>
+        </div>
+    `;
+
+    return card;
+}
+
+function abrirEjercicio(ejercicio) {
+    ejercicioSeleccionado = ejercicio;
+
+    document.getElementById('modalTitle').textContent = ejercicio.titulo;
+
+    const modalBody = document.getElementById('modalBody');
+    modalBody.innerHTML = `
+        <div class="section">
+            <div class="section-title">📋 Descripción</div>
+            <p>${ejercicio.descripcion}</p>
+        </div>
+
+        <div class="section">
+            <div class="section-title">💻 Código Plantilla</div>
+            <div class="code-template">${ejercicio.codigo_plantilla}</div>
+        </div>
+
+        ${ejercicio.pistas && ejercicio.pistas.length > 0 ? `
+            <div class="section">
+                <div class="section-title">💡 Pistas</div>
+                <ul class="pistas-list">
+                    ${ejercicio.pistas.map(pista => `
+                        <li class="pista-item">${pista}</li>
+                    `).join('')}
+                </ul>
+            </div>
+        ` : ''}
+
+        ${ejercicio.tests && ejercicio.tests.length > 0 ? `
+            <div class="section">
+                <div class="section-title">✅ Casos de Prueba</div>
+                <p style="color: #64748b;">Tu solución debe pasar estos tests:</p>
+                <ul style="margin-top: 0.5rem; padding-left: 1.5rem; color: #64748b;">
+                    ${ejercicio.tests.map(test => `
+                        <li>${test.descripcion || `Input: ${JSON.stringify(test.input)} → Output: ${JSON.stringify(test.output)}`}</li>
+                    `).join('')}
+                </ul>
+            </div>
+        ` : ''}
+
+        <div class="section">
+            <div class="section-title">🎯 Puntos</div>
+            <p style="font-size: 1.5rem; font-weight: 700; color: var(--primary);">
+                ${ejercicio.puntos || 10} puntos
+            </p>
+        </div>
+    `;
+
+    document.getElementById('ejercicioModal').classList.add('show');
+}
+
+function cerrarModal() {
+    document.getElementById('ejercicioModal').classList.remove('show');
+}
+
+function copiarCodigo() {
+    if (!ejercicioSeleccionado) return;
+
+    const codigo = ejercicioSeleccionado.codigo_plantilla;
+    navigator.clipboard.writeText(codigo).then(() => {
+        alert('✅ Código copiado al portapapeles');
+    }).catch(() => {
+        alert('❌ Error al copiar el código');
+    });
+}
+
+function irAEvaluador() {
+    if (!ejercicioSeleccionado) return;
+
+    // Guardar código en sessionStorage
+    sessionStorage.setItem('codigo_ejercicio', ejercicioSeleccionado.codigo_plantilla);
+    sessionStorage.setItem('ejercicio_id', ejercicioSeleccionado.id);
+
+    // Redirigir al evaluador
+    window.location.href = '/evaluador';
+}
+
+// Cerrar modal al hacer clic fuera
+document.getElementById('ejercicioModal').addEventListener('click', (e) => {
+    if (e.target.id === 'ejercicioModal') {
+        cerrarModal();
+    }
+});
+
+// Cargar ejercicios al iniciar
+cargarEjercicios();
@@ -0,0 +1,272 @@
+// Verificar sesión
+const estudianteId = sessionStorage.getItem('estudiante_id');
+const estudianteNombre = sessionStorage.getItem('estudiante_nombre');
+
+if (estudianteId) {
+    document.getElementById('userName').textContent = estudianteNombre || 'Usuario';
+}
+
+const codeEditor = document.getElementById('codeEditor');
+const analyzeBtn = document.getElementById('analyzeBtn');
+const executeBtn = document.getElementById('executeBtn');
+const clearBtn = document.getElementById('clearBtn');
+const saveBtn = document.getElementById('saveBtn');
+
+// Cargar código de ejercicio si existe
+const codigoEjercicio = sessionStorage.getItem('codigo_ejercicio');
+if (codigoEjercicio) {
+    codeEditor.value = codigoEjercicio;
+    sessionStorage.removeItem('codigo_ejercicio');
+    updateStats();
+}
+
+// Actualizar estadísticas del editor
+function updateStats() {
+    const code = codeEditor.value;
+    const lines = code.split('\n').length;
+    const chars = code.length;
+
+    document.getElementById('lineCount').textContent = `Líneas: ${lines}`;
+    document.getElementById('charCount').textContent = `Caracteres: ${chars}`;
+}
+
+codeEditor.addEventListener('input', updateStats);
+updateStats();
+
+// Analizar código
+analyzeBtn.addEventListener('click', async () => {
+    const code = codeEditor.value.trim();
+
+    if (!code) {
+        showToast('Escribe código para analizar', 'error');
+        return;
+    }
+
+    analyzeBtn.disabled = true;
+    analyzeBtn.innerHTML = '<span class="spinner" style="width: 20px; height: 20px; border-width: 3px;"></span> Analizando...';
+
+    document.getElementById('loadingState').classList.add('show');
+    document.getElementById('resultsContent').style.display = 'none';
+
+    try {
+        const response = await fetch('/api/evaluar', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ codigo: code })
+        });
+
+        const data = await response.json();
+
+        if (data.error) {
+            showToast(data.error, 'error');
+            return;
+        }
+
+        displayResults(data);
+
+        // Guardar evaluación si hay estudiante
+        if (estudianteId) {
+            await guardarEvaluacion(code, data);
+        }
+
+        showToast('Análisis completado', 'success');
+
+    } catch (error) {
+        console.error('Error:', error);
+        showToast('Error al analizar código', 'error');
+    } finally {
+        analyzeBtn.disabled = false;
+        analyzeBtn.innerHTML = '<span>🔍</span> Analizar con IA';
+    }
+});
+
+// Ejecutar código
+executeBtn.addEventListener('click', async () => {
+    const code = codeEditor.value.trim();
+
+    if (!code) {
+        showToast('Escribe código para ejecutar', 'error');
+        return;
+    }
+
+    executeBtn.disabled = true;
+    const outputSection = document.getElementById('outputSection');
+    outputSection.classList.add('show');
+    outputSection.textContent = '⏳ Ejecutando...';
+
+    try {
+        const response = await fetch('/api/ejecutar', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ codigo: code, estudiante_id: estudianteId })
+        });
+
+        const data = await response.json();
+
+        if (data.success) {
+            outputSection.textContent = '✅ Ejecución exitosa:\n\n' + data.output;
+            showToast('Código ejecutado correctamente', 'success');
+        } else {
+            outputSection.textContent = '❌ Error:\n\n' + data.error;
+            showToast('Error en la ejecución', 'error');
+        }
+
+    } catch (error) {
+        outputSection.textContent = '❌ Error de conexión';
+        showToast('Error al ejecutar código', 'error');
+    } finally {
+        executeBtn.disabled = false;
+    }
+});
+
+// Limpiar editor
+clearBtn.addEventListener('click', () => {
+    if (confirm('¿Seguro que quieres limpiar el editor?')) {
+        codeEditor.value = '';
+        updateStats();
+        document.getElementById('outputSection').classList.remove('show');
+        document.getElementById('loadingState').classList.add('show');
+        document.getElementById('resultsContent').style.display = 'none';
+        showToast('Editor limpiado', 'info');
+    }
+});
+
+// Guardar código
+saveBtn.addEventListener('click', () => {
+    const code = codeEditor.value;
+    if (!code.trim()) {
+        showToast('No hay código para guardar', 'error');
+        return;
+    }
+
+    const blob = new Blob([code], { type: 'text/plain' });
+    const url = URL.createObjectURL(blob);
+    const a = document.createElement('a');
+    a.href = url;
+    a.download = 'codigo.py';
+    a.click();
+    URL.revokeObjectURL(url);
+
+    showToast('Código guardado', 'success');
+});
+
+async function guardarEvaluacion(codigo, resultados) {
+    try {
+        // Aquí podrías llamar a un endpoint específico para guardar
+        // Por ahora solo lo registramos en consola
+        console.log('Evaluación guardada para estudiante:', estudianteId);
+    } catch (error) {
+        console.error('Error guardando evaluación:', error);
+    }
+}
+
+function displayResults(data) {
+    document.getElementById('loadingState').classList.remove('show');
+    document.getElementById('resultsContent').style.display = 'block';
+
+    // Métricas
+    const metricas = data.metricas || {};
+    document.getElementById('metricLineas').textContent = metricas.lineas_codigo || 0;
+    document.getElementById('metricFunciones').textContent = metricas.funciones || 0;
+    document.getElementById('metricClases').textContent = metricas.clases || 0;
+    document.getElementById('metricComplejidad').textContent = metricas.complejidad || 0;
+
+    // Calidad
+    const score = data.score || 0;
+    document.getElementById('qualityFill').style.width = `${score}%`;
+    document.getElementById('qualityFill').textContent = `${score}%`;
+
+    let qualityText = '';
+    if (score >= 90) qualityText = '🌟 Excelente calidad';
+    else if (score >= 70) qualityText = '✅ Buena calidad';
+    else if (score >= 50) qualityText = '⚠️ Calidad moderada';
+    else qualityText = '❌ Necesita mejoras';
+
+    document.getElementById('qualityText').textContent = qualityText;
+
+    // Nivel detectado (si hay análisis IA)
+    if (data.clasificacion_nivel) {
+        const nivel = data.clasificacion_nivel.nivel_predicho || 'principiante';
+        const confianza = data.clasificacion_nivel.confianza || 0;
+
+        const nivelBadge = document.getElementById('nivelDetectado');
+        nivelBadge.textContent = nivel.charAt(0).toUpperCase() + nivel.slice(1);
+        nivelBadge.className = `nivel-badge nivel-${nivel}`;
+
+        document.getElementById('confianzaIA').textContent = `${confianza}%`;
+    }
+
+    // Feedback
+    displayFeedback(data.feedback || []);
+
+    // Sugerencias
+    displaySugerencias(data.sugerencias || []);
+}
+
+function displayFeedback(feedback) {
+    const container = document.getElementById('feedbackList');
+    container.innerHTML = '';
+
+    if (feedback.length === 0) {
+        container.innerHTML = '<p style="color: #64748b; text-align: center;">Sin feedback adicional</p>';
+        return;
+    }
+
+    feedback.forEach(item => {
+        const div = document.createElement('div');
+        div.className = `feedback-item feedback-${item.tipo}`;
+
+        const icon = {
+            'success': '✅',
+            'warning': '⚠️',
+            'error': '❌',
+            'info': 'ℹ️'
+        }[item.tipo] || 'ℹ️';
+
+        div.innerHTML = `
+            <span class="feedback-icon">${icon}</span>
+            <div>${item.mensaje}</div>
+        `;
+        container.appendChild(div);
+    });
+}
+
+function displaySugerencias(sugerencias) {
+    const container = document.getElementById('suggestionsList');
+    container.innerHTML = '';
+
+    if (sugerencias.length === 0) {
+        container.innerHTML = '<p style="color: #64748b; text-align: center;">Sin sugerencias adicionales</p>';
+        return;
+    }
+
+    sugerencias.forEach(sugerencia => {
+        const div = document.createElement('div');
+        div.className = 'suggestion-item';
+        div.innerHTML = `
+            <span>💡</span>
+            <div>${sugerencia}</div>
+        `;
+        container.appendChild(div);
+    });
+}
+
+function showToast(message, type) {
+    const container = document.getElementById('toastContainer');
+    const toast = document.createElement('div');
+    toast.className = `toast toast-${type}`;
+    toast.textContent = message;
+
+    container.appendChild(toast);
+
+    setTimeout(() => toast.classList.add('show'), 100);
+
+    setTimeout(() => {
+        toast.classList.remove('show');
+        setTimeout(() => {
+            if (toast.parentNode) {
+                toast.parentNode.removeChild(toast);
+            }
+        }, 300);
+    }, 3000);
+}
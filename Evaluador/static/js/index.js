@@ -0,0 +1,124 @@
+// Cargar estadísticas al iniciar
+document.addEventListener('DOMContentLoaded', async () => {
+    try {
+        const response = await fetch('/api/estadisticas');
+        const data = await response.json();
+        document.getElementById('totalEstudiantes').textContent = data.total_estudiantes || 0;
+        document.getElementById('totalEvaluaciones').textContent = data.total_evaluaciones || 0;
+    } catch (error) {
+        console.log('Error cargando estadísticas');
+    }
+});
+
+function switchTab(tab) {
+    // Cambiar tabs activos
+    document.querySelectorAll('.tab').forEach(t => t.classList.remove('active'));
+    document.querySelectorAll('.form-content').forEach(f => f.classList.remove('active'));
+
+    if (tab === 'login') {
+        document.querySelectorAll('.tab')[0].classList.add('active');
+        document.getElementById('loginForm').classList.add('active');
+    } else {
+        document.querySelectorAll('.tab')[1].classList.add('active');
+        document.getElementById('registerForm').classList.add('active');
+    }
+}
+
+function showAlert(message, type) {
+    const container = document.getElementById('alertContainer');
+    container.innerHTML = `
+        <div class="alert alert-${type} show">
+            ${message}
+        </div>
+    `;
+
+    setTimeout(() => {
+        container.innerHTML = '';
+    }, 3000);
+}
+
+async function handleLogin(event) {
+    event.preventDefault();
+    const nombre = document.getElementById('loginNombre').value.trim();
+
+    if (!nombre) {
+        showAlert('Por favor ingresa tu nombre', 'error');
+        return;
+    }
+
+    try {
+        // Buscar si el estudiante existe
+        const response = await fetch('/api/estudiantes');
+        const estudiantes = await response.json();
+
+        const estudiante = estudiantes.find(e => 
+            e.nombre.toLowerCase() === nombre.toLowerCase()
+        );
+
+        if (estudiante) {
+            // Guardar en sessionStorage
+            sessionStorage.setItem('estudiante_id', estudiante.id);
+            sessionStorage.setItem('estudiante_nombre', estudiante.nombre);
+
+            showAlert('¡Bienvenido de nuevo!', 'success');
+            setTimeout(() => {
+                window.location.href = '/dashboard';
+            }, 1000);
+        } else {
+            showAlert('Usuario no encontrado. Por favor regístrate.', 'error');
+            switchTab('register');
+            document.getElementById('registerNombre').value = nombre;
+        }
+    } catch (error) {
+        showAlert('Error al iniciar sesión', 'error');
+    }
+}
+
+async function handleRegister(event) {
+    event.preventDefault();
+    const nombre = document.getElementById('registerNombre').value.trim();
+
+    if (!nombre) {
+        showAlert('Por favor ingresa tu nombre', 'error');
+        return;
+    }
+
+    try {
+        const response = await fetch('/api/estudiante/registrar', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({ nombre: nombre })
+        });
+
+        const data = await response.json();
+
+        if (data.error) {
+            if (data.estudiante_id) {
+                showAlert('Este usuario ya existe. Iniciando sesión...', 'error');
+                sessionStorage.setItem('estudiante_id', data.estudiante_id);
+                sessionStorage.setItem('estudiante_nombre', nombre);
+                setTimeout(() => {
+                    window.location.href = '/dashboard';
+                }, 1500);
+            } else {
+                showAlert(data.error, 'error');
+            }
+        } else {
+            sessionStorage.setItem('estudiante_id', data.estudiante_id);
+            sessionStorage.setItem('estudiante_nombre', data.nombre);
+
+            showAlert('¡Cuenta creada exitosamente!', 'success');
+            setTimeout(() => {
+                window.location.href = '/dashboard';
+            }, 1000);
+        }
+    } catch (error) {
+        showAlert('Error al registrarse', 'error');
+    }
+}
+
+function irProfesor() {
+    window.location.href = '/profesor';
+}
@@ -0,0 +1,188 @@
+    async function cargarEstadisticas() {
+        try {
+            const response = await fetch('/api/estadisticas');
+            const data = await response.json();
+
+            document.getElementById('totalEstudiantes').textContent = data.total_estudiantes || 0;
+            document.getElementById('totalEvaluaciones').textContent = data.total_evaluaciones || 0;
+            document.getElementById('promedioGeneral').textContent = Math.round(data.promedio_general || 0);
+
+            // Calcular activos hoy (simplificado)
+            const activos = Math.min(data.total_estudiantes, Math.ceil(data.total_estudiantes * 0.6));
+            document.getElementById('activosHoy').textContent = activos;
+
+            // Actualizar gráfico de distribución
+            actualizarGraficoNiveles(data.distribucion_niveles || {});
+
+        } catch (error) {
+            console.error('Error cargando estadísticas:', error);
+        }
+    }
+
+    function actualizarGraficoNiveles(distribucion) {
+        const principiante = distribucion.principiante || 0;
+        const intermedio = distribucion.intermedio || 0;
+        const avanzado = distribucion.avanzado || 0;
+        const total = principiante + intermedio + avanzado;
+
+        if (total === 0) return;
+
+        const maxHeight = 180;
+
+        const principiantePorcentaje = (principiante / total) * 100;
+        const intermedioPorcentaje = (intermedio / total) * 100;
+        const avanzadoPorcentaje = (avanzado / total) * 100;
+
+        document.getElementById('barPrincipiante').style.height = `${(principiante / total) * maxHeight}px`;
+        document.getElementById('barPrincipiante').textContent = principiante;
+
+        document.getElementById('barIntermedio').style.height = `${(intermedio / total) * maxHeight}px`;
+        document.getElementById('barIntermedio').textContent = intermedio;
+
+        document.getElementById('barAvanzado').style.height = `${(avanzado / total) * maxHeight}px`;
+        document.getElementById('barAvanzado').textContent = avanzado;
+    }
+
+    async function cargarEstadisticasBadges() {
+        try {
+            const response = await fetch('/api/badges/estadisticas');
+            const data = await response.json();
+
+            const maxHeight = 180;
+            const maximo = Math.max(1, ...data.badges.map(b => b.estudiantes));
+            const contenedor = document.getElementById('chartBadges');
+
+            contenedor.innerHTML = data.badges.map(badge => `
+                <div class="chart-bar" title="${badge.nombre}: ${badge.porcentaje}% de los estudiantes">
+                    <div class="bar" style="height: ${(badge.estudiantes / maximo) * maxHeight}px">${badge.estudiantes}</div>
+                    <div class="bar-label">${badge.icono}</div>
+                </div>
+            `).join('');
+
+        } catch (error) {
+            console.error('Error cargando estadísticas de badges:', error);
+        }
+    }
+
+    async function cargarEstudiantes() {
+        try {
+            const response = await fetch('/api/estudiantes');
+            const estudiantes = await response.json();
+
+            const tbody = document.getElementById('estudiantesBody');
+
+            if (!estudiantes || estudiantes.length === 0) {
+                tbody.innerHTML = `
+                    <tr>
+                        <td colspan="7">
+                            <div class="empty-state">
+                                <div class="empty-icon">📭</div>
+                                <p>No hay estudiantes registrados</p>
+                            </div>
+                        </td>
+                    </tr>
+                `;
+                return;
+            }
+
+            tbody.innerHTML = '';
+
+            estudiantes.forEach(estudiante => {
+                const tr = document.createElement('tr');
+
+                const nivel = estudiante.nivel || 'principiante';
+                const badgeClass = `badge badge-${nivel}`;
+
+                const promedio = Math.round(estudiante.promedio || 0);
+                const fecha = estudiante.ultima_actividad ? 
+                    new Date(estudiante.ultima_actividad).toLocaleDateString('es-ES') : 
+                    'Sin actividad';
+
+                tr.innerHTML = `
+                    <td><strong>${estudiante.nombre}</strong></td>
+                    <td><span class="${badgeClass}">${nivel}</span></td>
+                    <td>${estudiante.evaluaciones || 0}</td>
+                    <td>${promedio}%</td>
+                    <td>
+                        <div class="progress-bar-small">
+                            <div class="progress-fill-small" style="width: ${promedio}%"></div>
+                        </div>
+                    </td>
+                    <td style="color: #64748b; font-size: 0.9rem;">${fecha}</td>
+                    <td>
+                        <button class="btn-view" onclick="verDetalleEstudiante(${estudiante.id})">
+                            Ver Detalle
+                        </button>
+                    </td>
+                `;
+
+                tbody.appendChild(tr);
+            });
+
+        } catch (error) {
+            console.error('Error cargando estudiantes:', error);
+            document.getElementById('estudiantesBody').innerHTML = `
+                <tr>
+                    <td colspan="7">
+                        <div class="empty-state">
+                            <div class="empty-icon">❌</div>
+                            <p>Error cargando estudiantes</p>
+                        </div>
+                    </td>
+                </tr>
+            `;
+        }
+    }
+
+
+async function verDetalleEstudiante(estudianteId) {
+    try {
+        const response = await fetch(`/api/estudiante/${estudianteId}/progreso`);
+        const data = await response.json();
+
+        if (data.error || !data.estudiante || !data.progreso) {
+            alert('No se pudieron cargar los datos del estudiante');
+            return;
+        }
+
+        // Construir mensaje detallado con validaciones
+        let mensaje = `📊 DETALLE DEL ESTUDIANTE\n\n`;
+        mensaje += `👤 Nombre: ${data.estudiante.nombre || 'N/A'}\n`;
+        mensaje += `📈 Nivel: ${data.progreso.nivel_actual || 'principiante'}\n`;
+        mensaje += `📝 Evaluaciones: ${data.progreso.evaluaciones_totales || 0}\n`;
+        mensaje += `⭐ Score Promedio: ${Math.round(data.progreso.score_promedio || 0)}%\n`;
+        mensaje += `🎯 Score Máximo: ${data.progreso.score_maximo || 0}%\n`;
+        mensaje += `⚙️ Funciones Creadas: ${data.progreso.funciones_creadas || 0}\n`;
+        mensaje += `🏗️ Clases Creadas: ${data.progreso.clases_creadas || 0}\n\n`;
+
+        if (data.historial_reciente && data.historial_reciente.length > 0) {
+            mensaje += `📋 ÚLTIMAS EVALUACIONES:\n`;
+            data.historial_reciente.slice(0, 5).forEach((eval, index) => {
+                mensaje += `${index + 1}. Score: ${eval.score || 0}% - Nivel: ${eval.nivel || 'N/A'}\n`;
+            });
+        } else {
+            mensaje += `📋 Sin evaluaciones registradas aún\n`;
+        }
+
+        alert(mensaje);
+
+    } catch (error) {
+        console.error('Error:', error);
+        alert('Error de conexión al cargar detalles del estudiante');
+    }
+}
+
+
+    // Cargar datos al iniciar
+    document.addEventListener('DOMContentLoaded', () => {
+        cargarEstadisticas();
+        cargarEstadisticasBadges();
+        cargarEstudiantes();
+
+        // Actualizar cada 30 segundos
+        setInterval(() => {
+            cargarEstadisticas();
+            cargarEstadisticasBadges();
+            cargarEstudiantes();
+        }, 30000);
+    });
@@ -0,0 +1,261 @@
+"""Trazas por solicitud: spans anidados con tiempos, muestreados y escritos en JSONL.
+
+    with span('parse'):
+        ...
+
+    @trazado()
+    def clasificar_nivel(self, codigo): ...
+
+Cada solicitud tiene un id (el de la cabecera X-Request-ID o uno generado)
+que se propaga con contextvars a todo lo que corre en su contexto. Solo las
+solicitudes muestreadas (o las que piden registrar, p. ej. para el corpus
+de envíos lentos) registran spans: en las demás span() y @trazado apenas
+consultan una ContextVar. Cada traza terminada es una línea del
+sumidero JSONL y
+
+    python trazas.py colapsar trazas.jsonl > trazas.folded
+
+la convierte en pilas colapsadas para flamegraph.pl o speedscope.
+"""
+import argparse
+import contextvars
+import functools
+import itertools
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+# Máximo de spans guardados por traza; los demás se cuentan pero no se guardan
+MAX_SPANS = 5000
+
+PATRON_ID_SOLICITUD = re.compile(r'^[A-Za-z0-9._:-]{1,64}$')
+
+_traza_actual = contextvars.ContextVar('traza_actual', default=None)
+_span_actual = contextvars.ContextVar('span_actual', default=0)
+
+
+class Traza:
+    """Spans de una solicitud; el span 1 es la raíz"""
+
+    def __init__(self, id_solicitud: str, nombre: str, muestreada: bool, registrar: bool = False):
+        self.id_solicitud = id_solicitud
+        self.nombre = nombre
+        self.muestreada = muestreada  # se escribe en el sumidero
+        self.registra_spans = muestreada or registrar
+        self.fecha = time.time()
+        self.inicio = time.perf_counter_ns()
+        self.fin = None
+        self.atributos = {}
+        self.spans = []  # [id, padre, nombre, inicio_ns, fin_ns, atributos]
+        self.descartados = 0
+        self._ids = itertools.count(2)
+        self._tokens = None
+
+    @property
+    def duracion(self) -> float:
+        """Segundos desde el inicio hasta el cierre (o hasta ahora)"""
+        return ((self.fin or time.perf_counter_ns()) - self.inicio) / 1e9
+
+    def agregar(self, registro):
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append(registro)
+        else:
+            self.descartados += 1
+
+    def desglose(self) -> Dict[str, float]:
+        """Milisegundos por nombre de span (sumados si se repite)"""
+        totales = defaultdict(float)
+        for _, _, nombre, inicio, fin, _ in self.spans:
+            totales[nombre] += (fin - inicio) / 1e6
+        return {nombre: round(ms, 3) for nombre, ms in sorted(totales.items())}
+
+    def exportar(self) -> Dict[str, Any]:
+        """Traza serializable, con tiempos en microsegundos relativos al inicio"""
+        fin = self.fin or time.perf_counter_ns()
+        spans = [{'id': 1, 'padre': 0, 'nombre': self.nombre, 'inicio_us': 0,
+                  'duracion_us': (fin - self.inicio) // 1000, 'atributos': self.atributos}]
+        for id_span, padre, nombre, inicio, fin_span, atributos in sorted(self.spans, key=lambda s: s[3]):
+            span_exportado = {'id': id_span, 'padre': padre, 'nombre': nombre,
+                              'inicio_us': (inicio - self.inicio) // 1000,
+                              'duracion_us': (fin_span - inicio) // 1000}
+            if atributos:
+                span_exportado['atributos'] = atributos
+            spans.append(span_exportado)
+        return {
+            'id_solicitud': self.id_solicitud,
+            'fecha': self.fecha,
+            'duracion_us': spans[0]['duracion_us'],
+            'spans_descartados': self.descartados,
+            'spans': spans
+        }
+
+
+class _Span:
+    __slots__ = ('traza', 'registro', 'token')
+
+    def __init__(self, traza: Traza, nombre: str, atributos: Optional[Dict[str, Any]]):
+        self.traza = traza
+        self.registro = [0, 0, nombre, 0, 0, atributos]
+
+    def __enter__(self):
+        registro = self.registro
+        registro[0] = next(self.traza._ids)
+        registro[1] = _span_actual.get()
+        self.token = _span_actual.set(registro[0])
+        registro[3] = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        registro = self.registro
+        registro[4] = time.perf_counter_ns()
+        _span_actual.reset(self.token)
+        if tipo is not None:
+            self.atributo('error', tipo.__name__)
+        self.traza.agregar(registro)
+        return False
+
+    def atributo(self, clave: str, valor: Any):
+        """Agrega un atributo al span"""
+        if self.registro[5] is None:
+            self.registro[5] = {}
+        self.registro[5][clave] = valor
+
+
+class _SpanNulo:
+    """Span de las solicitudes no muestreadas: no registra nada"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, tb):
+        return False
+
+    def atributo(self, clave: str, valor: Any):
+        pass
+
+
+_SPAN_NULO = _SpanNulo()
+
+
+def span(nombre: str, **atributos):
+    """Context manager que registra un span hijo del actual en la traza en curso"""
+    traza = _traza_actual.get()
+    if traza is None or not traza.registra_spans:
+        return _SPAN_NULO
+    return _Span(traza, nombre, atributos or None)
+
+
+def trazado(nombre: str = None):
+    """Decorador: cada llamada es un span (por defecto con el __qualname__ de la función)"""
+    def decorador(funcion):
+        etiqueta = nombre or funcion.__qualname__
+
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            traza = _traza_actual.get()
+            if traza is None or not traza.registra_spans:
+                return funcion(*args, **kwargs)
+            with _Span(traza, etiqueta, None):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def iniciar_traza(nombre: str, id_solicitud: str = None, muestreo: float = 0.0,
+                  registrar: bool = False) -> Traza:
+    """Abre la traza de una solicitud en el contexto actual.
+
+    `id_solicitud` se reutiliza si es válido (p. ej. X-Request-ID de un
+    proxy); si no, se genera uno. La traza se muestrea con probabilidad
+    `muestreo`; con `registrar` guarda sus spans aunque no se muestree.
+    """
+    if not id_solicitud or not PATRON_ID_SOLICITUD.match(id_solicitud):
+        id_solicitud = os.urandom(16).hex()  # como uuid4().hex, sin construir el UUID
+    traza = Traza(id_solicitud, nombre, muestreo > 0 and random.random() < muestreo, registrar)
+    traza._tokens = (_traza_actual.set(traza), _span_actual.set(1))
+    return traza
+
+
+def terminar_traza(traza: Traza, **atributos) -> Traza:
+    """Cierra la traza y restaura el contexto anterior"""
+    traza.fin = time.perf_counter_ns()
+    traza.atributos.update(atributos)
+    if traza._tokens is not None:
+        token_traza, token_span = traza._tokens
+        traza._tokens = None
+        try:
+            _span_actual.reset(token_span)
+            _traza_actual.reset(token_traza)
+        except ValueError:
+            pass  # se cierra desde otro contexto: los valores ya no son de este
+    return traza
+
+
+def id_solicitud_actual() -> Optional[str]:
+    """Id de la solicitud en curso, o None fuera de una solicitud"""
+    traza = _traza_actual.get()
+    return traza.id_solicitud if traza is not None else None
+
+
+class SumideroJSONL:
+    """Añade cada traza como una línea JSON; seguro entre hilos y workers (O_APPEND)"""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._fd = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def escribir(self, traza: Traza):
+        linea = (json.dumps(traza.exportar(), ensure_ascii=False, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            if self._pid != os.getpid():
+                self._fd = os.open(self.ruta, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                self._pid = os.getpid()
+            # Una sola escritura por línea: las de otros workers no se intercalan
+            os.write(self._fd, linea)
+
+
+def colapsar(lineas) -> Dict[str, int]:
+    """Pilas colapsadas ('raiz;hijo;nieto' -> microsegundos propios) de trazas JSONL"""
+    pilas = defaultdict(int)
+    for linea in lineas:
+        if not linea.strip():
+            continue
+        spans = {s['id']: s for s in json.loads(linea)['spans']}
+        hijos = defaultdict(int)
+        for s in spans.values():
+            hijos[s['padre']] += s['duracion_us']
+        for s in spans.values():
+            ruta, actual = [], s
+            while actual is not None:
+                ruta.append(actual['nombre'].replace(';', ','))
+                actual = spans.get(actual['padre'])
+            propio = s['duracion_us'] - hijos[s['id']]
+            if propio > 0:
+                pilas[';'.join(reversed(ruta))] += propio
+    return dict(pilas)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    colapsar_parser = subcomandos.add_parser('colapsar', help='Pilas colapsadas para un flame graph')
+    colapsar_parser.add_argument('archivo', nargs='?', default='trazas.jsonl')
+    args = parser.parse_args()
+
+    with open(args.archivo, encoding='utf-8') as archivo:
+        pilas = colapsar(archivo)
+    for pila, microsegundos in sorted(pilas.items()):
+        sys.stdout.write(f"{pila} {microsegundos}\n")
+
+
+if __name__ == '__main__':
+    main()